@@ -0,0 +1,177 @@
+"""Bytes per course held by the tee-row dicts vs. the course_model classes.
+
+Usage:
+    python benchmarks/bench_course_memory.py [--courses 2000]
+
+Parses synthetic 18-hole, 4-tee course pages once, then builds and keeps every
+course in each representation while tracemalloc counts what stays allocated:
+
+    dict rows    one ~80-key dict per tee with numbers as strings and "N/A" for
+                 missing values, as build_tee_rows() used to return
+    Course       course_model.Course/Tee with int16 hole arrays
+
+and for the typed DataFrames that COPY and the Parquet export read
+(prepare_golf_data_frame() of pd.DataFrame(dict rows) vs. of tee_rows_frame()).
+The parsed hole records both start from are not counted. pandas may keep
+strings in Arrow buffers, which tracemalloc does not see, so the Arrow memory
+pool's growth is added when pyarrow is installed. Build times are measured
+separately, without tracing.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "Lake Jovita"
+    ),
+)
+os.environ.setdefault("METRICS_JSONL", "off")
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from course_model import DEFAULT_TEES, Course, tee_rows_frame
+from course_pages import make_course_page
+from lake_jovita_south_scraper import OUTPUT_COLUMNS, prepare_golf_data_frame
+from parsers import LakeJovitaParser
+
+URL = "https://lakejovita.com/bench-course-{}/"
+
+
+def dict_tee_rows(course_name, url, hole_records):
+    """The original per-tee dict rows: every value a string, "N/A" when missing."""
+    holes = {}
+    for hole_info in hole_records:
+        yardages = {}
+        raw_yardages = hole_info["Raw Tee Yardages"]
+        if raw_yardages and raw_yardages != "N/A":
+            for tee_pair in raw_yardages.split("|"):
+                parts = tee_pair.strip().split(":")
+                if len(parts) == 2:
+                    yardages[parts[0].strip()] = parts[1].strip()
+        holes[hole_info["Hole Number"]] = {
+            "Par": hole_info["Par per Hole"],
+            "Yardages": yardages,
+        }
+
+    rows = []
+    for tee_number, tee_name in enumerate(DEFAULT_TEES, start=1):
+        row = {col: "N/A" for col in OUTPUT_COLUMNS}
+        row.update(
+            {
+                "CourseTeeNumber": f"N/A-{tee_name}",
+                "CourseName": course_name,
+                "URL": url,
+                "TotalHoles": 18,
+                "TeeNumber": tee_number,
+                "TeeName": tee_name,
+                "Holes_Total": 18,
+            }
+        )
+        totals = {"Out": [0, 0], "In": [0, 0]}
+        for hole in range(1, 19):
+            hole_data = holes.get(str(hole), {"Par": "N/A", "Yardages": {}})
+            par = hole_data["Par"]
+            yardage = hole_data["Yardages"].get(tee_name, "N/A")
+            row[f"Par_{hole}"] = par
+            row[f"Hole_{hole}"] = yardage
+            nine = totals["Out" if hole <= 9 else "In"]
+            try:
+                nine[0] += int(par) if par != "N/A" else 0
+                nine[1] += int(yardage) if yardage != "N/A" else 0
+            except ValueError:
+                pass
+        row["Tot_Out_Par"] = str(totals["Out"][0])
+        row["Tot_Out_Ydg"] = str(totals["Out"][1])
+        row["Tot_In_Par"] = str(totals["In"][0])
+        row["Tot_In_Ydg"] = str(totals["In"][1])
+        row["Length_Total"] = str(totals["Out"][1] + totals["In"][1])
+        rows.append(row)
+    return rows
+
+
+def allocated():
+    arrow = pa.total_allocated_bytes() if pa is not None else 0
+    return tracemalloc.get_traced_memory()[0] + arrow
+
+
+def retained(build):
+    """(result, bytes still allocated after build())."""
+    gc.collect()
+    tracemalloc.start()
+    before = allocated()
+    result = build()
+    gc.collect()
+    after = allocated()
+    tracemalloc.stop()
+    return result, after - before
+
+
+def timed(build):
+    start = time.perf_counter()
+    build()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=2000)
+    args = parser.parse_args()
+
+    course_parser = LakeJovitaParser()
+    courses = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.courses):
+            html = make_course_page(i, tees=DEFAULT_TEES)
+            course_name, hole_records, _ = course_parser.parse(html)
+            courses.append((course_name, URL.format(i), hole_records))
+
+    def build_dict_rows():
+        return [dict_tee_rows(*course) for course in courses]
+
+    def build_models():
+        return [Course.from_hole_records(*course) for course in courses]
+
+    dict_rows, dict_bytes = retained(build_dict_rows)
+    models, model_bytes = retained(build_models)
+    flat_rows = [row for rows in dict_rows for row in rows]
+
+    def dict_frame():
+        return prepare_golf_data_frame(pd.DataFrame(flat_rows))
+
+    def model_frame():
+        return prepare_golf_data_frame(tee_rows_frame(models))
+
+    _, dict_frame_bytes = retained(dict_frame)
+    _, model_frame_bytes = retained(model_frame)
+
+    n = args.courses
+    print(f"{n:,} courses, {len(flat_rows):,} tee rows\n")
+    print(f"  {'representation':<24} {'bytes/course':>13} {'build s':>9}")
+    for label, size, seconds in (
+        ("dict rows", dict_bytes, timed(build_dict_rows)),
+        ("Course/Tee", model_bytes, timed(build_models)),
+        ("typed frame of dict rows", dict_frame_bytes, timed(dict_frame)),
+        ("typed frame of Course", model_frame_bytes, timed(model_frame)),
+    ):
+        print(f"  {label:<24} {size / n:13,.0f} {seconds:9.3f}")
+    print(
+        f"\nCourse/Tee uses {dict_bytes / model_bytes:.1f}x less memory than dict "
+        f"rows; its DataFrame {dict_frame_bytes / model_frame_bytes:.1f}x less."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Write/read time and file size of the CSV snapshot vs. the Parquet dataset.
+
+Usage:
+    python benchmarks/bench_export.py [--courses 100000] [--tees 4]
+
+Builds synthetic tee rows shaped like course_model.tee_rows_frame() output
+(nullable Int16 hole columns, Int32 totals, NaN for missing text) for courses
+spread over every state, exports them with export_csv and export_parquet into a
+temporary directory, and reads each back the way an analyst would. Needs pyarrow.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "Lake Jovita"
+    ),
+)
+
+import numpy as np
+import pandas as pd
+
+from exporters import export_csv, export_parquet, pa
+from lake_jovita_south_scraper import OUTPUT_COLUMNS
+
+STATES = [
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL",
+    "IN", "IA", "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT",
+    "NE", "NV", "NH", "NJ", "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI",
+    "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+]  # fmt: skip
+TEES = ["Black", "Gold", "Blue", "White", "Red"]
+
+
+def make_course_rows(n_courses, n_tees=4, seed=0):
+    rng = np.random.default_rng(seed)
+    n_rows = n_courses * n_tees
+    course = np.repeat(np.arange(n_courses), n_tees)
+    tee_position = np.tile(np.arange(n_tees), n_courses)
+
+    def ints(values, dtype="Int32"):
+        return pd.array(values, dtype=dtype)
+
+    columns = {col: np.full(n_rows, np.nan, dtype=object) for col in OUTPUT_COLUMNS}
+    columns.update(
+        {
+            "CourseTeeNumber": [f"{c}-{t}" for c, t in zip(course, tee_position)],
+            "CourseName": [f"Synthetic Course {c}" for c in course],
+            "City": [f"City {c % 2000}" for c in course],
+            "StateorRegion": np.array(STATES)[course % len(STATES)],
+            "Country": ["USA"] * n_rows,
+            "URL": [f"https://example-golf.com/course-{c}/" for c in course],
+            "TotalHoles": ints(np.full(n_rows, 18)),
+            "TeeNumber": ints(tee_position + 1),
+            "TeeName": np.array(TEES)[tee_position],
+            "Holes_Total": ints(np.full(n_rows, 18)),
+            "Rating": pd.array(
+                np.round(rng.uniform(66, 76, n_rows), 1), dtype="Float64"
+            ),
+            "Slope": ints(rng.integers(110, 150, n_rows)),
+        }
+    )
+    pars = rng.choice([3, 4, 4, 4, 5], size=(n_courses, 18))
+    base = {3: 190, 4: 420, 5: 540}
+    for hole in range(18):
+        par = np.repeat(pars[:, hole], n_tees)
+        longest = np.vectorize(base.get)(par) + rng.integers(-30, 30, n_rows)
+        columns[f"Par_{hole + 1}"] = ints(par, "Int16")
+        columns[f"Hole_{hole + 1}"] = ints(longest - 25 * tee_position, "Int16")
+
+    def nine(prefix, holes):
+        return ints(sum(columns[f"{prefix}_{h}"].astype("Int32") for h in holes))
+
+    out = nine("Hole", range(1, 10))
+    back = nine("Hole", range(10, 19))
+    columns["Tot_Out_Par"] = nine("Par", range(1, 10))
+    columns["Tot_In_Par"] = nine("Par", range(10, 19))
+    columns["Par_Overall"] = columns["Tot_Out_Par"] + columns["Tot_In_Par"]
+    columns["Tot_Out_Ydg"] = out
+    columns["Tot_In_Ydg"] = back
+    columns["Length_Total"] = out + back
+    return pd.DataFrame(columns, columns=OUTPUT_COLUMNS)
+
+
+def dir_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def timed(action):
+    start = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=100000)
+    parser.add_argument("--tees", type=int, default=4)
+    args = parser.parse_args()
+    if pa is None:
+        sys.exit("pyarrow is required for this benchmark.")
+
+    df = make_course_rows(args.courses, args.tees)
+    print(f"{args.courses:,} courses, {len(df):,} tee rows\n")
+    tmp_dir = tempfile.mkdtemp(prefix="bench_export_")
+    csv_path = os.path.join(tmp_dir, "golf_data.csv")
+    parquet_root = os.path.join(tmp_dir, "golf_data_parquet")
+    try:
+        _, csv_write = timed(lambda: export_csv(df, csv_path))
+        _, parquet_write = timed(lambda: export_parquet(df, parquet_root))
+        csv_df, csv_read = timed(lambda: pd.read_csv(csv_path))
+        parquet_df, parquet_read = timed(lambda: pd.read_parquet(parquet_root))
+        arrow_df, arrow_read = timed(
+            lambda: pd.read_parquet(parquet_root, dtype_backend="pyarrow"),
+        )
+        _, state_read = timed(
+            lambda: pd.read_parquet(parquet_root, filters=[("state", "=", "FL")]),
+        )
+
+        print(
+            f"\n  {'format':<10} {'write s':>9} {'read s':>9} "
+            f"{'size MB':>9} {'in-memory MB':>13}"
+        )
+        for label, write_s, read_s, path, frame in (
+            ("csv", csv_write, csv_read, csv_path, csv_df),
+            ("parquet", parquet_write, parquet_read, parquet_root, parquet_df),
+            ("parquet*", parquet_write, arrow_read, parquet_root, arrow_df),
+        ):
+            print(
+                f"  {label:<10} {write_s:9.2f} {read_s:9.2f} "
+                f"{dir_size(path) / 1e6:9.1f} "
+                f"{frame.memory_usage(deep=True).sum() / 1e6:13.1f}"
+            )
+        print('  * read with dtype_backend="pyarrow" (no conversion to objects)')
+        print(f"\n  parquet read of one state partition: {state_read:.3f}s")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Rows/second for the bulk insert_golf_data loader vs. the old row-by-row path.
+
+Usage:
+    python benchmarks/bench_insert_golf_data.py [--sizes 10000,1000000]
+
+Needs the DB_* settings from .env pointing at a PostgreSQL you can write to.
+Rows go into a TEMP copy of golf_data_entries, so nothing is left behind.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "Lake Jovita"
+    ),
+)
+
+import pandas as pd
+
+from lake_jovita_south_scraper import (
+    INT_COLUMNS,
+    OUTPUT_COLUMNS,
+    connect_db,
+    create_golf_data_table,
+    insert_golf_data,
+)
+
+BENCH_TABLE = "golf_data_entries_bench"
+
+
+def make_tee_rows(n_rows):
+    """Synthetic tee rows shaped like build_tee_rows() output (strings and "N/A")."""
+    data = {}
+    for col in OUTPUT_COLUMNS:
+        if col.startswith("Par_") and col != "Par_Overall":
+            data[col] = ["4"] * n_rows
+        elif col.startswith("Hole_"):
+            data[col] = [str(300 + i % 250) for i in range(n_rows)]
+        elif col in INT_COLUMNS:
+            data[col] = [str(i % 100) for i in range(n_rows)]
+        elif col == "Rating":
+            data[col] = ["72.1"] * n_rows
+        else:
+            data[col] = ["N/A"] * n_rows
+    data["CourseName"] = [f"Course {i // 4}" for i in range(n_rows)]
+    return pd.DataFrame(data, columns=OUTPUT_COLUMNS)
+
+
+def insert_golf_data_rowwise(conn, df_data, table_name):
+    """The original iterrows()/executemany implementation, kept for comparison."""
+    cursor = conn.cursor()
+    cols = ", ".join(OUTPUT_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(OUTPUT_COLUMNS))
+    insert_sql = f"INSERT INTO {table_name} ({cols}) VALUES ({placeholders})"
+
+    data_to_insert = []
+    for index, row in df_data.iterrows():
+        row_values = []
+        for col in OUTPUT_COLUMNS:
+            value = row[col]
+            if value == "N/A":
+                row_values.append(None)
+            elif col in INT_COLUMNS:
+                try:
+                    row_values.append(int(value))
+                except ValueError:
+                    row_values.append(None)
+            elif col == "Rating":
+                try:
+                    row_values.append(float(value))
+                except ValueError:
+                    row_values.append(None)
+            else:
+                row_values.append(value)
+        data_to_insert.append(tuple(row_values))
+
+    cursor.executemany(insert_sql, data_to_insert)
+    conn.commit()
+    cursor.close()
+
+
+def time_load(conn, label, load, n_rows):
+    cursor = conn.cursor()
+    cursor.execute(f"TRUNCATE {BENCH_TABLE}")
+    conn.commit()
+    cursor.close()
+
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<16} {elapsed:9.2f}s  {n_rows / elapsed:12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,1000000")
+    args = parser.parse_args()
+
+    conn = connect_db()
+    if not conn or not create_golf_data_table(conn):
+        sys.exit("A writable PostgreSQL is required for this benchmark.")
+
+    cursor = conn.cursor()
+    cursor.execute(
+        f"CREATE TEMP TABLE {BENCH_TABLE} (LIKE golf_data_entries INCLUDING DEFAULTS)"
+    )
+    conn.commit()
+    cursor.close()
+
+    try:
+        for n_rows in (int(size) for size in args.sizes.split(",")):
+            df = make_tee_rows(n_rows)
+            print(f"\n{n_rows:,} tee rows")
+            time_load(
+                conn,
+                "rowwise",
+                lambda: insert_golf_data_rowwise(conn, df, BENCH_TABLE),
+                n_rows,
+            )
+            time_load(
+                conn,
+                "execute_values",
+                lambda: insert_golf_data(conn, df, BENCH_TABLE, method="values"),
+                n_rows,
+            )
+            time_load(
+                conn,
+                "copy",
+                lambda: insert_golf_data(conn, df, BENCH_TABLE, method="copy"),
+                n_rows,
+            )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Pages/second for the course page parsers, single process and in a process pool.
+
+Usage:
+    python benchmarks/bench_parse.py [--pages 200] [--workers 1,2,4] [--chunk 16]
+
+Compares the old path (html.parser, with every hole pane re-parsed from its
+string), one BeautifulSoup parse per page, the lxml parser, and parse_pages()
+chunks spread over a ProcessPoolExecutor. Pages are synthetic; no network.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "Lake Jovita"
+    ),
+)
+
+from bs4 import BeautifulSoup
+
+from course_pages import make_course_page
+from parsers import (
+    LakeJovitaParser,
+    extract_course_name,
+    find_hole_tabs,
+    lxml,
+    make_hole_record,
+    parse_hole_pane,
+    parse_pages,
+)
+from pipeline import process_context
+
+URL = "https://lakejovita.com/bench-course"
+
+
+def parse_per_pane(html):
+    """The original static path: every hole pane is serialized and re-parsed."""
+    soup = BeautifulSoup(html, "html.parser")
+    course_name = extract_course_name(soup)
+    hole_records = []
+    for hole_number_text, target_div_id in find_hole_tabs(soup):
+        hole_pane = soup.find(id=target_div_id)
+        if hole_pane is None:
+            continue
+        hole_soup = BeautifulSoup(str(hole_pane), "html.parser")
+        hole_par, hole_yardages = parse_hole_pane(hole_soup)
+        hole_records.append(
+            make_hole_record(course_name, hole_number_text, hole_par, hole_yardages)
+        )
+    return course_name, hole_records, []
+
+
+def _silence_worker():
+    sys.stdout = open(os.devnull, "w")
+
+
+def time_parser(label, parse, pages):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for html in pages:
+            parse(html)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<20} {len(pages) / elapsed:10,.1f} pages/s")
+
+
+def time_pool(workers, pages, chunk):
+    batch = [("lake_jovita", f"{URL}-{i}", html, None) for i, html in enumerate(pages)]
+    chunks = [batch[i : i + chunk] for i in range(0, len(batch), chunk)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=process_context(), initializer=_silence_worker
+    ) as pool:
+        parsed = sum(len(results) for results in pool.map(parse_pages, chunks))
+    elapsed = time.perf_counter() - start
+    rate = parsed / elapsed
+    print(
+        f"  {f'pool x{workers}':<20} {rate:10,.1f} pages/s"
+        f"  {rate / workers:8,.1f} pages/s/core"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--chunk", type=int, default=16)
+    args = parser.parse_args()
+
+    pages = [make_course_page(i) for i in range(args.pages)]
+    course_parser = LakeJovitaParser()
+    print(f"{args.pages} pages, {os.cpu_count()} CPUs")
+
+    time_parser("bs4 per-pane", parse_per_pane, pages)
+    time_parser("bs4 single parse", course_parser._parse_soup, pages)
+    if lxml is not None:
+        time_parser("lxml", course_parser.parse, pages)
+        time_parser("lxml + fingerprint", course_parser.parse_if_changed, pages)
+    else:
+        print("  lxml                 not installed")
+    for workers in (int(n) for n in args.workers.split(",")):
+        time_pool(workers, pages, args.chunk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""Offline per-stage and end-to-end throughput, saved as JSON for comparison.
+
+Usage:
+    python benchmarks/bench_suite.py [--pages 200] [--repeat 3] [--no-db]
+                                     [--output PATH] [--compare BASELINE.json]
+                                     [--threshold 0.15]
+    python benchmarks/bench_suite.py --record
+
+Every fixture is served from a local HTTP server, so no network or browser is
+needed. Fixtures are the recorded pages in benchmarks/fixtures/*.html (--record
+saves the live South Course page there; commit it so every run measures the
+same markup) plus synthetic pages with 9, 18 and 27 holes and different tee
+sets. For each fixture the suite times, best of --repeat:
+
+    fetch    fetch_page_html() over HTTP from the local server
+    parse    the lake_jovita parser, one page at a time in this process
+    build    build_tee_rows_batch() in chunks of 16 courses
+    insert   insert_golf_data() into a TEMP table (skipped without a database)
+    csv      export_csv() to a temporary file
+    e2e      run_courses() with a sink that inserts and writes CSV
+
+Results go to benchmarks/results/<commit>.json (or --output). With --compare,
+stages whose throughput fell by more than --threshold against the baseline are
+listed and the exit status is 1.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "scripts", "Lake Jovita"))
+
+# Read at import time by the scraper and instrumentation modules.
+os.environ["HTTP_CACHE"] = "off"
+os.environ.setdefault("METRICS_JSONL", "off")
+os.environ.setdefault("METRICS_PROM", "off")
+
+from course_pages import TEE_NAMES, FixtureServer, make_course_page
+from course_runner import run_courses
+from exporters import export_csv
+from instrumentation import configure_logging
+from lake_jovita_south_scraper import (
+    HEADERS,
+    URL,
+    build_tee_rows_batch,
+    connect_db,
+    create_golf_data_table,
+    fetch_page_html,
+    insert_golf_data,
+)
+from parsers import get_parser
+from pipeline import chunked
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BENCH_TABLE = "golf_data_entries_bench"
+PROFILE = "lake_jovita"
+BUILD_CHUNK = 16
+
+SYNTHETIC_FIXTURES = {
+    "synthetic_9_holes_3_tees": {"n_holes": 9, "tees": ["Blue", "White", "Red"]},
+    "synthetic_18_holes_4_tees": {"n_holes": 18, "tees": TEE_NAMES[:4]},
+    "synthetic_18_holes_6_tees": {
+        "n_holes": 18,
+        "tees": ["Tips", "Black", "Gold", "Blue", "White", "Forward"],
+    },
+    "synthetic_27_holes_5_tees": {"n_holes": 27, "tees": TEE_NAMES},
+    "synthetic_yardage_variants": {
+        "n_holes": 18,
+        "tees": ["Black/Gold", "Blue", "Combo-White", "Red"],
+        "unit": " yds",
+        "trailing_pipe": True,
+    },
+}
+
+
+def load_fixtures(n_pages):
+    """{fixture name: [html per page]}; recorded pages repeat one document."""
+    fixtures = {}
+    if os.path.isdir(FIXTURE_DIR):
+        for name in sorted(os.listdir(FIXTURE_DIR)):
+            if name.endswith(".html"):
+                with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+                    fixtures[name[: -len(".html")]] = [f.read()] * n_pages
+    if not fixtures:
+        print(f"No recorded fixtures in {FIXTURE_DIR}; run with --record to add one.")
+    for name, spec in SYNTHETIC_FIXTURES.items():
+        fixtures[name] = [make_course_page(i, **spec) for i in range(n_pages)]
+    return fixtures
+
+
+def record_fixture():
+    import requests
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    response = requests.get(URL, headers=HEADERS, timeout=30)
+    response.raise_for_status()
+    path = os.path.join(FIXTURE_DIR, "south_course.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(response.text)
+    print(f"Recorded {URL} ({len(response.text):,} characters) to {path}")
+
+
+def serve_fixtures(fixtures):
+    """Serve fixture page i of name at /name/i/ from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            try:
+                name, index = self.path.strip("/").split("/")
+                body = fixtures[name][int(index)].encode("utf-8")
+            except (KeyError, IndexError, ValueError):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = FixtureServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def best_of(repeat, action, setup=None):
+    """(result of the fastest run, its seconds); setup runs untimed before each."""
+    best = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = action()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[1]:
+            best = (result, elapsed)
+    return best
+
+
+def stage_result(items, unit, seconds, **extra):
+    return {
+        "items": items,
+        "unit": unit,
+        "seconds": round(seconds, 6),
+        "per_s": round(items / seconds, 3) if seconds else None,
+        **extra,
+    }
+
+
+def bench_fixture(name, urls, args, db_conn, tmp_dir):
+    results = {}
+    parser = get_parser(profile=PROFILE)
+    csv_path = os.path.join(tmp_dir, f"{name}.csv")
+
+    def fetch_all():
+        with ThreadPoolExecutor(max_workers=args.fetch_workers) as pool:
+            return list(pool.map(fetch_page_html, urls))
+
+    pages, seconds = best_of(args.repeat, fetch_all)
+    results["fetch"] = stage_result(
+        len(pages), "pages", seconds, bytes=sum(len(page) for page in pages)
+    )
+
+    parsed, seconds = best_of(args.repeat, lambda: [parser.parse(p) for p in pages])
+    results["parse"] = stage_result(len(parsed), "pages", seconds)
+    courses = [
+        (course_name, url, hole_records)
+        for url, (course_name, hole_records, _) in zip(urls, parsed)
+    ]
+    hole_numbers = [
+        record["Hole Number"]
+        for _, _, hole_records in courses
+        for record in hole_records
+    ]
+
+    def build_all():
+        return [build_tee_rows_batch(chunk) for chunk in chunked(courses, BUILD_CHUNK)]
+
+    frames, seconds = best_of(args.repeat, build_all)
+    df = pd.concat(frames, ignore_index=True)
+    results["build"] = stage_result(
+        len(courses),
+        "courses",
+        seconds,
+        tee_rows=len(df),
+        holes_parsed=len(hole_numbers),
+        # The wide tee-row layout only has columns for holes 1-18.
+        holes_without_columns=sum(
+            number.isdigit() and int(number) > 18 for number in hole_numbers
+        ),
+    )
+
+    if db_conn is not None:
+
+        def truncate():
+            cursor = db_conn.cursor()
+            cursor.execute(f"TRUNCATE {BENCH_TABLE}")
+            db_conn.commit()
+            cursor.close()
+
+        _, seconds = best_of(
+            args.repeat,
+            lambda: insert_golf_data(db_conn, df, BENCH_TABLE),
+            setup=truncate,
+        )
+        results["insert"] = stage_result(len(df), "rows", seconds)
+    else:
+        results["insert"] = {"skipped": args.db_skip_reason}
+
+    _, seconds = best_of(args.repeat, lambda: export_csv(df, csv_path))
+    results["csv"] = stage_result(
+        len(df), "rows", seconds, bytes=os.path.getsize(csv_path)
+    )
+
+    def sink(chunk, fingerprints):
+        if db_conn is not None:
+            insert_golf_data(db_conn, chunk, BENCH_TABLE)
+        export_csv(chunk, csv_path, append=True)
+
+    def end_to_end():
+        if os.path.exists(csv_path):
+            os.remove(csv_path)
+        run_courses(
+            [{"url": url, "profile": PROFILE} for url in urls],
+            fetch_workers=args.fetch_workers,
+            parse_workers=args.parse_workers,
+            host_delay=0,
+            use_browser=False,
+            on_rows=sink,
+        )
+
+    _, seconds = best_of(args.repeat, end_to_end)
+    results["e2e"] = stage_result(
+        len(urls), "courses", seconds, includes_insert=db_conn is not None
+    )
+    return results
+
+
+def git_commit():
+    def git(*command):
+        return subprocess.run(
+            ["git", *command], cwd=BENCH_DIR, capture_output=True, text=True
+        ).stdout.strip()
+
+    return git("rev-parse", "--short", "HEAD") or "unknown", bool(
+        git("status", "--porcelain", "--untracked-files=no")
+    )
+
+
+def compare(baseline, current, threshold):
+    """Print per-stage throughput changes; returns the regressed stages."""
+    print(
+        f"\nAgainst {baseline.get('commit', '?')} "
+        f"(regression: more than {threshold:.0%} slower)"
+    )
+    print(
+        f"  {'fixture':<28} {'stage':<7} {'baseline/s':>11} {'now/s':>11} {'change':>8}"
+    )
+    regressions = []
+    for fixture, stages in current["results"].items():
+        for stage, result in stages.items():
+            before = baseline.get("results", {}).get(fixture, {}).get(stage, {})
+            if not result.get("per_s") or not before.get("per_s"):
+                continue
+            change = result["per_s"] / before["per_s"] - 1
+            flag = ""
+            if change < -threshold:
+                flag = "  REGRESSION"
+                regressions.append((fixture, stage, change))
+            print(
+                f"  {fixture:<28} {stage:<7} {before['per_s']:11,.1f} "
+                f"{result['per_s']:11,.1f} {change:+8.1%}{flag}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200, help="Pages per fixture")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--parse-workers", type=int, default=2)
+    parser.add_argument("--no-db", action="store_true", help="Skip the insert stage")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument(
+        "--record", action="store_true", help="Save the live South Course page"
+    )
+    args = parser.parse_args()
+    configure_logging("WARNING")
+
+    if args.record:
+        record_fixture()
+        return
+
+    db_conn = None
+    args.db_skip_reason = "--no-db"
+    if not args.no_db:
+        args.db_skip_reason = "no PostgreSQL at the DB_* settings"
+        if os.getenv("DB_NAME"):
+            db_conn = connect_db()
+        if db_conn is not None and create_golf_data_table(db_conn):
+            cursor = db_conn.cursor()
+            cursor.execute(
+                f"CREATE TEMP TABLE {BENCH_TABLE} "
+                "(LIKE golf_data_entries INCLUDING DEFAULTS)"
+            )
+            db_conn.commit()
+            cursor.close()
+        elif db_conn is not None:
+            db_conn.close()
+            db_conn = None
+
+    fixtures = load_fixtures(args.pages)
+    server = serve_fixtures(fixtures)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    tmp_dir = tempfile.mkdtemp(prefix="bench_suite_")
+    commit, dirty = git_commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            key: getattr(args, key)
+            for key in ("pages", "repeat", "fetch_workers", "parse_workers")
+        },
+        "results": {},
+    }
+    try:
+        for name, pages in fixtures.items():
+            print(f"Benchmarking {name} ({len(pages)} pages)...")
+            urls = [f"{base}/{name}/{i}/" for i in range(len(pages))]
+            report["results"][name] = bench_fixture(name, urls, args, db_conn, tmp_dir)
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if db_conn is not None:
+            db_conn.close()
+
+    print(
+        f"\n  {'fixture':<28} {'stage':<7} {'items':>7} {'seconds':>9} {'per second':>12}"
+    )
+    for name, stages in report["results"].items():
+        for stage, result in stages.items():
+            if "skipped" in result:
+                print(f"  {name:<28} {stage:<7} skipped: {result['skipped']}")
+                continue
+            print(
+                f"  {name:<28} {stage:<7} {result['items']:7,} "
+                f"{result['seconds']:9.3f} {result['per_s']:9,.1f} {result['unit']}"
+            )
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
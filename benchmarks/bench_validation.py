@@ -0,0 +1,117 @@
+"""Rows/second for validate_tee_rows() next to prepare_golf_data_frame().
+
+Usage:
+    python benchmarks/bench_validation.py [--courses 5000] [--bad 0.01]
+
+Builds tee rows for synthetic 18-hole, 4-tee course pages with course_model,
+breaks a --bad fraction of them (a par of 9, a wrong Length_Total, a slope of
+200, a missing yardage) and times validation on the typed frame the crawler
+loads and on the same rows as "N/A"-filled strings, as a CSV of the old rows
+would give. prepare_golf_data_frame(), which every load already runs, is timed
+alongside for scale. Exits with status 1 if validation misses a broken row or
+flags a good one.
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "Lake Jovita"
+    ),
+)
+os.environ.setdefault("METRICS_JSONL", "off")
+
+import numpy as np
+import pandas as pd
+
+from course_model import DEFAULT_TEES
+from course_pages import make_course_page
+from lake_jovita_south_scraper import build_tee_rows_batch, prepare_golf_data_frame
+from parsers import LakeJovitaParser
+from validation import validate_tee_rows
+
+URL = "https://lakejovita.com/bench-course-{}/"
+
+
+def best_of(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def break_rows(df, fraction, seed=0):
+    """Copy of df with fraction of its rows broken one way or another."""
+    df = df.copy()
+    rng = np.random.default_rng(seed)
+    bad = rng.choice(len(df), size=max(1, int(len(df) * fraction)), replace=False)
+    for n, row in enumerate(bad):
+        kind = n % 4
+        if kind == 0:
+            df.loc[row, "Par_5"] = 9
+        elif kind == 1:
+            df.loc[row, "Length_Total"] += 10
+        elif kind == 2:
+            df.loc[row, "Slope"] = 200
+        else:
+            df.loc[row, "Hole_12"] = pd.NA
+    return df, set(bad)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=5000)
+    parser.add_argument("--bad", type=float, default=0.01)
+    args = parser.parse_args()
+    # The timing loops would log the same quarantine warning on every call.
+    logging.getLogger("validation").setLevel(logging.ERROR)
+
+    course_parser = LakeJovitaParser()
+    courses = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.courses):
+            html = make_course_page(i, tees=DEFAULT_TEES)
+            course_name, hole_records, _ = course_parser.parse(html)
+            courses.append((course_name, URL.format(i), hole_records))
+    typed, broken = break_rows(build_tee_rows_batch(courses), args.bad)
+    text = typed.astype(object).where(typed.notna(), "N/A").astype(str)
+
+    failures = []
+    print(f"{len(typed):,} tee rows, {len(broken):,} broken\n")
+    print(f"  {'frame':<8} {'validate rows/s':>16} {'prepare rows/s':>15}")
+    for label, df in (("typed", typed), ("text", text)):
+        _, quarantined = validate_tee_rows(df)
+        # A broken Length_Total can also take the rest of its course with it
+        # ("yardage order"), so only rows of other courses must pass.
+        missed = broken - set(quarantined.index)
+        bad_urls = set(df["URL"].iloc[sorted(broken)])
+        flagged = set(quarantined.index[~quarantined["URL"].isin(bad_urls)])
+        if missed or flagged:
+            failures.append(
+                f"{label}: {len(missed)} broken rows passed, {len(flagged)} good "
+                "rows quarantined"
+            )
+        validate_s = best_of(lambda: validate_tee_rows(df))
+        prepare_s = best_of(lambda: prepare_golf_data_frame(df))
+        print(
+            f"  {label:<8} {len(df) / validate_s:16,.0f} {len(df) / prepare_s:15,.0f}"
+        )
+
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nOK: every broken row was quarantined and every other course passed.")
+
+
+if __name__ == "__main__":
+    main()
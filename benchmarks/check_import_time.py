@@ -0,0 +1,99 @@
+"""Check that main.py's quick subcommands start without the heavy dependencies.
+
+Usage:
+    python benchmarks/check_import_time.py [--budget-ms 50] [--repeat 5]
+
+Runs `main.py --help`, `main.py settings` and `main.py stats` under
+`python -X importtime` and, from the best of --repeat runs, adds up the import
+time of every module the command loads beyond what a bare interpreter already
+imports (site-packages .pth hooks and the like are not ours to count). Exits
+with status 1 if a command imports one of HEAVY_MODULES or its imports take
+longer than --budget-ms milliseconds.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MAIN = os.path.join(ROOT, "main.py")
+
+COMMANDS = (["--help"], ["settings"], ["stats"])
+HEAVY_MODULES = (
+    "bs4",
+    "lxml",
+    "numpy",
+    "pandas",
+    "psycopg2",
+    "pyarrow",
+    "requests",
+    "selenium",
+    "webdriver_manager",
+)
+
+
+def import_times(args, cwd):
+    """{module: self microseconds} from one `python -X importtime` run."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            times[module.strip()] = int(self_us)
+    return times
+
+
+def measure(command, baseline, repeat, cwd):
+    """(best total ms, modules loaded) for main.py command."""
+    best = None
+    for _ in range(repeat):
+        times = import_times([MAIN, *command], cwd)
+        ours = {m: us for m, us in times.items() if m not in baseline}
+        total_ms = sum(ours.values()) / 1000
+        if best is None or total_ms < best[0]:
+            best = (total_ms, ours)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = import_times(["-c", "pass"], ROOT)
+    failures = []
+    # An empty directory, so stats finds no crawl state or metrics of a real run.
+    with tempfile.TemporaryDirectory() as cwd:
+        for command in COMMANDS:
+            total_ms, modules = measure(command, baseline, args.repeat, cwd)
+            heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+            slowest = sorted(modules.items(), key=lambda item: -item[1])[:3]
+            name = " ".join(command)
+            print(
+                f"  {name:<10} {total_ms:7.1f} ms {len(modules):4} modules   slowest: "
+                + ", ".join(f"{m} {us / 1000:.1f} ms" for m, us in slowest)
+            )
+            if heavy:
+                failures.append(f"{name} imports {', '.join(heavy[:5])}")
+            if total_ms > args.budget_ms:
+                failures.append(f"{name} took {total_ms:.1f} ms")
+
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"\nOK: every command imported in under {args.budget_ms:g} ms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Check that course_runner's peak memory does not grow with the crawl size.
+
+Usage:
+    python benchmarks/check_pipeline_memory.py [--small 500] [--large 4000]
+                                               [--tolerance 1.5]
+
+Serves synthetic course pages from a local HTTP server, then runs
+run_courses() over --small and --large manifests, each in a fresh process with
+a sink that discards the tee rows. Exits with status 1 if the peak RSS of the
+large run (runner process and its largest parser process) exceeds the small
+run's by more than --tolerance, which is what happens when a stage gathers
+every course before handing it on.
+
+Parse workers come from a forkserver, so they are not children of the runner
+and RUSAGE_CHILDREN never sees them. Instead the runner's descendants are
+found in /proc while it runs and each one's VmHWM (peak RSS) is sampled, which
+makes the check Linux-only.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "Lake Jovita"
+    ),
+)
+
+from course_pages import FixtureServer, make_course_page
+
+
+class CoursePageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            course_index = int(self.path.strip("/").split("-")[1])
+        except (IndexError, ValueError):
+            self.send_error(404)
+            return
+        body = make_course_page(course_index).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def descendants(pid):
+    """Pids of every process below pid, found through /proc/<pid>/stat."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # "pid (comm) state ppid ..."; comm may contain spaces.
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def peak_rss_kib(pid):
+    """VmHWM of pid in KiB, or 0 once it has exited."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class WorkerPeakSampler:
+    """Largest peak RSS among this process's descendants, sampled every interval."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak_kib = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        for pid in descendants(os.getpid()):
+            self.peak_kib = max(self.peak_kib, peak_rss_kib(pid))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_child(n_courses, port):
+    os.environ["HTTP_CACHE"] = "off"
+    from course_runner import run_courses
+
+    courses = [
+        {"url": f"http://127.0.0.1:{port}/course-{i}/", "profile": "lake_jovita"}
+        for i in range(n_courses)
+    ]
+    tee_rows = 0
+
+    def discard(df, fingerprints):
+        nonlocal tee_rows
+        tee_rows += len(df)
+
+    start = time.perf_counter()
+    with WorkerPeakSampler() as workers, contextlib.redirect_stdout(io.StringIO()):
+        run_courses(
+            courses,
+            parse_workers=2,
+            host_delay=0,
+            use_browser=False,
+            on_rows=discard,
+        )
+    elapsed = time.perf_counter() - start
+    if not workers.peak_kib:
+        raise RuntimeError("No parse worker was seen; the parser check cannot run.")
+    # ru_maxrss is in KiB on Linux, like VmHWM.
+    result = {
+        "courses": n_courses,
+        "tee_rows": tee_rows,
+        "seconds": elapsed,
+        "runner_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "parser_kib": workers.peak_kib,
+    }
+    print(json.dumps(result))
+
+
+def measure(n_courses, port):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", str(n_courses)]
+        + ["--port", str(port)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--small", type=int, default=500)
+    parser.add_argument("--large", type=int, default=4000)
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_child(args.child, args.port)
+        return
+
+    server = FixtureServer(("127.0.0.1", 0), CoursePageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        results = [
+            measure(n, server.server_address[1]) for n in (args.small, args.large)
+        ]
+    finally:
+        server.shutdown()
+
+    print(
+        f"  {'courses':>8} {'tee rows':>9} {'seconds':>8} {'runner MB':>10} "
+        f"{'parser MB':>10}"
+    )
+    for r in results:
+        print(
+            f"  {r['courses']:8,} {r['tee_rows']:9,} {r['seconds']:8.1f} "
+            f"{r['runner_kib'] / 1024:10.1f} {r['parser_kib'] / 1024:10.1f}"
+        )
+
+    small, large = results
+    failures = [
+        key
+        for key in ("runner_kib", "parser_kib")
+        if large[key] > small[key] * args.tolerance
+    ]
+    if failures:
+        print(f"\nFAIL: peak RSS grew more than {args.tolerance}x: {failures}")
+        sys.exit(1)
+    print(f"\nOK: peak RSS stayed within {args.tolerance}x of the small run.")
+
+
+if __name__ == "__main__":
+    main()
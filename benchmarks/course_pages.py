@@ -0,0 +1,73 @@
+"""Synthetic course pages in the Lake Jovita (Avada/Fusion tabs) markup.
+
+Shared by the benchmarks so they can run without the network or a browser.
+"""
+
+import random
+from http.server import ThreadingHTTPServer
+
+TEE_NAMES = ["Black", "Gold", "Blue", "White", "Red"]
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer for serving pages to concurrent fetch workers."""
+
+    # The default listen backlog of 5 drops concurrent connects, which then wait
+    # a full second for a SYN retry and swamp the fetch timings.
+    request_queue_size = 128
+
+
+def make_course_page(
+    course_index,
+    n_holes=18,
+    n_tees=4,
+    missing_panes=0,
+    seed=None,
+    tees=None,
+    unit="",
+    trailing_pipe=False,
+):
+    """HTML for one course; the last missing_panes hole panes are left out.
+
+    tees names the tee set, longest first; by default the first n_tees of
+    TEE_NAMES. unit (e.g. " yds") follows every yardage and trailing_pipe ends
+    each yardage list with "|", as some course pages write them.
+    """
+    rng = random.Random(course_index if seed is None else seed)
+    tees = tees or TEE_NAMES[:n_tees]
+
+    tab_links = []
+    panes = []
+    for hole in range(1, n_holes + 1):
+        par = rng.choice((3, 4, 4, 4, 5))
+        longest = {3: 190, 4: 430, 5: 560}[par] + rng.randint(-30, 30)
+        yardages = " | ".join(
+            f"{tee}: {longest - 25 * position}{unit}"
+            for position, tee in enumerate(tees)
+        ) + (" |" if trailing_pipe else "")
+        tab_links.append(
+            f'<li><a class="tab-link" href="#tab-{hole}"><h4>Hole {hole}</h4></a></li>'
+        )
+        if hole > n_holes - missing_panes:
+            continue
+        panes.append(
+            f'<div class="tab-pane" id="tab-{hole}">'
+            f"<h3>Par {par} – {longest} Yards</h3>"
+            f"<p>Handicap: {rng.randint(1, 18)}</p>"
+            f"<p>{yardages}</p>"
+            f"</div>"
+        )
+
+    filler = "".join(
+        f"<p>Course news item {i} for course {course_index}.</p>" for i in range(40)
+    )
+    return (
+        "<html><head><title>Course</title>"
+        f"<script>var nonce = '{rng.getrandbits(64):x}';</script></head><body>"
+        f'<div class="fusion-text fusion-text-1"><p>COURSE {course_index}.</p></div>'
+        f"{filler}"
+        '<div class="fusion-tabs"><div class="nav"><ul class="nav-tabs">'
+        f"{''.join(tab_links)}</ul></div>"
+        f'<div class="tab-content">{"".join(panes)}</div></div>'
+        "</body></html>"
+    )
@@ -0,0 +1,182 @@
+"""p50/p99 latency and requests/second for the query_api read API.
+
+Usage:
+    python benchmarks/load_test_api.py [--standin-courses 5000]
+                                       [--requests 5000] [--concurrency 32]
+    python benchmarks/load_test_api.py --base-url http://127.0.0.1:8000
+
+Without --base-url, builds a SQLite stand-in of golf_data_entries from
+synthetic courses and serves query_api on a local port with uvicorn. Requests
+mix course searches, course cards (skewed towards a hot set so the card cache
+is exercised) and hole searches that follow one "next" cursor.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlparse
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "Lake Jovita"
+    ),
+)
+
+from bench_export import STATES, make_course_rows
+
+
+def build_standin(path, n_courses):
+    df = make_course_rows(n_courses)
+    df["scrape_date"] = "2024-01-01 00:00:00"
+    df.insert(0, "id", range(1, len(df) + 1))
+    conn = sqlite3.connect(path)
+    df.to_sql("golf_data_entries", conn, index=False, if_exists="replace")
+    conn.execute(
+        "CREATE INDEX golf_data_entries_latest_idx "
+        "ON golf_data_entries (URL, TeeName, scrape_date DESC, id DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX golf_data_entries_scrape_date_idx "
+        "ON golf_data_entries (scrape_date)"
+    )
+    conn.commit()
+    conn.close()
+    return df["URL"].unique().tolist()
+
+
+def start_server(database, port):
+    os.environ["API_DATABASE"] = database
+    import uvicorn
+
+    import query_api
+
+    config = uvicorn.Config(
+        query_api.create_app(database), host="127.0.0.1", port=port, log_level="error"
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+_local = threading.local()
+
+
+def get(base, path, params):
+    """GET on a keep-alive connection owned by the calling thread."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = http.client.HTTPConnection(base.hostname, base.port)
+    start = time.perf_counter()
+    conn.request("GET", f"{path}?{urlencode(params)}")
+    response = conn.getresponse()
+    body = response.read()
+    elapsed = time.perf_counter() - start
+    if response.status != 200:
+        raise RuntimeError(f"{path} returned {response.status}: {body[:200]}")
+    return json.loads(body), elapsed
+
+
+def make_request(base, urls, rng):
+    kind = rng.choices(["courses", "card", "holes"], weights=[3, 5, 2])[0]
+    if kind == "courses":
+        _, elapsed = get(
+            base,
+            "/courses",
+            {"name": f"course {rng.randint(1, 99)}", "state": rng.choice(STATES)},
+        )
+        return [("courses", elapsed)]
+    if kind == "card":
+        hot = urls[: max(1, len(urls) // 100)]  # 1% of courses get 80% of reads
+        url = rng.choice(hot) if rng.random() < 0.8 else rng.choice(urls)
+        _, elapsed = get(base, "/courses/card", {"url": url})
+        return [("card", elapsed)]
+    params = {"par": 3, "min_yards": 150, "max_yards": 200, "limit": 50}
+    params["state"] = rng.choice(STATES)
+    page, first = get(base, "/holes", params)
+    timings = [("holes", first)]
+    if page["next"]:
+        _, elapsed = get(base, "/holes", dict(params, after=page["next"]))
+        timings.append(("holes next page", elapsed))
+    return timings
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--standin-courses", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url:
+        base = urlparse(args.base_url)
+        first_page, _ = get(base, "/courses", {"limit": 500})
+        urls = [item["url"] for item in first_page["items"]]
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix="load_test_api_")
+        db_path = os.path.join(tmp_dir, "golf_data.sqlite3")
+        urls = build_standin(db_path, args.standin_courses)
+        port = free_port()
+        server, _ = start_server(f"sqlite:///{db_path}", port)
+        base = urlparse(f"http://127.0.0.1:{port}")
+        print(f"SQLite stand-in with {args.standin_courses:,} courses on port {port}")
+
+    def worker(seed):
+        rng = random.Random(seed)
+        return make_request(base, urls, rng)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(worker, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    timings = {}
+    for request_timings in results:
+        for kind, seconds in request_timings:
+            timings.setdefault(kind, []).append(seconds)
+    all_timings = [s for values in timings.values() for s in values]
+
+    print(
+        f"\n{len(all_timings):,} requests, concurrency {args.concurrency}: "
+        f"{len(all_timings) / elapsed:,.0f} req/s\n"
+    )
+    print(f"  {'endpoint':<18} {'count':>7} {'p50 ms':>9} {'p99 ms':>9}")
+    for kind, values in sorted(timings.items()) + [("all", all_timings)]:
+        print(
+            f"  {kind:<18} {len(values):7,} {percentile(values, 0.5) * 1000:9.1f} "
+            f"{percentile(values, 0.99) * 1000:9.1f}"
+        )
+    health, _ = get(base, "/health", {})
+    print(f"\nServer stats: {health}")
+
+    if server is not None:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
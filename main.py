@@ -1 +1,255 @@
-print("Hello, world!")
+"""Command-line entry point for the USGOLFDATA pipeline.
+
+    python main.py scrape [--offline] [--force]     scrape the Lake Jovita South Course
+    python main.py crawl courses.json [options]     scrape a manifest of courses
+    python main.py load data.csv [--mode upsert]    load a tee-row CSV into PostgreSQL
+    python main.py export [--csv PATH]              export golf_data_entries to files
+    python main.py analytics [--full]               refresh the summary tables
+    python main.py stats                            crawl progress and last run timings
+    python main.py settings                         effective configuration
+
+Only the standard library is imported up front. Each subcommand imports what it
+needs (Selenium, pandas, psycopg2, ...) when it runs, so `--help`, `stats` and
+`settings` start in a few tens of milliseconds; benchmarks/check_import_time.py
+keeps it that way. scrape, crawl and analytics pass their remaining
+arguments to the scripts they wrap, e.g. `python main.py crawl --help`.
+"""
+
+import argparse
+import os
+import sys
+
+SCRIPTS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "scripts", "Lake Jovita"
+)
+sys.path.insert(0, SCRIPTS_DIR)
+
+from settings import get_settings  # noqa: E402  (standard library only)
+
+# Subcommands whose options belong to the script they wrap.
+FORWARDED = ("scrape", "crawl", "analytics")
+
+
+def cmd_scrape(args, extra):
+    from lake_jovita_south_scraper import main
+
+    main(extra)
+
+
+def cmd_crawl(args, extra):
+    from course_runner import main
+
+    main(extra)
+
+
+def cmd_analytics(args, extra):
+    from analytics import main
+
+    main(extra)
+
+
+def cmd_load(args, extra):
+    from instrumentation import instrumented_run
+
+    with instrumented_run(args.log_level):
+        import pandas as pd
+
+        from lake_jovita_south_scraper import (
+            connect_db,
+            create_golf_data_table,
+            load_golf_data,
+        )
+
+        df = pd.read_csv(args.csv)
+        conn = connect_db()
+        if conn is None:
+            sys.exit(1)
+        try:
+            if not create_golf_data_table(conn) or not load_golf_data(
+                conn, df, mode=args.mode
+            ):
+                sys.exit(1)
+        finally:
+            conn.close()
+
+
+def cmd_export(args, extra):
+    from instrumentation import instrumented_run
+
+    with instrumented_run(args.log_level):
+        import pandas as pd
+
+        from exporters import export_tee_rows
+        from lake_jovita_south_scraper import OUTPUT_COLUMNS, connect_db
+
+        conn = connect_db()
+        if conn is None:
+            sys.exit(1)
+        try:
+            # A named cursor streams the table from the server in chunks.
+            with conn.cursor(name="export_golf_data") as cursor:
+                cursor.itersize = args.chunk_rows
+                cursor.execute(
+                    f"SELECT {', '.join(OUTPUT_COLUMNS)} FROM golf_data_entries"
+                )
+                exported = False
+                while True:
+                    rows = cursor.fetchmany(args.chunk_rows)
+                    if not rows:
+                        break
+                    df = pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+                    export_tee_rows(df, args.csv, formats=args.formats, append=exported)
+                    exported = True
+            if not exported:
+                print("golf_data_entries is empty; nothing exported.")
+        finally:
+            conn.close()
+
+
+def latest_run_summary(path, tail_bytes=1 << 20):
+    """The "summary" records of the last run in a metrics JSON lines file."""
+    import json
+
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        f.seek(max(0, os.path.getsize(path) - tail_bytes))
+        lines = f.read().decode("utf-8", "replace").splitlines()
+    summaries = []
+    for line in reversed(lines):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # the first line of the tail is usually cut off
+        if record.get("type") != "summary":
+            if summaries:
+                break
+            continue
+        if summaries and record["run"] != summaries[0]["run"]:
+            break
+        summaries.append(record)
+    return sorted(summaries, key=lambda r: r["stage"])
+
+
+def cmd_stats(args, extra):
+    settings = get_settings()
+
+    if os.path.exists(settings.crawl_state):
+        from crawl_state import CrawlState
+
+        state = CrawlState(settings.crawl_state, read_only=True)
+        try:
+            counts = state.counts()
+            dead = state.dead_letters()
+        finally:
+            state.close()
+        print(f"Crawl state ({settings.crawl_state}):")
+        for name, count in sorted(counts.items()):
+            print(f"  {name:>8} {count:8,}")
+        for url, hole, attempts, error in dead[: args.dead]:
+            where = f"{url} pane {hole}" if hole else url
+            print(f"  dead: {where} after {attempts} attempts: {error}")
+        if len(dead) > args.dead:
+            print(f"  ... and {len(dead) - args.dead} more dead-lettered jobs")
+    else:
+        print(f"No crawl state at {settings.crawl_state}.")
+
+    summaries = (
+        []
+        if settings.metrics_jsonl in ("", "off")
+        else latest_run_summary(settings.metrics_jsonl)
+    )
+    if not summaries:
+        print(f"No run summaries in {settings.metrics_jsonl}.")
+        return
+    print(f"\nLast run ({summaries[0]['run']}):")
+    print(f"  {'stage':<14} {'count':>8} {'errors':>7} {'avg s':>9} {'max s':>9}")
+    for s in summaries:
+        avg = s["sum_s"] / s["count"] if s["count"] else 0.0
+        print(
+            f"  {s['stage']:<14} {s['count']:8,} {s['errors']:7,} "
+            f"{avg:9.4f} {s['max_s']:9.4f}"
+        )
+
+
+def cmd_settings(args, extra):
+    for name, value in get_settings().as_dict().items():
+        print(f"{name} = {value}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="USGOLFDATA scraping and loading pipeline."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scrape = commands.add_parser(
+        "scrape",
+        add_help=False,
+        help="Scrape the Lake Jovita South Course (see scrape --help)",
+    )
+    scrape.set_defaults(run=cmd_scrape)
+
+    crawl = commands.add_parser(
+        "crawl",
+        add_help=False,
+        help="Scrape the courses in a JSON manifest (see crawl --help)",
+    )
+    crawl.set_defaults(run=cmd_crawl)
+
+    analytics = commands.add_parser(
+        "analytics",
+        add_help=False,
+        help="Refresh the course statistics summary tables (see analytics --help)",
+    )
+    analytics.set_defaults(run=cmd_analytics)
+
+    load = commands.add_parser("load", help="Load a tee-row CSV into PostgreSQL")
+    load.add_argument("csv", help="CSV with the golf_data_entries columns")
+    load.add_argument(
+        "--mode",
+        choices=("append", "upsert"),
+        default=None,
+        help="default: LOAD_MODE or append",
+    )
+    load.add_argument("--log-level", default=None)
+    load.set_defaults(run=cmd_load)
+
+    export = commands.add_parser(
+        "export", help="Export golf_data_entries to CSV and the Parquet dataset"
+    )
+    export.add_argument(
+        "--csv",
+        default=os.path.join("data", "golf_data_entries.csv"),
+        help="CSV path (default data/golf_data_entries.csv)",
+    )
+    export.add_argument(
+        "--formats", default=None, help="default: EXPORT_FORMATS or csv,parquet"
+    )
+    export.add_argument("--chunk-rows", type=int, default=10000)
+    export.add_argument("--log-level", default=None)
+    export.set_defaults(run=cmd_export)
+
+    stats = commands.add_parser(
+        "stats", help="Crawl progress, dead letters and the last run's stage timings"
+    )
+    stats.add_argument(
+        "--dead", type=int, default=20, help="dead-lettered jobs to list (default 20)"
+    )
+    stats.set_defaults(run=cmd_stats)
+
+    settings = commands.add_parser("settings", help="Print the effective settings")
+    settings.set_defaults(run=cmd_settings)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command not in FORWARDED:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.run(args, extra)
+
+
+if __name__ == "__main__":
+    main()
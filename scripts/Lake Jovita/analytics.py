@@ -0,0 +1,553 @@
+"""Course statistics precomputed into summary tables.
+
+Usage:
+    python analytics.py [--full] [--workers N] [--chunk-rows 20000]
+                        [--log-level LEVEL] [--profile]
+
+The newest row of every (URL, TeeName) in golf_data_entries is read through a
+server-side (named) cursor, in chunks that never split a course. A process pool
+aggregates each chunk with vectorized pandas/NumPy, and the partial results are
+merged into:
+
+    analytics_state_summary     courses, tees, average course par and tee
+                                length per state
+    analytics_par_distribution  holes of each par per state (course par, so one
+                                tee per course)
+    analytics_tee_length        tees and average/min/max length per state and
+                                tee name
+    analytics_regression        Rating and Slope against Length_Total per state,
+                                kept as sums so states add up;
+                                analytics_regression_all is the national fit
+    analytics_hardest_holes     each course's holes with handicap 1 to
+                                HARDEST_HANDICAP, with the longest tee's yardage
+    analytics_courses           the state each course was summarized under
+
+Every summary row belongs to a state (StateorRegion, "unknown" when missing),
+and a refresh only recomputes the states touched since the last one: those of
+every course with a scrape_date after analytics_refresh.refreshed_through, less
+REFRESH_OVERLAP, including a state such a course was summarized under before
+(analytics_courses), so a course that moved leaves its old state. --full
+recomputes every state, which is needed after rows are deleted. Dashboards read
+these tables instead of scanning golf_data_entries.
+
+Settings (environment):
+    ANALYTICS_WORKERS      aggregation processes (default: one per CPU)
+    ANALYTICS_CHUNK_ROWS   tee rows fetched per chunk (default 20000)
+"""
+
+import argparse
+import datetime
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from psycopg2 import Error as Psycopg2Error
+from psycopg2.extras import execute_values
+
+from exporters import UNKNOWN_STATE
+from instrumentation import (
+    add_instrumentation_arguments,
+    configure_logging,
+    get_metrics,
+    instrumented_run,
+)
+from lake_jovita_south_scraper import _whole_numbers, connect_db
+from pipeline import bounded_map, process_context
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+HOLE_NUMBERS = range(1, 19)
+PAR_COLUMNS = [f"Par_{i}" for i in HOLE_NUMBERS]
+YARDAGE_COLUMNS = [f"Hole_{i}" for i in HOLE_NUMBERS]
+HANDICAP_COLUMNS = [f"Hdcp_{i}" for i in HOLE_NUMBERS]
+# URL first: course_chunks() splits on it.
+READ_COLUMNS = [
+    "URL",
+    "CourseName",
+    "StateorRegion",
+    "TeeName",
+    "Rating",
+    "Slope",
+    "Length_Total",
+    "Tot_Out_Par",
+    "Tot_In_Par",
+    *PAR_COLUMNS,
+    *YARDAGE_COLUMNS,
+    *HANDICAP_COLUMNS,
+]
+REGRESSION_TARGETS = ("Rating", "Slope")
+HARDEST_HANDICAP = 3
+
+# Rows written in a transaction that began before the last refresh carry an
+# older scrape_date, so each refresh looks back this far as well.
+REFRESH_OVERLAP = datetime.timedelta(minutes=5)
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS analytics_state_summary (
+    state TEXT PRIMARY KEY,
+    courses INTEGER NOT NULL,
+    tees INTEGER NOT NULL,
+    avg_course_par NUMERIC(5,2),
+    avg_tee_length NUMERIC(7,1),
+    refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS analytics_par_distribution (
+    state TEXT NOT NULL,
+    par SMALLINT NOT NULL,
+    holes INTEGER NOT NULL,
+    PRIMARY KEY (state, par)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_tee_length (
+    state TEXT NOT NULL,
+    tee_name TEXT NOT NULL,
+    tees INTEGER NOT NULL,
+    avg_length NUMERIC(7,1),
+    min_length INTEGER,
+    max_length INTEGER,
+    PRIMARY KEY (state, tee_name)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_regression (
+    state TEXT NOT NULL,
+    target TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    sum_x DOUBLE PRECISION NOT NULL,
+    sum_y DOUBLE PRECISION NOT NULL,
+    sum_xx DOUBLE PRECISION NOT NULL,
+    sum_xy DOUBLE PRECISION NOT NULL,
+    sum_yy DOUBLE PRECISION NOT NULL,
+    slope DOUBLE PRECISION,
+    intercept DOUBLE PRECISION,
+    r2 DOUBLE PRECISION,
+    PRIMARY KEY (state, target)
+);
+
+CREATE OR REPLACE VIEW analytics_regression_all AS
+SELECT target, n,
+       (n * sxy - sx * sy) / nullif(n * sxx - sx * sx, 0) AS slope,
+       (sy - sx * (n * sxy - sx * sy) / nullif(n * sxx - sx * sx, 0))
+           / nullif(n, 0) AS intercept,
+       power(n * sxy - sx * sy, 2)
+           / nullif((n * sxx - sx * sx) * (n * syy - sy * sy), 0) AS r2
+FROM (
+    SELECT target, sum(n) AS n, sum(sum_x) AS sx, sum(sum_y) AS sy,
+           sum(sum_xx) AS sxx, sum(sum_xy) AS sxy, sum(sum_yy) AS syy
+    FROM analytics_regression
+    GROUP BY target
+) totals;
+
+CREATE TABLE IF NOT EXISTS analytics_hardest_holes (
+    state TEXT NOT NULL,
+    url TEXT NOT NULL,
+    course_name TEXT,
+    hole SMALLINT NOT NULL,
+    handicap SMALLINT NOT NULL,
+    par SMALLINT,
+    yardage INTEGER,
+    PRIMARY KEY (url, hole)
+);
+CREATE INDEX IF NOT EXISTS analytics_hardest_holes_state_idx
+    ON analytics_hardest_holes (state, handicap);
+
+CREATE TABLE IF NOT EXISTS analytics_courses (
+    url TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analytics_courses_state_idx
+    ON analytics_courses (state);
+
+CREATE TABLE IF NOT EXISTS analytics_refresh (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+    refreshed_through TIMESTAMP,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Summary table -> (columns written, in the order of the merged frame)
+SUMMARY_TABLES = {
+    "analytics_state_summary": [
+        "state",
+        "courses",
+        "tees",
+        "avg_course_par",
+        "avg_tee_length",
+    ],
+    "analytics_par_distribution": ["state", "par", "holes"],
+    "analytics_tee_length": [
+        "state",
+        "tee_name",
+        "tees",
+        "avg_length",
+        "min_length",
+        "max_length",
+    ],
+    "analytics_regression": [
+        "state",
+        "target",
+        "n",
+        "sum_x",
+        "sum_y",
+        "sum_xx",
+        "sum_xy",
+        "sum_yy",
+        "slope",
+        "intercept",
+        "r2",
+    ],
+    "analytics_hardest_holes": [
+        "state",
+        "url",
+        "course_name",
+        "hole",
+        "handicap",
+        "par",
+        "yardage",
+    ],
+    "analytics_courses": ["url", "state"],
+}
+
+# States of the courses that have rows newer than a timestamp: the ones they have
+# now (and had in older rows) and the ones they were last summarized under.
+TOUCHED_STATES_SQL = """
+    WITH touched AS (
+        SELECT DISTINCT URL FROM golf_data_entries WHERE scrape_date > %(since)s
+    )
+    SELECT coalesce(StateorRegion, %(unknown)s) FROM golf_data_entries
+    WHERE URL IN (SELECT URL FROM touched)
+    UNION
+    SELECT state FROM analytics_courses WHERE url IN (SELECT URL FROM touched)
+"""
+
+
+# --- Reading ---
+def course_chunks(cursor, chunk_rows):
+    """Lists of about chunk_rows rows, ordered by URL, never splitting a course.
+
+    The rows of the last course in each fetch are held back until the next
+    one, so per-course numbers (par, hardest holes) are counted exactly once.
+    """
+    carry = []
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            if carry:
+                yield carry
+            return
+        rows = carry + rows
+        last_url = rows[-1][0]
+        split = len(rows)
+        while split and rows[split - 1][0] == last_url:
+            split -= 1
+        carry = rows[split:]
+        if split:
+            yield rows[:split]
+
+
+def _read_sql(states):
+    """The newest row of every tee, of courses now in states (None for all).
+
+    The state filter applies after picking the newest rows, so older rows of a
+    course that has since moved do not count for its old state.
+    """
+    where = "WHERE coalesce(StateorRegion, %s) = ANY(%s)" if states is not None else ""
+    return f"""
+        SELECT {", ".join(READ_COLUMNS)} FROM (
+            SELECT DISTINCT ON (URL, TeeName) {", ".join(READ_COLUMNS)}
+            FROM golf_data_entries
+            ORDER BY URL, TeeName, scrape_date DESC, id DESC
+        ) newest
+        {where}
+        ORDER BY URL, TeeName
+    """
+
+
+# --- Aggregation (runs in worker processes) ---
+def aggregate_chunk(rows):
+    """Partial aggregates of one chunk: {summary name: DataFrame of sums}."""
+    df = pd.DataFrame(rows, columns=READ_COLUMNS)
+    df["state"] = df["StateorRegion"].fillna(UNKNOWN_STATE)
+    for col in PAR_COLUMNS + YARDAGE_COLUMNS + HANDICAP_COLUMNS:
+        df[col] = _whole_numbers(df[col]).astype(float)
+    for col in ["Rating", "Slope", "Length_Total", "Tot_Out_Par", "Tot_In_Par"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype(float)
+    length = df["Length_Total"].where(df["Length_Total"] > 0)
+
+    # Par and handicap belong to the course, so take them from one tee.
+    courses = df.drop_duplicates("URL")
+    course_par = (courses["Tot_Out_Par"] + courses["Tot_In_Par"]).where(
+        lambda par: par > 0
+    )
+
+    state_summary = pd.DataFrame(
+        {
+            "courses": courses.groupby("state").size(),
+            "tees": df.groupby("state").size(),
+            "par_sum": course_par.groupby(courses["state"]).sum(),
+            "par_n": course_par.groupby(courses["state"]).count(),
+            "length_sum": length.groupby(df["state"]).sum(),
+            "length_n": length.groupby(df["state"]).count(),
+        }
+    ).fillna(0)
+
+    pars = courses[PAR_COLUMNS].to_numpy()
+    par_states = np.repeat(courses["state"].to_numpy(), len(PAR_COLUMNS))
+    present = ~np.isnan(pars.ravel())
+    par_distribution = (
+        pd.DataFrame(
+            {"state": par_states[present], "par": pars.ravel()[present].astype(int)}
+        )
+        .groupby(["state", "par"])
+        .size()
+        .rename("holes")
+        .to_frame()
+    )
+
+    tee_length = (
+        df.assign(length=length)
+        .dropna(subset=["length"])
+        .groupby(["state", "TeeName"])["length"]
+        .agg(tees="count", length_sum="sum", min_length="min", max_length="max")
+    )
+    tee_length.index = tee_length.index.set_names(["state", "tee_name"])
+
+    regression = []
+    for target in REGRESSION_TARGETS:
+        valid = length.notna() & df[target].notna()
+        x, y = length[valid], df[target][valid]
+        sums = pd.DataFrame(
+            {"x": x, "y": y, "xx": x * x, "xy": x * y, "yy": y * y}
+        ).groupby(df["state"][valid])
+        regression.append(
+            pd.DataFrame(
+                {
+                    "n": sums.size(),
+                    "sum_x": sums["x"].sum(),
+                    "sum_y": sums["y"].sum(),
+                    "sum_xx": sums["xx"].sum(),
+                    "sum_xy": sums["xy"].sum(),
+                    "sum_yy": sums["yy"].sum(),
+                }
+            ).assign(target=target.lower())
+        )
+    regression = pd.concat(regression).set_index("target", append=True)
+
+    # The longest tee's yardage for each of a course's holes.
+    longest = df.groupby("URL", sort=False)[YARDAGE_COLUMNS].max()
+    handicaps = courses[HANDICAP_COLUMNS].to_numpy()
+    course_idx, hole_idx = np.nonzero(
+        (handicaps >= 1) & (handicaps <= HARDEST_HANDICAP)
+    )
+    urls = courses["URL"].to_numpy()[course_idx]
+    hardest = pd.DataFrame(
+        {
+            "state": courses["state"].to_numpy()[course_idx],
+            "url": urls,
+            "course_name": courses["CourseName"].to_numpy()[course_idx],
+            "hole": hole_idx + 1,
+            "handicap": handicaps[course_idx, hole_idx].astype(int),
+            "par": courses[PAR_COLUMNS].to_numpy()[course_idx, hole_idx],
+            "yardage": longest.loc[urls].to_numpy()[np.arange(len(urls)), hole_idx],
+        }
+    )
+
+    return {
+        "state_summary": state_summary,
+        "par_distribution": par_distribution,
+        "tee_length": tee_length,
+        "regression": regression,
+        "hardest_holes": hardest,
+        "courses": courses[["URL", "state"]].rename(columns={"URL": "url"}),
+    }
+
+
+def merge_partials(partials):
+    """Combine aggregate_chunk() results into the summary table frames."""
+
+    def combined(name):
+        return pd.concat([partial[name] for partial in partials])
+
+    state = combined("state_summary").groupby(level=0).sum()
+    state_summary = pd.DataFrame(
+        {
+            "courses": state["courses"],
+            "tees": state["tees"],
+            "avg_course_par": (state["par_sum"] / state["par_n"]).round(2),
+            "avg_tee_length": (state["length_sum"] / state["length_n"]).round(1),
+        }
+    )
+
+    par_distribution = combined("par_distribution").groupby(level=[0, 1]).sum()
+
+    tee = combined("tee_length").groupby(level=[0, 1])
+    tee_length = pd.DataFrame(
+        {
+            "tees": tee["tees"].sum(),
+            "avg_length": (tee["length_sum"].sum() / tee["tees"].sum()).round(1),
+            "min_length": tee["min_length"].min(),
+            "max_length": tee["max_length"].max(),
+        }
+    )
+
+    regression = combined("regression").groupby(level=[0, 1]).sum()
+    n, sx, sy = regression["n"], regression["sum_x"], regression["sum_y"]
+    sxx, sxy, syy = regression["sum_xx"], regression["sum_xy"], regression["sum_yy"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spread_x = n * sxx - sx * sx
+        covariance = n * sxy - sx * sy
+        slope = (covariance / spread_x).where(spread_x != 0)
+        regression = regression.assign(
+            slope=slope,
+            intercept=(sy - slope * sx) / n,
+            r2=(covariance**2 / (spread_x * (n * syy - sy * sy))).where(
+                (spread_x != 0) & (n * syy - sy * sy != 0)
+            ),
+        )
+
+    return {
+        "analytics_state_summary": state_summary.reset_index(names="state"),
+        "analytics_par_distribution": par_distribution.reset_index(),
+        "analytics_tee_length": tee_length.reset_index(),
+        "analytics_regression": regression.reset_index(),
+        "analytics_hardest_holes": combined("hardest_holes"),
+        "analytics_courses": combined("courses"),
+    }
+
+
+# --- Writing ---
+def _records(df, columns):
+    """Rows of plain Python values, with None for every missing one."""
+    values = df[columns].astype(object)
+    return list(values.where(values.notna(), None).itertuples(index=False, name=None))
+
+
+def refresh_analytics(conn, full=False, workers=None, chunk_rows=None):
+    """Recompute the summaries of states with new rows (every state if full).
+
+    Returns the list of states refreshed (None meaning all of them), or False
+    on a database error.
+    """
+    settings = get_settings()
+    workers = workers or settings.analytics_workers or os.cpu_count()
+    chunk_rows = chunk_rows or settings.analytics_chunk_rows
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(SCHEMA_SQL)
+        cursor.execute("SELECT max(scrape_date) FROM golf_data_entries")
+        through = cursor.fetchone()[0]
+        cursor.execute("SELECT refreshed_through FROM analytics_refresh")
+        row = cursor.fetchone()
+        since = None if full or row is None or row[0] is None else row[0]
+
+        states = None
+        if since is not None:
+            cursor.execute(
+                TOUCHED_STATES_SQL,
+                {"since": since - REFRESH_OVERLAP, "unknown": UNKNOWN_STATE},
+            )
+            states = sorted(state for (state,) in cursor.fetchall())
+            if not states:
+                logger.info("Analytics are up to date (rows through %s).", since)
+                conn.commit()
+                return []
+            logger.info("Refreshing analytics for %d state(s).", len(states))
+        else:
+            logger.info("Refreshing analytics for every state.")
+
+        with get_metrics().span("analytics", states=len(states or [])) as span:
+            partials = []
+            with conn.cursor(name="analytics_read") as reader, ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=process_context(),
+                initializer=configure_logging,
+                initargs=(logging.getLogger().level,),
+            ) as pool:
+                reader.itersize = chunk_rows
+                params = (UNKNOWN_STATE, states) if states is not None else None
+                reader.execute(_read_sql(states), params)
+                chunks = course_chunks(reader, chunk_rows)
+                for partial in bounded_map(pool, aggregate_chunk, chunks, 2 * workers):
+                    partials.append(partial)
+            span.fields["chunks"] = len(partials)
+
+            if partials:
+                summaries = merge_partials(partials)
+            else:
+                summaries = {
+                    table: pd.DataFrame(columns=columns)
+                    for table, columns in SUMMARY_TABLES.items()
+                }
+            for table, columns in SUMMARY_TABLES.items():
+                if states is None:
+                    cursor.execute(f"DELETE FROM {table}")
+                else:
+                    cursor.execute(
+                        f"DELETE FROM {table} WHERE state = ANY(%s)", (states,)
+                    )
+                execute_values(
+                    cursor,
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s",
+                    _records(summaries[table], columns),
+                )
+                logger.info("Wrote %d rows to '%s'.", len(summaries[table]), table)
+
+            cursor.execute(
+                "INSERT INTO analytics_refresh (id, refreshed_through, refreshed_at) "
+                "VALUES (true, %s, CURRENT_TIMESTAMP) ON CONFLICT (id) DO UPDATE "
+                "SET refreshed_through = EXCLUDED.refreshed_through, "
+                "refreshed_at = EXCLUDED.refreshed_at",
+                (through,),
+            )
+        conn.commit()
+        return states
+    except Psycopg2Error as e:
+        logger.exception("Error refreshing analytics: %s", e)
+        conn.rollback()
+        return False
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Refresh the course statistics summary tables."
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recompute every state, not only those with new rows",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Aggregation processes (default: ANALYTICS_WORKERS or one per CPU)",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=None,
+        help="Tee rows per chunk (default: ANALYTICS_CHUNK_ROWS or 20000)",
+    )
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args(argv)
+    with instrumented_run(args.log_level, profile=args.profile):
+        conn = connect_db()
+        if not conn:
+            logger.error("Database connection failed. Exiting.")
+            return
+        try:
+            refresh_analytics(conn, args.full, args.workers, args.chunk_rows)
+        finally:
+            conn.close()
+            logger.info("Database connection closed.")
+
+
+if __name__ == "__main__":
+    main()
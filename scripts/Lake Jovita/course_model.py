@@ -0,0 +1,243 @@
+"""Compact in-memory model of scraped courses and their tees.
+
+A Course holds its details and a list of Tees; each Tee keeps par, yardage and
+handicap for holes 1-18 in fixed-size int16 arrays (array module, 36 bytes of
+data each) with MISSING marking a hole without a value. Par and handicap come
+from the course page rather than the tee, so a course's tees share one array
+of each. Numbers are parsed from the scraped text once, when the Course is
+built, and stay integers from there on.
+
+tee_rows_frame() turns courses into the golf_data_entries DataFrame. The tee
+arrays are gathered into one int16 block per field and each Par_N/Hole_N column
+is a masked view of that block (np.frombuffer, no copy per column), so the
+database COPY and the Parquet export read the integers directly instead of
+re-parsing strings.
+"""
+
+import re
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from lake_jovita_south_scraper import OUTPUT_COLUMNS
+
+HOLES = 18
+MISSING = -32768  # int16 minimum; no par, yardage or handicap comes near it
+TYPECODE = "h"
+
+# Used for courses whose pages list no tee yardages at all.
+DEFAULT_TEES = ["Gold", "Blue", "White", "Red"]
+
+# Course attribute -> golf_data_entries column; None until a source provides it.
+COURSE_DETAILS = {
+    "number": "cCourseNumber",
+    "street_address": "StreetAddress",
+    "city": "City",
+    "state": "StateorRegion",
+    "zip": "Zip",
+    "county": "County",
+    "country": "Country",
+    "phone": "PhoneNumber",
+    "fax": "FaxNumber",
+    "year_built": "YearBuiltFounded",
+    "architect": "Architect",
+    "status": "StatusPublicPrivateResort",
+    "guest_policy": "GuestPolicy",
+}
+
+# "Gold: 420" or "Gold: 420 yds"; the number is kept and any unit dropped.
+YARDAGE_PAIR = re.compile(r"^([^:]*):\s*(\d+(?:\.\d+)?)[^:]*$")
+
+
+def whole_number(value):
+    """value as an int if it is a whole number that fits the arrays, else MISSING."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return MISSING
+    if not number.is_integer() or not MISSING < number < -MISSING:
+        return MISSING
+    return int(number)
+
+
+def empty_holes():
+    return array(TYPECODE, [MISSING]) * HOLES
+
+
+class Tee:
+    __slots__ = ("name", "par", "yardage", "handicap", "rating", "slope")
+
+    def __init__(
+        self, name, par=None, yardage=None, handicap=None, rating=None, slope=None
+    ):
+        self.name = name
+        self.par = empty_holes() if par is None else par
+        self.yardage = empty_holes() if yardage is None else yardage
+        self.handicap = empty_holes() if handicap is None else handicap
+        self.rating = rating
+        self.slope = slope
+
+    def __repr__(self):
+        return f"Tee({self.name!r}, length={sum(self.totals()[1::2])})"
+
+    def totals(self):
+        """(out par, out yardage, in par, in yardage); a missing hole counts as 0."""
+
+        def total(values):
+            return sum(value for value in values if value != MISSING)
+
+        return (
+            total(self.par[:9]),
+            total(self.yardage[:9]),
+            total(self.par[9:]),
+            total(self.yardage[9:]),
+        )
+
+
+class Course:
+    __slots__ = ("name", "url", "tees", *COURSE_DETAILS)
+
+    def __init__(self, name, url, tees=None, **details):
+        self.name = name
+        self.url = url
+        self.tees = [] if tees is None else tees
+        for attr in COURSE_DETAILS:
+            setattr(self, attr, details.pop(attr, None))
+        if details:
+            raise TypeError(f"Unknown course details: {', '.join(details)}")
+
+    def __repr__(self):
+        return f"Course({self.name!r}, {self.url!r}, tees={len(self.tees)})"
+
+    @classmethod
+    def from_hole_records(cls, name, url, hole_records, tees=None):
+        """Build a Course from a parser's per-hole records.
+
+        Holes outside 1-18 are dropped and a repeated hole keeps its last record.
+        Unless tees is given, the course gets the tees named in its yardage
+        strings, in the order they first appear (DEFAULT_TEES if there are none).
+        """
+        last_index = {}
+        for index, record in enumerate(hole_records):
+            hole = whole_number(record.get("Hole Number"))
+            if 1 <= hole <= HOLES:
+                last_index[hole] = index
+
+        par = empty_holes()
+        handicap = empty_holes()
+        yardages = {}  # tee name -> yardage array
+        for hole, index in sorted(last_index.items(), key=lambda item: item[1]):
+            record = hole_records[index]
+            par[hole - 1] = whole_number(record.get("Par per Hole"))
+            handicap[hole - 1] = whole_number(record.get("Hole Handicap"))
+            raw_yardages = record.get("Raw Tee Yardages")
+            if not isinstance(raw_yardages, str):
+                continue
+            for pair in raw_yardages.split("|"):
+                match = YARDAGE_PAIR.match(pair)
+                if match is None:
+                    continue
+                tee_name = match.group(1).strip()
+                if tee_name not in yardages:
+                    yardages[tee_name] = empty_holes()
+                yardages[tee_name][hole - 1] = whole_number(match.group(2).strip())
+
+        tee_names = tees if tees is not None else list(yardages) or DEFAULT_TEES
+        return cls(
+            name,
+            url,
+            [
+                Tee(tee_name, par, yardages.get(tee_name), handicap)
+                for tee_name in tee_names
+            ],
+        )
+
+
+def _hole_block(tees, field):
+    """(n_tees, 18) int16 view over one field's arrays, gathered into one buffer."""
+    gathered = array(TYPECODE)
+    for tee in tees:
+        gathered.extend(getattr(tee, field))
+    return np.frombuffer(gathered, dtype=np.int16).reshape(len(tees), HOLES)
+
+
+def _masked(values):
+    return pd.arrays.IntegerArray(values, values == MISSING)
+
+
+def _text(values):
+    """Object column with NaN, the null pandas gives missing text, for None."""
+    column = np.empty(len(values), dtype=object)
+    column[:] = [np.nan if value is None else value for value in values]
+    return column
+
+
+def _filled(value, n_rows, dtype=np.int32):
+    return pd.arrays.IntegerArray(
+        np.full(n_rows, value, dtype=dtype), np.zeros(n_rows, dtype=bool)
+    )
+
+
+def tee_rows_frame(courses):
+    """One golf_data_entries row per tee, with nullable integer hole columns.
+
+    Par_N/Hole_N are Int16 views of the gathered hole blocks; totals, and
+    Par_Overall as front plus back par, are Int32 and count a missing hole as 0.
+    Text columns (Hdcp_N included, as in the table) hold NaN, pandas'
+    missing-text value, where nothing was scraped.
+    """
+    rows = [
+        (course, tee_number, tee)
+        for course in courses
+        for tee_number, tee in enumerate(course.tees, start=1)
+    ]
+    tees = [tee for _, _, tee in rows]
+    n_rows = len(rows)
+    par = _hole_block(tees, "par")
+    yardage = _hole_block(tees, "yardage")
+    handicap = _hole_block(tees, "handicap")
+
+    def total(block, nine):
+        values = block[:, nine]
+        return np.where(values == MISSING, 0, values).sum(axis=1, dtype=np.int32)
+
+    out_par, in_par = total(par, slice(0, 9)), total(par, slice(9, HOLES))
+    out_ydg, in_ydg = total(yardage, slice(0, 9)), total(yardage, slice(9, HOLES))
+    no_nulls = np.zeros(n_rows, dtype=bool)
+
+    columns = {
+        column: _text([getattr(course, attr) for course, _, _ in rows])
+        for attr, column in COURSE_DETAILS.items()
+    }
+    columns.update(
+        {
+            "CourseTeeNumber": [
+                f"{course.number or 'N/A'}-{tee.name}" for course, _, tee in rows
+            ],
+            "CourseName": [course.name for course, _, _ in rows],
+            "URL": [course.url for course, _, _ in rows],
+            "TotalHoles": _filled(HOLES, n_rows),
+            "TeeNumber": pd.arrays.IntegerArray(
+                np.array([number for _, number, _ in rows], dtype=np.int32), no_nulls
+            ),
+            "TeeName": [tee.name for tee in tees],
+            "Par_Overall": pd.arrays.IntegerArray(out_par + in_par, no_nulls),
+            "Holes_Total": _filled(HOLES, n_rows),
+            "Rating": pd.array([tee.rating for tee in tees], dtype="Float64"),
+            "Slope": pd.array([tee.slope for tee in tees], dtype="Int32"),
+            "Tot_Out_Par": pd.arrays.IntegerArray(out_par, no_nulls),
+            "Tot_Out_Ydg": pd.arrays.IntegerArray(out_ydg, no_nulls),
+            "Tot_In_Par": pd.arrays.IntegerArray(in_par, no_nulls),
+            "Tot_In_Ydg": pd.arrays.IntegerArray(in_ydg, no_nulls),
+            "Length_Total": pd.arrays.IntegerArray(out_ydg + in_ydg, no_nulls),
+        }
+    )
+    for i in range(HOLES):
+        hole = i + 1
+        columns[f"Par_{hole}"] = _masked(par[:, i])
+        columns[f"Hole_{hole}"] = _masked(yardage[:, i])
+        columns[f"Hdcp_{hole}"] = _text(
+            [None if value == MISSING else str(value) for value in handicap[:, i]]
+        )
+    return pd.DataFrame(columns, columns=OUTPUT_COLUMNS, copy=False)
@@ -0,0 +1,550 @@
+"""Concurrent multi-course runner built on the Lake Jovita scraper.
+
+Usage:
+    python course_runner.py courses.json [--fetch-workers 8] [--parse-workers N]
+                                         [--parse-chunk 16] [--host-delay 1.0]
+                                         [--no-db] [--no-browser] [--browsers 2]
+                                         [--offline] [--force] [--state PATH]
+                                         [--fresh] [--retry-dead]
+                                         [--max-retry-wait 300]
+                                         [--export PATH] [--log-level LEVEL]
+                                         [--profile]
+
+The manifest is a JSON list of {"url": ..., "profile": ...} entries, where
+"profile" names a parser registered in parsers.py; without one, the parser is
+picked from the URL's domain. Pages are fetched by a bounded thread pool that
+spaces out requests to the same host, parsed in chunks by a process pool,
+structured into tee rows one parse chunk at a time, and handed to a
+write-behind buffer that loads many courses per transaction over a shared
+connection pool (LOAD_MODE=upsert makes re-runs idempotent). Courses that need
+a real browser share a DriverPool of warm headless Chrome instances.
+
+Progress is checkpointed per course in a CrawlState file: a restarted run skips
+courses already loaded, retries failures with exponential backoff, and reports
+courses that exhausted their attempts as dead letters. --fresh starts a new
+crawl of the manifest instead (e.g. the nightly re-scrape): courses loaded by
+earlier crawls are queued again, while a course loaded during this one is not.
+
+Courses stream through these stages rather than being gathered first: every
+stage keeps a bounded number of tasks in flight, and the write-behind buffer
+blocks once DB_BUFFER_MAX_ROWS rows are waiting, so memory use depends on the
+worker counts and chunk sizes, not on how many courses the manifest lists.
+
+Each stage is timed into the run's metrics (see instrumentation.py); --profile
+also runs the crawl under cProfile and logs the top hot spots.
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from psycopg2 import Error as Psycopg2Error
+
+from crawl_state import CrawlState
+from db_pool import ConnectionPool, WriteBehindBuffer
+from driver_pool import DriverPool
+from fingerprint_store import FingerprintStore
+from instrumentation import (
+    add_instrumentation_arguments,
+    configure_logging,
+    get_metrics,
+    instrumented_run,
+)
+from lake_jovita_south_scraper import (
+    build_tee_rows_batch,
+    fetch_page_html,
+    scrape_course_selenium,
+)
+from parsers import get_parser, parse_pages
+from pipeline import BoundedSubmitter, bounded_map, chunked, process_context
+from waits import get_wait_recorder
+
+logger = logging.getLogger(__name__)
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least min_interval seconds apart."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def load_manifest(path):
+    """[{"url", "profile"}] for each course; a repeated URL keeps its first entry."""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+
+    courses = []
+    seen = set()
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        if entry["url"] in seen:
+            logger.warning("Skipping %s: listed more than once.", entry["url"])
+            continue
+        seen.add(entry["url"])
+        parser = get_parser(entry["url"], entry.get("profile"))
+        if parser is None:
+            logger.warning("Skipping %s: no parser for profile/domain.", entry["url"])
+            continue
+        courses.append({"url": entry["url"], "profile": parser.name})
+    return courses
+
+
+def fetch_course(limiter, course, offline=False):
+    if not offline:  # Cache replays put no load on the host
+        limiter.wait(course["url"])
+    return fetch_page_html(course["url"], offline=offline)
+
+
+def scrape_in_browser(pool, course, course_name, hole_records, missing_tabs):
+    """Fill in the panes the static parse missed using a pooled browser."""
+    only_pane_ids = {pane_id for _, pane_id in missing_tabs} if hole_records else None
+    with pool.driver() as driver:
+        browser_course_name, browser_hole_records = scrape_course_selenium(
+            driver,
+            course["url"],
+            only_pane_ids=only_pane_ids,
+            profile=course["profile"],
+        )
+    if course_name == "N/A":
+        course_name = browser_course_name
+    hole_records = hole_records + browser_hole_records
+    if not hole_records:
+        return None
+    return course_name, course["url"], hole_records
+
+
+def browser_job(pool, job):
+    """scrape_in_browser for one queued job; returns (job, scraped, error)."""
+    course = job[0]
+    try:
+        scraped = scrape_in_browser(pool, *job)
+    except Exception as e:
+        logger.exception("Error scraping %s in browser: %s", course["url"], e)
+        return job, None, f"{type(e).__name__}: {e}"
+    return job, scraped, "no hole data in browser"
+
+
+def run_courses(
+    courses,
+    fetch_workers=8,
+    parse_workers=None,
+    parse_chunk=16,
+    host_delay=1.0,
+    use_browser=True,
+    browsers=2,
+    offline=False,
+    fingerprints=None,
+    on_rows=None,
+    state=None,
+):
+    """Scrape every course in the manifest.
+
+    Courses whose page matches its entry in the fingerprints store are skipped.
+    Returns (DataFrame of tee rows, {url: fingerprint} for the scraped courses,
+    number of skipped courses); record the fingerprints once the rows are loaded.
+
+    With on_rows, tee rows are not collected: on_rows(df, {url: fingerprint}) is
+    called for each parse chunk and browser-scraped course as it completes, and
+    the returned DataFrame is empty.
+
+    With a CrawlState, every course's progress and failures are recorded in it;
+    marking courses "loaded" is left to whoever commits their rows.
+    """
+    limiter = HostRateLimiter(host_delay)
+    parse_workers = parse_workers or os.cpu_count() or 1
+    scraped_courses = []  # Only collected when there is no on_rows sink
+    failed = []
+    new_fingerprints = {}
+    skipped = 0
+    browser = None  # (DriverPool, executor, BoundedSubmitter) once a course needs it
+    metrics = get_metrics()
+    courses_by_url = {course["url"]: course for course in courses}
+
+    def mark(url, job_state, holes=None):
+        if state is not None:
+            if holes is None:
+                state.mark(url, job_state)
+            else:
+                state.mark_holes(url, holes, job_state)
+
+    def fail(url, error, holes=()):
+        failed.append(url)
+        new_fingerprints.pop(url, None)
+        if state is not None:
+            for hole in holes:
+                state.fail(url, error, hole=hole)
+            if state.fail(url, error) == "dead":
+                logger.warning(
+                    "%s reached %d attempts; dead-lettered.", url, state.max_attempts
+                )
+
+    def emit(batch):
+        if on_rows is None:
+            scraped_courses.extend(batch)
+        elif batch:
+            # A URL passed in twice has its fingerprint taken by the first copy.
+            batch_fingerprints = {
+                url: new_fingerprints.pop(url)
+                for _, url, _ in batch
+                if url in new_fingerprints
+            }
+            on_rows(build_tee_rows_batch(batch), batch_fingerprints)
+
+    def fetch(course):
+        return course, fetch_course(limiter, course, offline)
+
+    def pages(fetched):
+        for course, html in fetched:
+            if html is None:
+                fail(course["url"], "fetch failed")
+                continue
+            mark(course["url"], "fetched")
+            stored_fingerprint = (
+                fingerprints.get(course["url"]) if fingerprints else None
+            )
+            yield course["profile"], course["url"], html, stored_fingerprint
+
+    def browser_finished(result):
+        (course, _, _, missing_tabs), scraped, error = result
+        missing_holes = [label for label, _ in missing_tabs]
+        if scraped is None:
+            fail(course["url"], error, holes=missing_holes)
+            return
+        scraped_holes = {f"Hole {record['Hole Number']}" for record in scraped[2]}
+        mark(
+            course["url"],
+            "parsed",
+            holes=[h for h in missing_holes if h in scraped_holes],
+        )
+        for hole in missing_holes:
+            if hole not in scraped_holes and state is not None:
+                state.fail(course["url"], "pane not scraped", hole=hole)
+        emit([scraped])
+
+    def to_browser(job):
+        nonlocal browser
+        course, _, _, missing_tabs = job
+        if not use_browser:
+            fail(
+                course["url"],
+                "hole panes missing and browser disabled",
+                holes=[label for label, _ in missing_tabs],
+            )
+            return
+        if browser is None:
+            logger.info(
+                "Starting the Selenium fallback for courses with missing panes."
+            )
+            driver_pool = DriverPool(size=browsers)
+            executor = ThreadPoolExecutor(max_workers=driver_pool.size)
+            browser = (
+                driver_pool,
+                executor,
+                BoundedSubmitter(executor, 2 * driver_pool.size),
+            )
+        driver_pool, _, submitter = browser
+        for future in submitter.submit(browser_job, driver_pool, job):
+            browser_finished(future.result())
+
+    # Each stage pulls from the one before it and keeps a bounded number of tasks
+    # in flight, so pages are only fetched as fast as they are parsed and loaded.
+    # Fetching is I/O bound and stays on threads; parsing is CPU bound and runs in
+    # worker processes, parse_chunk pages per task to amortize the pickling.
+    try:
+        with ThreadPoolExecutor(
+            max_workers=fetch_workers
+        ) as fetch_pool, ProcessPoolExecutor(
+            max_workers=parse_workers,
+            mp_context=process_context(),
+            initializer=configure_logging,
+            initargs=(logging.getLogger().level,),
+        ) as parse_pool:
+            fetched = bounded_map(fetch_pool, fetch, courses, 2 * fetch_workers)
+            page_chunks = chunked(pages(fetched), parse_chunk)
+            for results in bounded_map(
+                parse_pool, parse_pages, page_chunks, 2 * parse_workers
+            ):
+                batch = []
+                for url, fingerprint, parsed, seconds in results:
+                    metrics.record(
+                        "parse",
+                        seconds,
+                        course=url,
+                        error=parsed if isinstance(parsed, str) else None,
+                    )
+                    if isinstance(parsed, str):
+                        logger.error("Error parsing %s: %s", url, parsed)
+                        fail(url, parsed)
+                        continue
+                    if parsed is None:
+                        skipped += 1
+                        mark(url, "loaded")  # Unchanged since it was last loaded
+                        continue
+                    new_fingerprints[url] = fingerprint
+                    course_name, hole_records, missing_tabs = parsed
+                    mark(url, "parsed")
+                    if missing_tabs:
+                        mark(url, "pending", holes=[label for label, _ in missing_tabs])
+                    if missing_tabs or not hole_records:
+                        to_browser(
+                            (
+                                courses_by_url[url],
+                                course_name,
+                                hole_records,
+                                missing_tabs,
+                            )
+                        )
+                        continue
+                    batch.append((course_name, url, hole_records))
+                emit(batch)
+
+        if browser is not None:
+            for future in browser[2].drain():
+                browser_finished(future.result())
+    finally:
+        if browser is not None:
+            driver_pool, executor, _ = browser
+            executor.shutdown()
+            logger.info("Driver pool stats: %s", driver_pool.stats())
+            logger.info("Browser wait stats: %s", get_wait_recorder().stats())
+            driver_pool.close()
+
+    if failed:
+        logger.warning(
+            "%d course(s) failed:\n%s",
+            len(failed),
+            "\n".join(f"  {url}" for url in failed),
+        )
+
+    return build_tee_rows_batch(scraped_courses), new_fingerprints, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape many courses concurrently.")
+    parser.add_argument("manifest", help="JSON list of {url, profile} entries")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Parser processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--parse-chunk",
+        type=int,
+        default=16,
+        help="Pages handed to a parser process per task",
+    )
+    parser.add_argument(
+        "--host-delay",
+        type=float,
+        default=1.0,
+        help="Minimum seconds between requests to the same host",
+    )
+    parser.add_argument("--no-db", action="store_true", help="Skip the database load")
+    parser.add_argument(
+        "--no-browser",
+        action="store_true",
+        help="Never start Chrome; courses with missing panes are reported as failed",
+    )
+    parser.add_argument(
+        "--browsers",
+        type=int,
+        default=2,
+        help="Headless browsers kept warm for the Selenium fallback",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Replay pages from the response cache only (implies --no-browser)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Parse and load every course even if its page is unchanged",
+    )
+    parser.add_argument(
+        "--state",
+        default=None,
+        help="Crawl state file for resuming (default: CRAWL_STATE or "
+        "data/crawl_state.sqlite3)",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Start a new crawl: queue courses loaded by earlier runs again",
+    )
+    parser.add_argument(
+        "--retry-dead",
+        action="store_true",
+        help="Give dead-lettered courses a fresh set of attempts",
+    )
+    parser.add_argument(
+        "--max-retry-wait",
+        type=float,
+        default=300,
+        help="Longest wait for a scheduled retry before leaving it to the next run",
+    )
+    parser.add_argument(
+        "--export",
+        default=None,
+        metavar="PATH",
+        help="Also write tee rows to this CSV (and the EXPORT_FORMATS Parquet "
+        "dataset), one parse chunk at a time",
+    )
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args(argv)
+    with instrumented_run(args.log_level, profile=args.profile):
+        crawl(args)
+
+
+def crawl(args):
+    """Run the crawl described by main()'s command-line arguments."""
+    courses = load_manifest(args.manifest)
+    logger.info("Loaded %d course(s) from %s.", len(courses), args.manifest)
+
+    state = CrawlState(args.state)
+    if args.fresh:
+        logger.info("Re-queued %d job(s) for a fresh crawl.", state.restart())
+    if args.retry_dead:
+        logger.info("Re-queued %d dead-lettered job(s).", state.retry_dead())
+    state.enqueue(course["url"] for course in courses)
+    # Without a database, parsing is the last step a course goes through.
+    done_states = ("parsed", "loaded") if args.no_db else ("loaded",)
+
+    fingerprints = FingerprintStore()
+    db_pool = buffer = None
+    if not args.no_db:
+        try:
+            db_pool = ConnectionPool()
+        except Psycopg2Error as e:
+            logger.exception("Error connecting to database: %s", e)
+            logger.error("Database connection failed. Exiting.")
+            state.close()
+            return
+        if not db_pool.ensure_schema():
+            logger.error("Failed to create/check database table. Exiting.")
+            db_pool.close()
+            state.close()
+            return
+        buffer = WriteBehindBuffer(db_pool)
+
+    tee_rows = 0
+    skipped = 0
+
+    exported = False
+
+    def store_rows(df, new_fingerprints):
+        nonlocal tee_rows, exported
+        tee_rows += len(df)
+        if args.export:
+            # Lazy import: exporters imports the scraper module at load time.
+            from exporters import export_tee_rows
+
+            export_tee_rows(df, args.export, append=exported)
+            exported = True
+        if buffer is None:
+            return
+
+        def record_loaded():
+            for url, fingerprint in new_fingerprints.items():
+                fingerprints.record(url, fingerprint)
+                state.mark(url, "loaded")
+
+        def record_failed():
+            for url in new_fingerprints:
+                state.fail(url, "database load failed")
+
+        buffer.add(df, on_loaded=record_loaded, on_failed=record_failed)
+
+    start = time.perf_counter()
+    try:
+        while True:
+            due_urls = set(state.due([c["url"] for c in courses], done_states))
+            due = [course for course in courses if course["url"] in due_urls]
+            if not due:
+                wait = state.next_retry_in()
+                if wait is None:
+                    break
+                if wait > args.max_retry_wait:
+                    logger.info(
+                        "Next retry is in %.0fs; leaving it for a later run.", wait
+                    )
+                    break
+                logger.info("Waiting %.0fs for the next scheduled retry...", wait)
+                time.sleep(wait)
+                continue
+
+            logger.info("%d course(s) to scrape (%s).", len(due), state.counts())
+            _, _, pass_skipped = run_courses(
+                due,
+                fetch_workers=args.fetch_workers,
+                parse_workers=args.parse_workers,
+                parse_chunk=args.parse_chunk,
+                host_delay=args.host_delay,
+                use_browser=not (args.no_browser or args.offline),
+                browsers=args.browsers,
+                offline=args.offline,
+                fingerprints=None if args.force else fingerprints,
+                on_rows=store_rows,
+                state=state,
+            )
+            skipped += pass_skipped
+            if (
+                buffer is not None and not buffer.flush()
+            ):  # Settle this pass's courses before the next
+                logger.error("Failed to insert data into database.")
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "Scraped %d tee rows from %d course(s) in %.2fs.",
+            tee_rows,
+            len(courses),
+            elapsed,
+        )
+        logger.info("Skipped %d of %d course(s) as unchanged.", skipped, len(courses))
+        logger.info("Crawl state: %s", state.counts())
+        dead_letters = state.dead_letters()
+        if dead_letters:
+            logger.warning(
+                "%d dead-lettered job(s) (rerun with --retry-dead):\n%s",
+                len(dead_letters),
+                "\n".join(
+                    f"  {url} {hole or ''} after {attempts} attempts: {error}"
+                    for url, hole, attempts, error in dead_letters
+                ),
+            )
+
+        if buffer is not None:
+            if not buffer.close():
+                logger.error("Failed to insert data into database.")
+            fingerprints.save()
+            logger.info("Write-behind stats: %s", buffer.stats())
+            logger.info("Connection pool stats: %s", db_pool.stats())
+    finally:
+        if db_pool is not None:
+            db_pool.close()
+        state.close()
+
+
+if __name__ == "__main__":
+    main()
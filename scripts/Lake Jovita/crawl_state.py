@@ -0,0 +1,206 @@
+"""Persistent crawl state so an interrupted multi-course run can resume.
+
+Every course (and every hole pane left for the browser) is a job that moves
+through pending -> fetched -> parsed -> loaded. A failed attempt puts the job
+back to "failed" with its error and a next-attempt time that backs off
+exponentially; after max_attempts it becomes "dead" and is listed in the
+dead-letter report instead of being retried. A restarted run only picks up
+jobs that are not loaded or dead and whose retry time has come. A new crawl of
+the same manifest (the nightly re-scrape) calls restart() first, which puts
+every loaded, parsed or failed job back to pending; jobs loaded after that are
+skipped for the rest of the crawl as usual.
+
+State lives in a local SQLite file, so it survives crashes and spot-instance
+interruptions without needing the database to be reachable.
+
+Settings (environment):
+    CRAWL_STATE            SQLite file (default data/crawl_state.sqlite3)
+    CRAWL_MAX_ATTEMPTS     attempts before a job is dead-lettered (default 5)
+    CRAWL_RETRY_BASE       seconds before the first retry, doubled each time
+                           (default 30)
+    CRAWL_RETRY_MAX        cap on the retry delay in seconds (default 3600)
+"""
+
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+
+from settings import get_settings
+
+STATES = ("pending", "fetched", "parsed", "loaded", "failed", "dead")
+COURSE = ""  # hole value of a course-level job
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS crawl_jobs (
+    url TEXT NOT NULL,
+    hole TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (url, hole)
+);
+CREATE INDEX IF NOT EXISTS crawl_jobs_state_idx ON crawl_jobs (state, next_attempt_at);
+"""
+
+
+class CrawlState:
+    def __init__(
+        self,
+        path=None,
+        max_attempts=None,
+        retry_base=None,
+        retry_max=None,
+        read_only=False,
+    ):
+        """Open (creating if needed) the state file.
+
+        read_only=True opens an existing file with SQLite's mode=ro for
+        reporting: no schema is created and the journal mode is left as it is.
+        """
+        settings = get_settings()
+        self.path = path or settings.crawl_state
+        self.max_attempts = max_attempts or settings.crawl_max_attempts
+        self.retry_base = retry_base or settings.crawl_retry_base
+        self.retry_max = retry_max or settings.crawl_retry_max
+
+        self._lock = threading.Lock()
+        if read_only:
+            uri = pathlib.Path(self.path).absolute().as_uri() + "?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Fetch threads and the write-behind flusher all report progress here.
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA_SQL)
+
+    def enqueue(self, urls):
+        """Add course jobs for urls not seen before; existing jobs keep their state."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO crawl_jobs (url, hole, updated_at) "
+                "VALUES (?, ?, ?)",
+                [(url, COURSE, now) for url in urls],
+            )
+
+    def restart(self):
+        """Queue every job that is not dead again, with a fresh set of attempts."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE crawl_jobs SET state = 'pending', attempts = 0, "
+                "next_attempt_at = 0, last_error = NULL, updated_at = ? "
+                "WHERE hole = ? AND state != 'dead'",
+                (time.time(), COURSE),
+            ).rowcount
+
+    def due(self, urls, done_states=("loaded",)):
+        """The urls whose course job still has work to do right now."""
+        skip = set(done_states) | {"dead"}
+        now = time.time()
+        with self._lock:
+            rows = dict(
+                self._conn.execute(
+                    "SELECT url, state FROM crawl_jobs "
+                    "WHERE hole = ? AND (state IN ({}) OR next_attempt_at > ?)".format(
+                        ", ".join("?" * len(skip))
+                    ),
+                    (COURSE, *skip, now),
+                ).fetchall()
+            )
+        return [url for url in urls if url not in rows]
+
+    def next_retry_in(self):
+        """Seconds until the earliest scheduled retry, or None if none is waiting."""
+        with self._lock:
+            (next_at,) = self._conn.execute(
+                "SELECT min(next_attempt_at) FROM crawl_jobs "
+                "WHERE hole = ? AND state = 'failed'",
+                (COURSE,),
+            ).fetchone()
+        return None if next_at is None else max(0.0, next_at - time.time())
+
+    def mark(self, url, state, hole=COURSE):
+        """Move a job forward; reaching "loaded" also completes its hole jobs.
+
+        A loaded job starts its next crawl with no attempts used.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO crawl_jobs (url, hole, state, updated_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (url, hole) DO UPDATE "
+                "SET state = excluded.state, updated_at = excluded.updated_at",
+                (url, hole, state, now),
+            )
+            if state == "loaded":
+                self._conn.execute(
+                    "UPDATE crawl_jobs SET state = 'loaded', attempts = 0, "
+                    "next_attempt_at = 0, last_error = NULL, updated_at = ? "
+                    "WHERE url = ? AND (hole = ? OR ? = ?)",
+                    (now, url, hole, hole, COURSE),
+                )
+
+    def mark_holes(self, url, holes, state):
+        for hole in holes:
+            self.mark(url, state, hole=hole)
+
+    def fail(self, url, error, hole=COURSE):
+        """Record a failed attempt and schedule the retry (or dead-letter it)."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT attempts FROM crawl_jobs WHERE url = ? AND hole = ?",
+                (url, hole),
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            state = "dead" if attempts >= self.max_attempts else "failed"
+            delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+            self._conn.execute(
+                "INSERT INTO crawl_jobs "
+                "(url, hole, state, attempts, next_attempt_at, last_error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url, hole) DO UPDATE SET state = excluded.state, "
+                "attempts = excluded.attempts, "
+                "next_attempt_at = excluded.next_attempt_at, "
+                "last_error = excluded.last_error, updated_at = excluded.updated_at",
+                (url, hole, state, attempts, now + delay, str(error), now),
+            )
+        return state
+
+    def dead_letters(self):
+        """[(url, hole, attempts, last error)] for jobs that gave up."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, hole, attempts, last_error FROM crawl_jobs "
+                "WHERE state = 'dead' ORDER BY url, hole"
+            ).fetchall()
+
+    def retry_dead(self):
+        """Give every dead-lettered job a fresh set of attempts."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE crawl_jobs SET state = 'pending', attempts = 0, "
+                "next_attempt_at = 0 WHERE state = 'dead'"
+            ).rowcount
+
+    def counts(self):
+        """{state: number of course jobs}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, count(*) FROM crawl_jobs WHERE hole = ? GROUP BY state",
+                (COURSE,),
+            ).fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
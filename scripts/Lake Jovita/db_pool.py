@@ -0,0 +1,295 @@
+"""Pooled PostgreSQL connections and a write-behind buffer for tee rows.
+
+Usage:
+    pool = ConnectionPool()
+    pool.ensure_schema()
+    buffer = WriteBehindBuffer(pool)
+    buffer.add(df, on_loaded=lambda: print("course stored"))
+    ...
+    buffer.close()
+    pool.close()
+
+Connections are opened once and shared by every worker instead of one
+psycopg2.connect per course, and the table DDL runs once per pool rather than
+per load. The buffer collects tee rows from many courses and writes them with a
+single load_golf_data call (one transaction) when it holds flush_rows rows or
+its oldest rows are flush_seconds old.
+
+Settings (environment):
+    DB_POOL_MIN               connections opened up front (default 1)
+    DB_POOL_MAX               connection limit (default 4)
+    DB_POOL_ACQUIRE_TIMEOUT   seconds a worker waits for a connection (default 30)
+    DB_FLUSH_ROWS             buffered tee rows that trigger a flush (default 5000)
+    DB_FLUSH_SECONDS          age of buffered rows that triggers a flush (default 5)
+    DB_BUFFER_MAX_ROWS        buffered rows at which add() blocks until a flush
+                              makes room (default 4 x DB_FLUSH_ROWS)
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+from psycopg2 import Error as Psycopg2Error
+from psycopg2 import extensions
+from psycopg2.pool import ThreadedConnectionPool
+
+from lake_jovita_south_scraper import (
+    DB_HOST,
+    DB_NAME,
+    DB_PASSWORD,
+    DB_USER,
+    create_golf_data_table,
+    load_golf_data,
+)
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    def __init__(self, minconn=None, maxconn=None, acquire_timeout=None):
+        settings = get_settings()
+        self.minconn = minconn or settings.db_pool_min
+        self.maxconn = maxconn or settings.db_pool_max
+        self.acquire_timeout = acquire_timeout or settings.db_pool_acquire_timeout
+
+        # ThreadedConnectionPool raises instead of blocking when every connection
+        # is out, so the semaphore makes callers queue for one.
+        self._pool = ThreadedConnectionPool(
+            self.minconn,
+            self.maxconn,
+            host=DB_HOST,
+            database=DB_NAME,
+            user=DB_USER,
+            password=DB_PASSWORD,
+        )
+        self._available = threading.BoundedSemaphore(self.maxconn)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._acquire_waits = []
+        self._saturated_acquires = 0
+        self._schema_checked = False
+        logger.info(
+            "Opened PostgreSQL pool for %s (%d-%d connections).",
+            DB_NAME,
+            self.minconn,
+            self.maxconn,
+        )
+
+    def acquire(self, timeout=None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        saturated = not self._available.acquire(blocking=False)
+        if saturated and not self._available.acquire(timeout=timeout):
+            raise TimeoutError(
+                f"No database connection became available within {timeout}s "
+                f"(pool size {self.maxconn})."
+            )
+        try:
+            conn = self._pool.getconn()
+        except Exception:
+            self._available.release()
+            raise
+        with self._lock:
+            self._acquire_waits.append(time.perf_counter() - start)
+            self._saturated_acquires += saturated
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        return conn
+
+    def release(self, conn):
+        # Never hand the next worker a connection mid-transaction or broken.
+        close = bool(conn.closed)
+        if not close:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Psycopg2Error:
+                close = True
+        self._pool.putconn(conn, close=close)
+        with self._lock:
+            self._in_use -= 1
+        self._available.release()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def ensure_schema(self):
+        """Run create_golf_data_table() once per pool.
+
+        Its DDL is idempotent, so tables created by older versions also get the
+        columns, indexes and quarantine table added since; running it once keeps
+        it off the per-course path.
+        """
+        with self._lock:
+            if self._schema_checked:
+                return True
+        with self.connection() as conn:
+            ok = create_golf_data_table(conn)
+        with self._lock:
+            self._schema_checked = ok
+        return ok
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._acquire_waits)
+            return {
+                "size": self.maxconn,
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "saturation": self._in_use / self.maxconn,
+                "acquires": len(waits),
+                "saturated_acquires": self._saturated_acquires,
+                "acquire_wait_avg_s": sum(waits) / len(waits) if waits else 0.0,
+                "acquire_wait_max_s": waits[-1] if waits else 0.0,
+            }
+
+    def close(self):
+        self._pool.closeall()
+        logger.info("Database connection pool closed.")
+
+
+class WriteBehindBuffer:
+    """Groups tee-row DataFrames from many courses into one load per flush.
+
+    add() never touches the database; a background thread flushes when the row
+    or age threshold is reached. on_loaded callbacks run only after the rows they
+    were added with are committed, so callers can record fingerprints there;
+    on_failed callbacks run instead if that flush fails. Once max_rows rows are
+    waiting, add() blocks until a flush takes them, which slows the producer down
+    to the database's pace instead of letting the buffer grow.
+    """
+
+    def __init__(
+        self, pool, flush_rows=None, flush_seconds=None, mode=None, max_rows=None
+    ):
+        self.pool = pool
+        settings = get_settings()
+        self.flush_rows = flush_rows or settings.db_flush_rows
+        self.flush_seconds = flush_seconds or settings.db_flush_seconds
+        self.max_rows = max_rows or settings.db_buffer_max_rows or 4 * self.flush_rows
+        self.mode = mode
+
+        self._lock = threading.Lock()
+        self._room = threading.Condition(self._lock)
+        self._blocked_s = 0.0
+        self._flush_lock = threading.Lock()  # One flush at a time keeps row order
+        self._frames = []
+        self._callbacks = []
+        self._rows = 0
+        self._oldest = None
+        self._wake = threading.Event()
+        self._closed = False
+        self._flush_latencies = []
+        self._rows_flushed = 0
+        self._failed_flushes = 0
+        self._failed_rows = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def add(self, df, on_loaded=None, on_failed=None):
+        if self._closed:
+            raise RuntimeError("WriteBehindBuffer is closed.")
+        if df.empty and on_loaded is None and on_failed is None:
+            return
+        with self._room:
+            if self._rows >= self.max_rows:
+                start = time.perf_counter()
+                while self._rows >= self.max_rows and not self._closed:
+                    self._wake.set()
+                    self._room.wait()
+                self._blocked_s += time.perf_counter() - start
+            if not df.empty:
+                self._frames.append(df)
+                self._rows += len(df)
+            self._callbacks.append((on_loaded, on_failed))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = self._rows >= self.flush_rows
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_seconds / 4)
+            self._wake.clear()
+            with self._lock:
+                due = self._rows >= self.flush_rows or (
+                    self._oldest is not None
+                    and time.monotonic() - self._oldest >= self.flush_seconds
+                )
+            if due:
+                self.flush()
+
+    def flush(self):
+        """Write everything buffered so far in one transaction; True on success."""
+        with self._flush_lock:
+            with self._lock:
+                frames, self._frames = self._frames, []
+                callbacks, self._callbacks = self._callbacks, []
+                rows, self._rows = self._rows, 0
+                self._oldest = None
+                self._room.notify_all()
+            if not frames and not callbacks:
+                return True
+
+            start = time.perf_counter()
+            try:
+                if frames:
+                    with self.pool.connection() as conn:
+                        ok = load_golf_data(
+                            conn, pd.concat(frames, ignore_index=True), self.mode
+                        )
+                else:
+                    ok = True
+            except Exception as e:
+                logger.exception("Error flushing %d buffered tee rows: %s", rows, e)
+                ok = False
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._flush_latencies.append(elapsed)
+                if ok:
+                    self._rows_flushed += rows
+                else:
+                    self._failed_flushes += 1
+                    self._failed_rows += rows
+            for on_loaded, on_failed in callbacks:
+                callback = on_loaded if ok else on_failed
+                if callback is not None:
+                    callback()
+            return ok
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._flush_latencies)
+            return {
+                "pending_rows": self._rows,
+                "add_blocked_s": self._blocked_s,
+                "flushes": len(latencies),
+                "rows_flushed": self._rows_flushed,
+                "failed_flushes": self._failed_flushes,
+                "failed_rows": self._failed_rows,
+                "flush_latency_avg_s": (
+                    sum(latencies) / len(latencies) if latencies else 0.0
+                ),
+                "flush_latency_max_s": latencies[-1] if latencies else 0.0,
+            }
+
+    def close(self):
+        """Stop the flusher thread and write whatever is still buffered."""
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        return self.flush()
@@ -0,0 +1,199 @@
+"""Pool of warm headless Chrome drivers shared by scrape jobs.
+
+Usage:
+    pool = DriverPool(size=2)
+    with pool.driver() as driver:
+        scrape_course_selenium(driver, url)
+    pool.close()
+
+Sizing is read from the environment when not passed explicitly:
+    DRIVER_POOL_SIZE              number of browsers kept open (default 2)
+    DRIVER_POOL_ACQUIRE_TIMEOUT   seconds a job waits for a free browser (default 60)
+    DRIVER_MAX_PAGES              pages served before a browser is replaced (default 50)
+    DRIVER_MAX_MEMORY_MB          browser RSS that forces a replacement (default 1024)
+
+When no browser is running, because Chrome failed to launch at warm-up or
+failed to relaunch after the last one was recycled, acquire() raises
+RuntimeError at once instead of waiting out the acquire timeout.
+"""
+
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from lake_jovita_south_scraper import get_chrome_driver
+from settings import get_settings
+
+try:
+    import psutil
+except ImportError:  # Memory-based recycling is skipped without psutil
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Put on the idle queue when the last browser is gone, to wake waiting jobs.
+_NO_DRIVERS = None
+
+
+class DriverPool:
+    def __init__(
+        self,
+        size=None,
+        acquire_timeout=None,
+        max_pages=None,
+        max_memory_mb=None,
+    ):
+        settings = get_settings()
+        self.size = size or settings.driver_pool_size
+        self.acquire_timeout = acquire_timeout or settings.driver_pool_acquire_timeout
+        self.max_pages = max_pages or settings.driver_max_pages
+        self.max_memory_mb = max_memory_mb or settings.driver_max_memory_mb
+
+        self._idle = queue.Queue()
+        self._pages_served = {}
+        self._lock = threading.Lock()
+        self._acquire_waits = []
+        self._recycled = 0
+
+        logger.info("Warming driver pool with %d headless browser(s)...", self.size)
+        for _ in range(self.size):
+            driver = self._launch()
+            if driver:
+                self._idle.put(driver)
+        if not self.live():
+            logger.error("No WebDriver could be launched; browser jobs will fail.")
+
+    def _launch(self):
+        driver = get_chrome_driver(headless=True)
+        if driver:
+            with self._lock:
+                self._pages_served[id(driver)] = 0
+        return driver
+
+    def live(self):
+        """Number of browsers launched and not yet retired, idle or in use."""
+        with self._lock:
+            return len(self._pages_served)
+
+    def _no_drivers(self):
+        return RuntimeError(
+            f"No WebDriver is running (pool size {self.size}); Chrome failed to "
+            "launch."
+        )
+
+    def _memory_mb(self, driver):
+        """Resident memory of the chromedriver process and its Chrome children."""
+        if psutil is None:
+            return 0.0
+        try:
+            service_process = psutil.Process(driver.service.process.pid)
+            processes = [service_process] + service_process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except (psutil.Error, AttributeError):
+            return 0.0
+
+    def _reset(self, driver):
+        """Clear cookies and storage and park the browser on a blank page."""
+        driver.delete_all_cookies()
+        driver.execute_script(
+            "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+        )
+        driver.get("about:blank")
+
+    def _retire(self, driver):
+        with self._lock:
+            self._pages_served.pop(id(driver), None)
+            self._recycled += 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning("Error closing recycled WebDriver: %s", e)
+
+    def acquire(self, timeout=None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        if not self.live():
+            raise self._no_drivers()
+        start = time.perf_counter()
+        try:
+            driver = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No WebDriver became available within {timeout}s "
+                f"(pool size {self.size})."
+            )
+        if driver is _NO_DRIVERS:
+            self._idle.put(_NO_DRIVERS)  # for the next waiting job
+            raise self._no_drivers()
+        with self._lock:
+            self._acquire_waits.append(time.perf_counter() - start)
+        return driver
+
+    def release(self, driver):
+        with self._lock:
+            self._pages_served[id(driver)] = self._pages_served.get(id(driver), 0) + 1
+            pages = self._pages_served[id(driver)]
+
+        recycle_reason = None
+        if pages >= self.max_pages:
+            recycle_reason = f"served {pages} pages"
+        else:
+            memory_mb = self._memory_mb(driver)
+            if memory_mb > self.max_memory_mb:
+                recycle_reason = f"using {memory_mb:.0f} MB"
+            else:
+                try:
+                    self._reset(driver)
+                except Exception as e:
+                    recycle_reason = f"reset failed ({e})"
+
+        if recycle_reason:
+            logger.info("Recycling WebDriver: %s.", recycle_reason)
+            self._retire(driver)
+            driver = self._launch()
+            if not driver:
+                logger.error(
+                    "Could not launch a replacement WebDriver; pool shrinks by one."
+                )
+                if not self.live():
+                    self._idle.put(_NO_DRIVERS)
+                return
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._acquire_waits)
+            recycled = self._recycled
+            live = len(self._pages_served)
+        return {
+            "size": self.size,
+            "live": live,
+            "idle": self._idle.qsize() if live else 0,  # not the _NO_DRIVERS marker
+            "acquires": len(waits),
+            "recycled": recycled,
+            "acquire_wait_avg_s": sum(waits) / len(waits) if waits else 0.0,
+            "acquire_wait_max_s": waits[-1] if waits else 0.0,
+        }
+
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is _NO_DRIVERS:
+                continue
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning("Error closing WebDriver: %s", e)
+        logger.info("Driver pool closed.")
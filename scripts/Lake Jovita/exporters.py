@@ -0,0 +1,133 @@
+"""File exports of scraped tee rows: the CSV snapshot and a typed Parquet dataset.
+
+The Parquet dataset is hive-partitioned by state and run date
+(state=FL/run_date=2024-05-01/part-....parquet). Par_*/Hole_* and the other
+whole-number columns are nullable int32, Rating is decimal(4,1), and text columns
+are dictionary-encoded strings, compressed with zstd. Every export writes new
+part files, so the dataset grows incrementally across runs and chunks; read it
+back with pd.read_parquet(PARQUET_DIR).
+
+Settings (environment):
+    EXPORT_FORMATS   comma-separated formats to write (default "csv,parquet")
+    PARQUET_DIR      dataset root (default data/golf_data_parquet)
+"""
+
+import datetime
+import logging
+import os
+import uuid
+from decimal import Decimal
+
+import pandas as pd
+
+from instrumentation import get_metrics
+from lake_jovita_south_scraper import (
+    INT_COLUMNS,
+    NUMERIC_COLUMNS,
+    OUTPUT_COLUMNS,
+    prepare_golf_data_frame,
+)
+from settings import get_settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # Parquet export is skipped without pyarrow
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+EXPORT_FORMATS = settings.export_formats
+PARQUET_DIR = settings.parquet_dir
+PARTITION_COLUMNS = ["state", "run_date"]
+UNKNOWN_STATE = "unknown"
+
+
+def export_csv(df_data, path, append=False):
+    """Write tee rows as CSV; append=True adds rows without repeating the header."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_header = not (append and os.path.exists(path))
+    with get_metrics().span("csv_write", rows=len(df_data)):
+        df_data.to_csv(
+            path,
+            mode="a" if append else "w",
+            header=write_header,
+            index=False,
+            encoding="utf-8",
+        )
+    logger.info("Saved %d tee rows to CSV: %s", len(df_data), path)
+    return path
+
+
+def parquet_schema(columns):
+    fields = []
+    for col in columns:
+        if col in INT_COLUMNS:
+            fields.append(pa.field(col, pa.int32()))
+        elif col in NUMERIC_COLUMNS:
+            fields.append(pa.field(col, pa.decimal128(4, 1)))
+        else:
+            # Plain strings: the Parquet writer dictionary-encodes them on disk,
+            # while Arrow dictionary columns make partitioning several times slower.
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+def parquet_table(df_data, run_date):
+    """Typed Arrow table of tee rows plus the state/run_date partition columns."""
+    df = prepare_golf_data_frame(df_data)
+    for col in NUMERIC_COLUMNS:
+        # Arrow will not cast floats to decimal without rounding errors.
+        df[col] = [
+            None if pd.isna(value) else Decimal(f"{value:.1f}") for value in df[col]
+        ]
+    df["state"] = df["StateorRegion"].fillna(UNKNOWN_STATE).astype(str)
+    df["run_date"] = run_date.isoformat()
+
+    columns = [c for c in OUTPUT_COLUMNS if c in df.columns] + PARTITION_COLUMNS
+    columns += [c for c in df.columns if c not in columns]
+    return pa.Table.from_pandas(
+        df[columns], schema=parquet_schema(columns), preserve_index=False
+    )
+
+
+def export_parquet(df_data, root=None, run_date=None):
+    """Append tee rows to the partitioned Parquet dataset; returns the root or None."""
+    if pa is None:
+        logger.warning("pyarrow is not installed; skipping the Parquet export.")
+        return None
+    root = root or PARQUET_DIR
+    run_date = run_date or datetime.date.today()
+    with get_metrics().span("parquet_write", rows=len(df_data)):
+        table = parquet_table(df_data, run_date)
+        ds.write_dataset(
+            table,
+            root,
+            format="parquet",
+            file_options=ds.ParquetFileFormat().make_write_options(
+                compression="zstd", use_dictionary=True
+            ),
+            partitioning=PARTITION_COLUMNS,
+            partitioning_flavor="hive",
+            # A unique name per call appends to partitions instead of replacing them.
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            # The writer otherwise emits a row group per incoming batch, and reading
+            # dozens of tiny row groups per file costs more than the data itself.
+            min_rows_per_group=64 * 1024,
+            max_rows_per_group=1024 * 1024,
+        )
+    logger.info("Appended %d tee rows to Parquet dataset: %s", table.num_rows, root)
+    return root
+
+
+def export_tee_rows(df_data, csv_path, formats=None, append=False, run_date=None):
+    """Write the configured EXPORT_FORMATS ("csv", "parquet" or both)."""
+    formats = {f.strip() for f in (formats or EXPORT_FORMATS).split(",") if f.strip()}
+    if "csv" in formats:
+        export_csv(df_data, csv_path, append=append)
+    if "parquet" in formats:
+        export_parquet(df_data, run_date=run_date)
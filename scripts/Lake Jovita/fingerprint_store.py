@@ -0,0 +1,46 @@
+"""Per-course page fingerprints from the last successful ingest.
+
+A fingerprint is a hash of the part of a course page the scraper reads (see
+CourseParser.fingerprint in parsers.py). When a freshly fetched page
+has the same fingerprint as the last ingest, parsing and loading are skipped.
+
+Settings (environment):
+    FINGERPRINT_STORE   JSON file holding {url: fingerprint}
+                        (default data/page_fingerprints.json)
+"""
+
+import json
+import os
+import threading
+
+from settings import get_settings
+
+
+class FingerprintStore:
+    def __init__(self, path=None):
+        self.path = path or get_settings().fingerprint_store
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._fingerprints = json.load(f)
+        except (OSError, ValueError):
+            self._fingerprints = {}
+
+    def get(self, url):
+        with self._lock:
+            return self._fingerprints.get(url)
+
+    def record(self, url, fingerprint):
+        """Remember a fingerprint; call only after the course was loaded."""
+        with self._lock:
+            self._fingerprints[url] = fingerprint
+
+    def save(self):
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._fingerprints, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
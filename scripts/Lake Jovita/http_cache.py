@@ -0,0 +1,182 @@
+"""On-disk HTTP response cache with conditional revalidation.
+
+Each URL is stored as a gzip-compressed body plus a small JSON file holding its
+ETag / Last-Modified headers. Within HTTP_CACHE_TTL seconds a cached page is
+returned without touching the network; after that it is revalidated with
+If-None-Match / If-Modified-Since and the cached body is reused on a 304.
+When the cache grows past HTTP_CACHE_MAX_MB, the least recently used pages are
+evicted until it is back under EVICT_TO of the bound. The size of the cached
+bodies is counted once when the cache opens and kept up to date on every write
+and eviction, so the directory is only scanned when an eviction is due.
+Offline lookups never go to the network.
+
+Settings (environment):
+    HTTP_CACHE_DIR      cache location (default data/http_cache)
+    HTTP_CACHE_TTL      seconds before a page is revalidated (default 86400)
+    HTTP_CACHE_MAX_MB   size bound for cached bodies (default 500)
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Eviction frees room down to this fraction of max_bytes, so a full cache does
+# not scan the directory again on every write.
+EVICT_TO = 0.9
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=None, ttl=None, max_mb=None):
+        settings = get_settings()
+        if ttl is None:
+            ttl = settings.http_cache_ttl
+        if max_mb is None:
+            max_mb = settings.http_cache_max_mb
+        self.cache_dir = cache_dir or settings.http_cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._bodies())
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".html.gz"
+
+    def _read(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        os.utime(body_path)  # Body mtime doubles as the LRU access time
+        return meta, body
+
+    def _write(self, url, meta, body):
+        meta_path, body_path = self._paths(url)
+        for path, data, opener in (
+            (body_path, body, gzip.open),
+            (meta_path, json.dumps(meta).encode("utf-8"), open),
+        ):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with opener(tmp_path, "wb") as f:
+                f.write(data)
+            if path != body_path:
+                os.replace(tmp_path, path)
+                continue
+            with self._lock:
+                # A rewritten page replaces its old body in the running total.
+                self._total_bytes += os.path.getsize(tmp_path) - _size(path)
+                os.replace(tmp_path, path)
+        with self._lock:
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _touch_meta(self, url, meta):
+        meta_path, _ = self._paths(url)
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _bodies(self):
+        """[(mtime, size, path)] of every cached body."""
+        bodies = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".html.gz"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                bodies.append((stat.st_mtime, stat.st_size, path))
+        return bodies
+
+    def _evict(self):
+        """Drop least recently used pages down to EVICT_TO; caller holds _lock."""
+        bodies = self._bodies()
+        total = sum(size for _, size, _ in bodies)
+        for _, size, path in sorted(bodies):
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            for stale in (path, path[: -len(".html.gz")] + ".json"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+            total -= size
+        self._total_bytes = total
+
+    def get(self, url, headers=None, offline=False, timeout=15):
+        """Return the page body as text, or None if it could not be obtained."""
+        meta, body = self._read(url)
+        if offline:
+            if body is None:
+                logger.warning("Offline: %s is not in the response cache.", url)
+                return None
+            return body.decode(meta.get("encoding") or "utf-8", errors="replace")
+
+        if body is not None and time.time() - meta.get("fetched_at", 0) < self.ttl:
+            return body.decode(meta.get("encoding") or "utf-8", errors="replace")
+
+        request_headers = dict(headers or {})
+        if body is not None:
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = requests.get(url, headers=request_headers, timeout=timeout)
+        if response.status_code == 304 and body is not None:
+            meta["fetched_at"] = time.time()
+            self._touch_meta(url, meta)
+            return body.decode(meta.get("encoding") or "utf-8", errors="replace")
+
+        response.raise_for_status()
+        encoding = response.encoding or response.apparent_encoding or "utf-8"
+        self._write(
+            url,
+            {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "encoding": encoding,
+                "fetched_at": time.time(),
+            },
+            response.content,
+        )
+        return response.content.decode(encoding, errors="replace")
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """The process-wide cache, created on first use."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
@@ -0,0 +1,337 @@
+"""Per-stage timings, logging setup and profiling for scrape runs.
+
+Every pipeline stage runs inside a span:
+
+    with get_metrics().span("parse", course=url):
+        ...
+
+Span durations go into one fixed-bucket histogram per stage (so memory does not
+grow with the crawl) and, when METRICS_JSONL is set, one JSON line per span
+with the course it belongs to. At the end of a run the histograms are appended
+to the JSON lines file as "summary" records and written in the Prometheus text
+format to METRICS_PROM (a node_exporter textfile collector can pick it up);
+METRICS_PORT additionally serves them at http://host:port/metrics while the
+run is going.
+
+Stages recorded by the scraper: driver_startup, fetch, page_load, tab_wait,
+parse, build_rows, db_insert, db_upsert, csv_write and parquet_write.
+
+Settings (environment):
+    METRICS_JSONL   JSON lines file appended to (default data/metrics.jsonl;
+                    "off" disables it)
+    METRICS_PROM    Prometheus text file rewritten at the end of a run
+                    (default data/metrics.prom; "off" disables it)
+    METRICS_PORT    port serving /metrics during a run (default: not served)
+    LOG_LEVEL       default level for configure_logging() (default INFO)
+
+This module only uses the standard library, so parse worker processes can
+import it cheaply.
+"""
+
+import bisect
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+METRICS_JSONL = settings.metrics_jsonl
+METRICS_PROM = settings.metrics_prom
+METRICS_PORT = settings.metrics_port
+LOG_LEVEL = settings.log_level
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Upper bounds (seconds) from sub-millisecond parses to minute-long page loads.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def configure_logging(level=None):
+    """Send log records to stderr at level (a name or number; default LOG_LEVEL).
+
+    Also the ProcessPoolExecutor initializer for parse workers, which would
+    otherwise drop everything below WARNING.
+    """
+    level = level or LOG_LEVEL
+    if isinstance(level, str):
+        level = level.upper()
+    logging.basicConfig(level=level, format=LOG_FORMAT, force=True)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, ok=True):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        if not ok:
+            self.errors += 1
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the fraction-th observation."""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self):
+        """[(le, cumulative count)], ending with ("+Inf", count)."""
+        running = 0
+        result = []
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+
+class Span:
+    """Yielded by Metrics.span(); fail() marks a stage that failed without raising.
+
+    Loaders that catch their own errors and return False use it.
+    """
+
+    def __init__(self, stage, course, fields):
+        self.stage = stage
+        self.course = course
+        self.fields = fields
+        self.error = None
+
+    def fail(self, error):
+        self.error = str(error)
+
+
+class Metrics:
+    def __init__(self, jsonl_path=None):
+        self.jsonl_path = METRICS_JSONL if jsonl_path is None else jsonl_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._histograms = {}  # stage -> Histogram
+        self._jsonl = None
+
+    def _write_line(self, record):
+        if self.jsonl_path in ("", "off"):
+            return
+        if self._jsonl is None:
+            directory = os.path.dirname(self.jsonl_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._jsonl = open(self.jsonl_path, "a", encoding="utf-8")
+        self._jsonl.write(json.dumps(record, default=str) + "\n")
+
+    def record(self, stage, seconds, course=None, error=None, **fields):
+        """Add one observation; fields are extra JSON line keys (counts, sizes)."""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds, ok=error is None)
+            record = {
+                "type": "span",
+                "run": self.run_id,
+                "ts": time.time(),
+                "stage": stage,
+                "seconds": round(seconds, 6),
+            }
+            if course is not None:
+                record["course"] = course
+            if error is not None:
+                record["error"] = error
+            record.update(fields)
+            self._write_line(record)
+
+    @contextmanager
+    def span(self, stage, course=None, **fields):
+        """Time the body as one observation of stage; an exception marks it failed."""
+        span = Span(stage, course, fields)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self.record(
+                stage,
+                time.perf_counter() - start,
+                course=course,
+                error=span.error,
+                **span.fields,
+            )
+
+    def stats(self):
+        """{stage: count, errors, avg/p50/p95 (bucket bounds) and max seconds}."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "errors": h.errors,
+                    "avg_s": h.sum / h.count if h.count else 0.0,
+                    "p50_s": h.quantile(0.5),
+                    "p95_s": h.quantile(0.95),
+                    "max_s": h.max,
+                }
+                for stage, h in sorted(self._histograms.items())
+            }
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP scrape_stage_seconds Time spent in each scrape pipeline stage.",
+            "# TYPE scrape_stage_seconds histogram",
+        ]
+        errors = []
+        with self._lock:
+            for stage, h in sorted(self._histograms.items()):
+                for bound, count in h.cumulative():
+                    lines.append(
+                        f'scrape_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} '
+                        f"{count}"
+                    )
+                lines.append(f'scrape_stage_seconds_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'scrape_stage_seconds_count{{stage="{stage}"}} {h.count}')
+                errors.append(
+                    f'scrape_stage_errors_total{{stage="{stage}"}} {h.errors}'
+                )
+        lines += [
+            "# HELP scrape_stage_errors_total Stage runs that failed.",
+            "# TYPE scrape_stage_errors_total counter",
+            *errors,
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=None):
+        """Replace path atomically, so a collector never reads half a file."""
+        path = METRICS_PROM if path is None else path
+        if path in ("", "off"):
+            return None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+        return path
+
+    def serve_prometheus(self, port, host="0.0.0.0"):
+        """Serve /metrics from a daemon thread; returns the server."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info("Serving metrics at http://%s:%s/metrics", host, port)
+        return server
+
+    def close(self):
+        """Append the per-stage summaries to the JSON lines file and close it."""
+        with self._lock:
+            for stage, h in sorted(self._histograms.items()):
+                self._write_line(
+                    {
+                        "type": "summary",
+                        "run": self.run_id,
+                        "ts": time.time(),
+                        "stage": stage,
+                        "count": h.count,
+                        "errors": h.errors,
+                        "sum_s": h.sum,
+                        "max_s": h.max,
+                        "buckets": {str(le): n for le, n in h.cumulative()},
+                    }
+                )
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """The process-wide Metrics shared by every scrape thread."""
+    return _metrics
+
+
+@contextmanager
+def instrumented_run(log_level=None, profile=False, profile_top=25):
+    """Logging, metrics outputs and optional cProfile around a command's main().
+
+    With profile=True the body runs under cProfile and the profile_top functions
+    by cumulative time are logged when it ends.
+    """
+    configure_logging(log_level)
+    metrics = get_metrics()
+    server = metrics.serve_prometheus(METRICS_PORT) if METRICS_PORT else None
+    profiler = cProfile.Profile() if profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            report = io.StringIO()
+            stats = pstats.Stats(profiler, stream=report)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(profile_top)
+            logger.info(
+                "Top %d hot spots by cumulative time:\n%s",
+                profile_top,
+                report.getvalue(),
+            )
+        for stage, stage_stats in metrics.stats().items():
+            logger.info("Stage %s: %s", stage, stage_stats)
+        prom_path = metrics.write_prometheus()
+        if prom_path:
+            logger.info("Wrote stage metrics to %s", prom_path)
+        metrics.close()
+        if server is not None:
+            server.shutdown()
+
+
+def add_instrumentation_arguments(parser):
+    """--log-level and --profile, shared by the command-line entry points."""
+    parser.add_argument(
+        "--log-level",
+        default=None,
+        help="DEBUG shows every hole as it is parsed (default: LOG_LEVEL or INFO)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run under cProfile and log the top hot spots at the end",
+    )
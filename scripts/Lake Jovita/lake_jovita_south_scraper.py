@@ -1,56 +1,152 @@
+import argparse
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import time
-import traceback
+import hashlib
+import io
+import logging
+import threading
 import os
-from dotenv import load_dotenv
 
-load_dotenv()  # Load variables from .env
+from fingerprint_store import FingerprintStore
+from http_cache import get_response_cache
+from instrumentation import add_instrumentation_arguments, get_metrics, instrumented_run
+from parsers import get_parser, make_hole_record, parse_hole_pane
+from settings import get_settings
+from waits import get_wait_recorder
+
+settings = get_settings()  # Loads .env
 
 # Database imports
 import psycopg2
 from psycopg2 import Error as Psycopg2Error
+from psycopg2.extras import execute_values
 
-# Selenium imports
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import (
-    TimeoutException,
-    WebDriverException,
-    NoSuchElementException,
-)
-
-# NEW: Import for webdriver_manager
-from webdriver_manager.chrome import ChromeDriverManager
+# Selenium, webdriver_manager and BeautifulSoup are imported inside the browser
+# functions, so loading, exporting and static parsing never pay for them.
 
+logger = logging.getLogger(__name__)
 
 # --- Database Configuration ---
-DB_HOST = os.getenv("DB_HOST")
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_HOST = settings.db_host
+DB_NAME = settings.db_name
+DB_USER = settings.db_user
+DB_PASSWORD = settings.db_password
+COPY_NULL = "\\N"  # NULL marker in COPY buffers, so empty strings stay ''
 # ----------------------------
 
 URL = "https://lakejovita.com/south-course/"
 
+# "static" parses every hole pane from one plain HTTP fetch and only starts Chrome
+# for panes missing from the markup; "selenium" always clicks through the tabs.
+SCRAPE_MODE = settings.scrape_mode
+
+# "append" adds every scraped tee row; "upsert" keys rows on (URL, TeeName) and only
+# rewrites rows whose content changed since the last run.
+LOAD_MODE = settings.load_mode
+
+# Tee rows failing validation.py's checks go to golf_data_quarantine instead of
+# golf_data_entries; set VALIDATION=off to load every row as it is.
+VALIDATION = settings.validation
+
+# Course pages are cached on disk and revalidated with ETag/Last-Modified;
+# set HTTP_CACHE=off to always download them.
+HTTP_CACHE = settings.http_cache
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15"
 }
 
 
+# --- Golf Data Columns (shared by the DataFrame, CSV and database layers) ---
+OUTPUT_COLUMNS = [
+    "cCourseNumber",
+    "CourseTeeNumber",
+    "CourseName",
+    "StreetAddress",
+    "City",
+    "StateorRegion",
+    "Zip",
+    "County",
+    "Country",
+    "PhoneNumber",
+    "FaxNumber",
+    "URL",
+    "YearBuiltFounded",
+    "Architect",
+    "StatusPublicPrivateResort",
+    "GuestPolicy",
+    "TotalHoles",
+    "TeeNumber",
+    "TeeName",
+    "Par_Overall",
+    "Holes_Total",
+    "Rating",
+    "Slope",
+]
+for i in range(1, 19):
+    OUTPUT_COLUMNS.extend([f"Par_{i}", f"Hole_{i}", f"Hdcp_{i}"])
+OUTPUT_COLUMNS.extend(
+    ["Tot_Out_Par", "Tot_Out_Ydg", "Tot_In_Par", "Tot_In_Ydg", "Length_Total"]
+)
+
+# Columns stored as INTEGER in golf_data_entries; Rating is NUMERIC and the rest TEXT.
+INT_COLUMNS = [
+    "TotalHoles",
+    "TeeNumber",
+    "Par_Overall",
+    "Holes_Total",
+    "Slope",
+    "Tot_Out_Par",
+    "Tot_Out_Ydg",
+    "Tot_In_Par",
+    "Tot_In_Ydg",
+    "Length_Total",
+    *[f"Par_{i}" for i in range(1, 19)],
+    *[f"Hole_{i}" for i in range(1, 19)],
+]
+NUMERIC_COLUMNS = ["Rating"]
+
+# Rows failing validation.py's checks, every column as text so the values are
+# kept as scraped, with the reasons they failed.
+QUARANTINE_TABLE = "golf_data_quarantine"
+QUARANTINE_COLUMNS = ["reasons", *OUTPUT_COLUMNS]
+
+
+# --- chromedriver resolution: done once per process and reused ---
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def get_chromedriver_path():
+    """Return the chromedriver binary path, resolving it only on first use.
+
+    Set CHROMEDRIVER_PATH to skip webdriver_manager entirely.
+    """
+    global _chromedriver_path
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            _chromedriver_path = (
+                settings.chromedriver_path or ChromeDriverManager().install()
+            )
+            logger.info("Resolved chromedriver at: %s", _chromedriver_path)
+        return _chromedriver_path
+
+
 # --- get_chrome_driver function: Dynamically configured for Local or Cloud ---
-def get_chrome_driver():
+def get_chrome_driver(headless=False):
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.chrome.service import Service
+
     options = webdriver.ChromeOptions()
 
     # Determine the environment based on an environment variable
     # By default, assume 'local' if RUN_ENV is not explicitly set
-    RUN_ENV = os.getenv("RUN_ENV", "local")
+    RUN_ENV = settings.run_env
 
-    print(f"Detected RUN_ENV: {RUN_ENV}")  # For debugging/confirmation
+    logger.debug("Detected RUN_ENV: %s", RUN_ENV)
 
     # --- ***insert new code here*** ---
     # --- General Chrome Options ---
@@ -63,7 +159,7 @@ def get_chrome_driver():
 
     # --- Conditional Configuration based on RUN_ENV ---
     if RUN_ENV == "cloud":
-        print("Configuring WebDriver for CLOUD (headless Linux) environment.")
+        logger.debug("Configuring WebDriver for CLOUD (headless Linux) environment.")
         options.add_argument("--headless=new")  # Run headlessly on cloud
         options.add_argument("--disable-dev-shm-usage")  # Linux-specific optimization
         options.binary_location = "/usr/bin/google-chrome"  # Linux Chrome binary path
@@ -76,38 +172,41 @@ def get_chrome_driver():
         # in the current working directory.
         # --- End NEW Logging Options ---
     else:  # Default to 'local' (Mac) if RUN_ENV is not 'cloud'
-        print("Configuring WebDriver for LOCAL (Mac) environment.")
+        logger.debug("Configuring WebDriver for LOCAL (Mac) environment.")
         # By default, local will run with a visible browser (no --headless=new)
         # No --disable-dev-shm-usage needed for Mac
         # No options.binary_location needed for Mac (webdriver_manager finds it automatically)
         # You can add --headless=new here if you want local to also be headless
         # options.add_argument('--headless=new') # Uncomment if you want local to be headless too
+        if headless:  # Requested by the driver pool, which never shows a window
+            options.add_argument("--headless=new")
 
     driver = None
     try:
         # ChromeDriverManager handles downloading the CORRECT driver for your OS (Mac or Linux)
         # It automatically detects your Chrome browser version and downloads compatible ChromeDriver.
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        print("Chrome WebDriver initialized.")
+        with get_metrics().span("driver_startup"):
+            service = Service(get_chromedriver_path())
+            driver = webdriver.Chrome(service=service, options=options)
+        logger.info("Chrome WebDriver initialized.")
         return driver
     except WebDriverException as e:
-        print(f"Error initializing WebDriver: {e}")
-        print("Please ensure:")
-        print("1. Chrome browser is installed on your system.")
         if RUN_ENV == "cloud":
-            print("   - For CLOUD: Confirmed at '/usr/bin/google-chrome'.")
-            print(
+            chrome_hint = (
+                "   - For CLOUD: Confirmed at '/usr/bin/google-chrome'.\n"
                 "   - All required headless dependencies (xvfb, libasound2t64, etc.) are installed system-wide."
             )
         else:  # LOCAL
-            print(
-                "   - For LOCAL: It should be installed in its standard /Applications path."
-            )
-        print(
-            "2. Check for any network issues preventing webdriver_manager from downloading the driver."
+            chrome_hint = "   - For LOCAL: It should be installed in its standard /Applications path."
+        logger.exception(
+            "Error initializing WebDriver: %s\n"
+            "Please ensure:\n"
+            "1. Chrome browser is installed on your system.\n"
+            "%s\n"
+            "2. Check for any network issues preventing webdriver_manager from downloading the driver.",
+            e,
+            chrome_hint,
         )
-        traceback.print_exc()
         return None
 
 
@@ -118,11 +217,10 @@ def connect_db():
         conn = psycopg2.connect(
             host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASSWORD
         )
-        print(f"Successfully connected to PostgreSQL database: {DB_NAME}")
+        logger.info("Successfully connected to PostgreSQL database: %s", DB_NAME)
         return conn
     except Psycopg2Error as e:  # Use specific psycopg2 Error
-        print(f"Error connecting to database: {e}")
-        traceback.print_exc()
+        logger.exception("Error connecting to database: %s", e)
         return None
 
 
@@ -177,103 +275,218 @@ def create_golf_data_table(conn):
             Par_18 INTEGER, Hole_18 INTEGER, Hdcp_18 TEXT,
             Tot_Out_Par INTEGER, Tot_Out_Ydg INTEGER,
             Tot_In_Par INTEGER, Tot_In_Ydg INTEGER,
-            Length_Total INTEGER
+            Length_Total INTEGER,
+            content_hash TEXT
+        );
+        DO $$
+        BEGIN
+            -- Skipped once normalized_schema.py has turned this into a view.
+            IF EXISTS (SELECT 1 FROM pg_tables WHERE tablename = 'golf_data_entries') THEN
+                ALTER TABLE golf_data_entries ADD COLUMN IF NOT EXISTS content_hash TEXT;
+                -- Newest row per tee (course cards, /holes pages) and change
+                -- polling in query_api.py.
+                CREATE INDEX IF NOT EXISTS golf_data_entries_latest_idx
+                    ON golf_data_entries (URL, TeeName, scrape_date DESC, id DESC);
+                CREATE INDEX IF NOT EXISTS golf_data_entries_scrape_date_idx
+                    ON golf_data_entries (scrape_date);
+            END IF;
+        END $$;
+        """
+        quarantine_columns = ",\n            ".join(
+            f"{col} TEXT" for col in OUTPUT_COLUMNS
+        )
+        table_creation_sql += f"""
+        CREATE TABLE IF NOT EXISTS {QUARANTINE_TABLE} (
+            id SERIAL PRIMARY KEY,
+            quarantined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reasons TEXT NOT NULL,
+            {quarantine_columns}
         );
+        CREATE INDEX IF NOT EXISTS {QUARANTINE_TABLE}_url_idx
+            ON {QUARANTINE_TABLE} (URL);
         """
         cursor.execute(table_creation_sql)
         conn.commit()
-        print("Table 'golf_data_entries' checked/created successfully.")
+        logger.info(
+            "Tables 'golf_data_entries' and '%s' checked/created successfully.",
+            QUARANTINE_TABLE,
+        )
         return True
     except Psycopg2Error as e:
-        print(f"Error creating table: {e}")
-        traceback.print_exc()
+        logger.exception("Error creating table: %s", e)
         return False
     finally:
         if cursor:
             cursor.close()
 
 
-def insert_golf_data(conn, df_data):
+def _whole_numbers(values):
+    """pd.to_numeric that also drops non-integers, like int() on the raw text."""
+    numeric = pd.to_numeric(values, errors="coerce")
+    return numeric.where(numeric == numeric.round())
+
+
+def prepare_golf_data_frame(df_data):
+    """Coerce a tee-row DataFrame to database types one column at a time.
+
+    "N/A" and anything that is not a whole number in an INTEGER column become
+    nulls, matching what the per-cell int()/float() conversion used to do.
+    Columns that already have an integer dtype (tee rows built by course_model)
+    are kept as they are. A content_hash column, when present, is carried
+    through unchanged.
+    """
+    columns = OUTPUT_COLUMNS + [c for c in ["content_hash"] if c in df_data.columns]
+    df = df_data[columns].copy()
+    for col in INT_COLUMNS:
+        if not pd.api.types.is_integer_dtype(df[col].dtype):
+            df[col] = _whole_numbers(df[col]).astype("Int64")
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    text_columns = [
+        col for col in OUTPUT_COLUMNS if col not in INT_COLUMNS + NUMERIC_COLUMNS
+    ]
+    df[text_columns] = df[text_columns].where(df[text_columns] != "N/A")
+    return df
+
+
+def _copy_golf_data(cursor, df, table_name):
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table_name} ({', '.join(df.columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        buffer,
+    )
+
+
+def _execute_values_golf_data(cursor, df, table_name, page_size):
+    columns = [
+        [None if pd.isna(value) else value for value in df[col].tolist()]
+        for col in df.columns
+    ]
+    execute_values(
+        cursor,
+        f"INSERT INTO {table_name} ({', '.join(df.columns)}) VALUES %s",
+        list(zip(*columns)),
+        page_size=page_size,
+    )
+
+
+def _write_quarantined(cursor, quarantined, method="copy", page_size=1000):
+    """Write validation failures into QUARANTINE_TABLE on the load's cursor.
+
+    Called just before the load commits, so the quarantined rows and the clean
+    rows are written in one transaction and a retried load cannot repeat them.
+    method is the one the clean rows were loaded with, so a load that skipped
+    or fell back from COPY does not COPY here either.
+    """
+    if quarantined is None or not len(quarantined):
+        return
+    df = quarantined[QUARANTINE_COLUMNS]
+    if method == "values":
+        _execute_values_golf_data(cursor, df, QUARANTINE_TABLE, page_size)
+    else:
+        _copy_golf_data(cursor, df, QUARANTINE_TABLE)
+    logger.info("Wrote %d rows to '%s'.", len(quarantined), QUARANTINE_TABLE)
+
+
+def golf_data_entries_is_view(conn):
+    """True once normalized_schema.py has replaced the wide table with a view."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1 FROM pg_views WHERE viewname = 'golf_data_entries'")
+        return cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+
+def insert_golf_data(
+    conn,
+    df_data,
+    table_name="golf_data_entries",
+    method="copy",
+    page_size=1000,
+    quarantined=None,
+):
+    """Bulk-load tee rows with COPY, falling back to paged execute_values.
+
+    method="values" skips COPY entirely (e.g. behind a proxy that rejects it).
+    quarantined (validate_tee_rows() failures) is written in the same transaction.
+    """
+    cursor = None
+    with get_metrics().span("db_insert", rows=len(df_data)) as span:
+        try:
+            cursor = conn.cursor()
+            df = prepare_golf_data_frame(df_data)
+
+            if method == "copy":
+                try:
+                    _copy_golf_data(cursor, df, table_name)
+                except Psycopg2Error as e:
+                    logger.warning("COPY failed (%s); retrying with execute_values.", e)
+                    conn.rollback()
+                    method = "values"
+            if method == "values":
+                _execute_values_golf_data(cursor, df, table_name, page_size)
+            _write_quarantined(cursor, quarantined, method, page_size)
+
+            conn.commit()
+            logger.info(
+                "Successfully inserted %d rows into '%s'.", len(df_data), table_name
+            )
+            return True
+        except Psycopg2Error as e:
+            logger.exception("Error inserting data: %s", e)
+            span.fail(e)
+            conn.rollback()
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+
+
+# --- Idempotent Upsert Functions ---
+# A course's tee rows are identified by the page they came from and the tee name.
+NATURAL_KEY_COLUMNS = ["URL", "TeeName"]
+NATURAL_KEY_INDEX = "golf_data_entries_natural_key"
+
+
+def ensure_natural_key(conn):
+    """Create the unique (URL, TeeName) index, first removing older duplicates.
+
+    Rows appended before upserts existed repeat every tee once per run; only the
+    newest copy of each is kept so the unique index can be built.
+    """
     cursor = None
     try:
         cursor = conn.cursor()
-        insert_columns = [
-            "cCourseNumber",
-            "CourseTeeNumber",
-            "CourseName",
-            "StreetAddress",
-            "City",
-            "StateorRegion",
-            "Zip",
-            "County",
-            "Country",
-            "PhoneNumber",
-            "FaxNumber",
-            "URL",
-            "YearBuiltFounded",
-            "Architect",
-            "StatusPublicPrivateResort",
-            "GuestPolicy",
-            "TotalHoles",
-            "TeeNumber",
-            "TeeName",
-            "Par_Overall",
-            "Holes_Total",
-            "Rating",
-            "Slope",
-        ]
-        for i in range(1, 19):
-            insert_columns.extend([f"Par_{i}", f"Hole_{i}", f"Hdcp_{i}"])
-        insert_columns.extend(
-            ["Tot_Out_Par", "Tot_Out_Ydg", "Tot_In_Par", "Tot_In_Ydg", "Length_Total"]
+        cursor.execute(
+            "SELECT 1 FROM pg_indexes "
+            "WHERE tablename = 'golf_data_entries' AND indexname = %s",
+            (NATURAL_KEY_INDEX,),
+        )
+        if cursor.fetchone():
+            return True
+
+        cursor.execute("""
+            DELETE FROM golf_data_entries older
+            USING golf_data_entries newer
+            WHERE older.URL = newer.URL
+              AND older.TeeName = newer.TeeName
+              AND older.id < newer.id
+            """)
+        logger.info(
+            "Removed %d duplicate tee rows before adding natural key.", cursor.rowcount
+        )
+        cursor.execute(
+            f"CREATE UNIQUE INDEX {NATURAL_KEY_INDEX} "
+            f"ON golf_data_entries ({', '.join(NATURAL_KEY_COLUMNS)})"
         )
-
-        cols = ", ".join(insert_columns)
-        placeholders = ", ".join(["%s"] * len(insert_columns))
-
-        insert_sql = f"INSERT INTO golf_data_entries ({cols}) VALUES ({placeholders})"
-
-        data_to_insert = []
-        for index, row in df_data.iterrows():
-            row_values = []
-            for col in insert_columns:
-                value = row[col]
-                if value == "N/A":
-                    row_values.append(None)
-                elif col in [
-                    "TotalHoles",
-                    "TeeNumber",
-                    "Par_Overall",
-                    "Holes_Total",
-                    "Slope",
-                    "Tot_Out_Par",
-                    "Tot_Out_Ydg",
-                    "Tot_In_Par",
-                    "Tot_In_Ydg",
-                    "Length_Total",
-                    *[f"Par_{i}" for i in range(1, 19)],
-                    *[f"Hole_{i}" for i in range(1, 19)],
-                ]:
-                    try:
-                        row_values.append(int(value))
-                    except ValueError:
-                        row_values.append(None)
-                elif col == "Rating":
-                    try:
-                        row_values.append(float(value))
-                    except ValueError:
-                        row_values.append(None)
-                else:
-                    row_values.append(value)
-            data_to_insert.append(tuple(row_values))
-
-        cursor.executemany(insert_sql, data_to_insert)
         conn.commit()
-        print(f"Successfully inserted {len(df_data)} rows into 'golf_data_entries'.")
         return True
     except Psycopg2Error as e:
-        print(f"Error inserting data: {e}")
-        traceback.print_exc()
+        logger.exception("Error creating natural key: %s", e)
         conn.rollback()
         return False
     finally:
@@ -281,315 +494,385 @@ def insert_golf_data(conn, df_data):
             cursor.close()
 
 
-if __name__ == "__main__":
-    print(f"Starting scraper for: {URL}")
-    driver = None
-    db_conn = None
-    all_golf_data = []
-
-    try:
-        driver = get_chrome_driver()
-        if not driver:
-            exit()
+def add_content_hash(df):
+    """Append a content_hash column: an MD5 of every loaded value in the row."""
+    df = df.copy()
+    df["content_hash"] = [
+        hashlib.md5("\x1f".join(map(str, row)).encode("utf-8")).hexdigest()
+        for row in df[OUTPUT_COLUMNS].itertuples(index=False, name=None)
+    ]
+    return df
 
-        db_conn = connect_db()
-        if not db_conn:
-            print("Database connection failed. Exiting.")
-            exit()
 
-        if not create_golf_data_table(db_conn):
-            print("Failed to create/check database table. Exiting.")
-            exit()
+def upsert_golf_data(conn, df_data, quarantined=None):
+    """Insert new tee rows and rewrite only those whose content hash changed.
 
-        print(f"Navigating to {URL}...")
-        driver.get(URL)
-        time.sleep(2)
+    quarantined (validate_tee_rows() failures) is written in the same transaction.
+    Returns {"inserted", "updated", "unchanged"} counts, or None on failure.
+    """
+    if not ensure_natural_key(conn):
+        return None
 
-        course_name = "N/A"
+    cursor = None
+    with get_metrics().span("db_upsert", rows=len(df_data)) as span:
         try:
-            course_name_element = driver.find_element(
-                By.CSS_SELECTOR, "div.fusion-text.fusion-text-1 p"
+            cursor = conn.cursor()
+            df = prepare_golf_data_frame(df_data).drop_duplicates(
+                NATURAL_KEY_COLUMNS, keep="last"
             )
-            course_name = course_name_element.text.strip().replace(".", "").title()
-            print(f"Extracted Course Name: {course_name}")
-        except NoSuchElementException:
-            print(f"Could not extract Course Name: Element not found.")
-        except Exception as e:
-            print(f"Could not extract Course Name: An unexpected error occurred - {e}")
+            df = add_content_hash(df)
 
-        hole_tab_links = driver.find_elements(
-            By.XPATH,
-            "//div[@class='nav']/ul[@class='nav-tabs']//li/a[contains(@class, 'tab-link') and .//h4[contains(text(), 'Hole')]]",
-        )
-
-        if not hole_tab_links:
-            print(
-                "CRITICAL: Could not find any hole tab links. Re-evaluate selector for tabs."
+            cursor.execute(
+                "CREATE TEMP TABLE golf_data_staging "
+                "(LIKE golf_data_entries INCLUDING DEFAULTS) ON COMMIT DROP"
             )
-            driver.quit()
-            exit()
-
-        print(f"Found {len(hole_tab_links)} potential hole tab links.")
-
-        for i, tab_link in enumerate(hole_tab_links):
-            hole_number_text = "N/A"
-            try:
-                hole_num_h4 = tab_link.find_element(By.TAG_NAME, "h4")
-                if hole_num_h4:
-                    hole_number_text = hole_num_h4.text.strip()
-                    print(f"\nProcessing {hole_number_text}...")
-
-                driver.execute_script("arguments[0].click();", tab_link)
-                time.sleep(0.5)
+            _copy_golf_data(cursor, df, "golf_data_staging")
+
+            columns = OUTPUT_COLUMNS + ["content_hash"]
+            cols = ", ".join(columns)
+            updates = ", ".join(
+                f"{col} = EXCLUDED.{col}"
+                for col in columns
+                if col not in NATURAL_KEY_COLUMNS
+            )
+            cursor.execute(f"""
+                WITH written AS (
+                    INSERT INTO golf_data_entries ({cols})
+                    SELECT {cols} FROM golf_data_staging
+                    ON CONFLICT ({', '.join(NATURAL_KEY_COLUMNS)}) DO UPDATE
+                    SET {updates}, scrape_date = CURRENT_TIMESTAMP
+                    WHERE golf_data_entries.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                    RETURNING (xmax = 0) AS inserted
+                )
+                SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+                FROM written
+                """)
+            inserted, updated = cursor.fetchone()
+            # The staging table above already needs COPY.
+            _write_quarantined(cursor, quarantined)
+            conn.commit()
+
+            counts = {
+                "inserted": inserted,
+                "updated": updated,
+                "unchanged": len(df) - inserted - updated,
+            }
+            logger.info(
+                "Upserted into 'golf_data_entries': %(inserted)d inserted, "
+                "%(updated)d updated, %(unchanged)d unchanged.",
+                counts,
+            )
+            return counts
+        except Psycopg2Error as e:
+            logger.exception("Error upserting data: %s", e)
+            span.fail(e)
+            conn.rollback()
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+
+def load_golf_data(conn, df_data, mode=None, validate=None):
+    """Write tee rows with the configured LOAD_MODE ("append" or "upsert").
+
+    Unless validate is False (default: VALIDATION), rows failing
+    validation.validate_tee_rows() go to QUARANTINE_TABLE, in the same
+    transaction as the rest, and only the rest are loaded.
+    """
+    mode = mode or LOAD_MODE
+    if validate is None:
+        validate = VALIDATION != "off"
+    quarantined = None
+    if validate:
+        # validation imports this module for the column lists.
+        from validation import validate_tee_rows
+
+        df_data, quarantined = validate_tee_rows(df_data)
+    if mode == "upsert" and golf_data_entries_is_view(conn):
+        logger.info(
+            "golf_data_entries is the normalized view; its insert trigger upserts."
+        )
+        return insert_golf_data(
+            conn,
+            add_content_hash(prepare_golf_data_frame(df_data)),
+            quarantined=quarantined,
+        )
+    if mode == "upsert":
+        return upsert_golf_data(conn, df_data, quarantined) is not None
+    return insert_golf_data(conn, df_data, quarantined=quarantined)
 
-                target_div_id = tab_link.get_attribute("href").split("#")[-1]
-                hole_content_div_selector = (By.ID, target_div_id)
 
-                WebDriverWait(driver, 10).until(
-                    EC.visibility_of_element_located(hole_content_div_selector)
-                )
+# --- Hole tab links for the browser path; static parsing lives in parsers.py ---
+HOLE_TAB_XPATH = "//div[@class='nav']/ul[@class='nav-tabs']//li/a[contains(@class, 'tab-link') and .//h4[contains(text(), 'Hole')]]"
 
-                current_hole_data_container_element = driver.find_element(
-                    *hole_content_div_selector
-                )
-                hole_soup = BeautifulSoup(
-                    current_hole_data_container_element.get_attribute("outerHTML"),
-                    "html.parser",
-                )
 
-                hole_par = "N/A"
-                hole_yardages = "N/A"
-                hole_handicap = "N/A"
+# --- Static (no browser) Scraping Functions ---
+def fetch_page_html(url, offline=False):
+    """Fetch a page through the on-disk response cache (see http_cache.py).
 
-                par_yardage_h3 = hole_soup.find(
-                    "h3", class_="fusion-responsive-typography-calculated"
-                )
-                if par_yardage_h3:
-                    par_yardage_text = par_yardage_h3.get_text(strip=True)
-                    if "Par" in par_yardage_text:
-                        hole_par = (
-                            par_yardage_text.split("–")[0].strip().replace("Par ", "")
+    offline=True replays purely from the cache; HTTP_CACHE=off bypasses it. The
+    time spent is recorded as the site's "fetch" wait (see waits.py) and as a
+    "fetch" span.
+    """
+    parser = get_parser(url)
+    site = parser.name if parser else "default"
+    with get_metrics().span("fetch", course=url) as span:
+        try:
+            with get_wait_recorder().timed(site, "fetch"):
+                if HTTP_CACHE == "off":
+                    if offline:
+                        logger.warning(
+                            "Offline: %s cannot be fetched with HTTP_CACHE=off.", url
                         )
-                        print(f"  Par: {hole_par}")
+                        span.fail("offline")
+                        return None
+                    response = requests.get(url, headers=HEADERS, timeout=15)
+                    response.raise_for_status()
+                    return response.text
+                html = get_response_cache().get(url, headers=HEADERS, offline=offline)
+                if html is None:
+                    span.fail("not cached")
+                return html
+        except requests.RequestException as e:
+            logger.error("Error fetching %s: %s", url, e)
+            span.fail(e)
+            return None
+
+
+# --- Selenium Scraping Functions ---
+def scrape_course_selenium(driver, url, only_pane_ids=None, profile=None):
+    """Click through the hole tabs in a live browser.
+
+    When only_pane_ids is given, tabs whose pane id is not in it are skipped.
+    Waits use the site's budget from waits.py rather than fixed sleeps.
+    Returns (course_name, hole records).
+    """
+    from bs4 import BeautifulSoup
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+
+    from waits import PageWaiter
+
+    logger.info("Navigating to %s...", url)
+    metrics = get_metrics()
+    waiter = PageWaiter(driver, url, profile)
+    with metrics.span("page_load", course=url):
+        driver.get(url)
+        waiter.page_ready((By.XPATH, HOLE_TAB_XPATH))
+
+    course_name = "N/A"
+    try:
+        course_name_element = driver.find_element(
+            By.CSS_SELECTOR, "div.fusion-text.fusion-text-1 p"
+        )
+        course_name = course_name_element.text.strip().replace(".", "").title()
+        logger.debug("Extracted Course Name: %s", course_name)
+    except NoSuchElementException:
+        logger.warning("Could not extract Course Name: Element not found.")
+    except Exception as e:
+        logger.warning(
+            "Could not extract Course Name: An unexpected error occurred - %s", e
+        )
 
-                yardage_p_tag = hole_soup.find(
-                    "p",
-                    string=lambda text: text and "Gold:" in text and "Blue:" in text,
-                )
-                if yardage_p_tag:
-                    hole_yardages = yardage_p_tag.get_text(strip=True)
-                    print(f"  Yardages: {hole_yardages}")
-                else:
-                    print(
-                        "  Yardage p tag not found. Inspect HTML for yardages within hole content."
-                    )
+    hole_tab_links = driver.find_elements(By.XPATH, HOLE_TAB_XPATH)
 
-                all_golf_data.append(
-                    {
-                        "Course Name": course_name,
-                        "Hole Number": hole_number_text.replace("Hole ", ""),
-                        "Par per Hole": hole_par,
-                        "Raw Tee Yardages": hole_yardages,
-                        "Hole Handicap": hole_handicap,
-                    }
-                )
+    if not hole_tab_links:
+        logger.critical(
+            "Could not find any hole tab links on %s. Re-evaluate selector for tabs.",
+            url,
+        )
+        return course_name, []
 
-            except Exception as e:
-                print(f"Error processing {hole_number_text} tab: {e}")
-                print(f"  Current URL at error: {driver.current_url}")
-                traceback.print_exc()
-                continue
+    logger.debug("Found %d potential hole tab links.", len(hole_tab_links))
 
-        print("\n--- Data Processing and Structuring ---")
-
-        tees = ["Gold", "Blue", "White", "Red"]
-        final_data_for_df = []
-
-        course_summary_values = {
-            "Gold_Rating": "N/A",
-            "Gold_Slope": "N/A",
-            "Blue_Rating": "N/A",
-            "Blue_Slope": "N/A",
-            "White_Rating": "N/A",
-            "White_Slope": "N/A",
-            "Red_Rating": "N/A",
-            "Red_Slope": "N/A",
-            "Gold_Tot_Out_Par": "N/A",
-            "Gold_Tot_Out_Ydg": "N/A",
-            "Gold_Tot_In_Par": "N/A",
-            "Gold_Tot_In_Ydg": "N/A",
-            "Gold_Length": "N/A",
-            "Blue_Tot_Out_Par": "N/A",
-            "Blue_Tot_Out_Ydg": "N/A",
-            "Blue_Tot_In_Par": "N/A",
-            "Blue_Tot_In_Ydg": "N/A",
-            "Blue_Length": "N/A",
-            "White_Tot_Out_Par": "N/A",
-            "White_Tot_Out_Ydg": "N/A",
-            "White_Tot_In_Par": "N/A",
-            "White_Tot_In_Ydg": "N/A",
-            "White_Length": "N/A",
-            "Red_Tot_Out_Par": "N/A",
-            "Red_Tot_Out_Ydg": "N/A",
-            "Red_Tot_In_Par": "N/A",
-            "Red_Tot_In_Ydg": "N/A",
-            "Red_Length": "N/A",
-        }
-
-        processed_hole_data = {}
-        for hole_info in all_golf_data:
-            hole_num = hole_info["Hole Number"]
-            par_per_hole = hole_info["Par per Hole"]
-            raw_yardages = hole_info["Raw Tee Yardages"]
-
-            parsed_yardages_for_hole = {}
-            if raw_yardages and raw_yardages != "N/A":
-                for tee_pair in raw_yardages.split("|"):
-                    parts = tee_pair.strip().split(":")
-                    if len(parts) == 2:
-                        tee_name = parts[0].strip()
-                        yardage = parts[1].strip()
-                        parsed_yardages_for_hole[tee_name] = yardage
-
-            processed_hole_data[hole_num] = {
-                "Par": par_per_hole,
-                "Yardages": parsed_yardages_for_hole,
-            }
-
-        for tee_name in tees:
-            tee_row_data = {
-                "cCourseNumber": "N/A",
-                "CourseTeeNumber": f"N/A-{tee_name}",
-                "CourseName": course_name,
-                "StreetAddress": "N/A",
-                "City": "N/A",
-                "StateorRegion": "N/A",
-                "Zip": "N/A",
-                "County": "N/A",
-                "Country": "N/A",
-                "PhoneNumber": "N/A",
-                "FaxNumber": "N/A",
-                "URL": URL,
-                "YearBuiltFounded": "N/A",
-                "Architect": "N/A",
-                "StatusPublicPrivateResort": "N/A",
-                "GuestPolicy": "N/A",
-                "TotalHoles": 18,
-                "TeeNumber": tees.index(tee_name) + 1,
-                "TeeName": tee_name,
-                "Par_Overall": course_summary_values.get(
-                    f"{tee_name}_Total_Par", "N/A"
-                ),
-                "Holes_Total": 18,
-                "Rating": course_summary_values.get(f"{tee_name}_Rating", "N/A"),
-                "Slope": course_summary_values.get(f"{tee_name}_Slope", "N/A"),
-            }
+    hole_records = []
+    for i, tab_link in enumerate(hole_tab_links):
+        hole_number_text = "N/A"
+        try:
+            target_div_id = tab_link.get_attribute("href").split("#")[-1]
+            if only_pane_ids is not None and target_div_id not in only_pane_ids:
+                continue
 
-            total_out_par = 0
-            total_out_ydg = 0
-            total_in_par = 0
-            total_in_ydg = 0
+            hole_num_h4 = tab_link.find_element(By.TAG_NAME, "h4")
+            if hole_num_h4:
+                hole_number_text = hole_num_h4.text.strip()
+                logger.debug("Processing %s...", hole_number_text)
 
-            for hole_num_int in range(1, 19):
-                hole_num_str = str(hole_num_int)
-                hole_data = processed_hole_data.get(
-                    hole_num_str, {"Par": "N/A", "Yardages": {}}
+            driver.execute_script("arguments[0].click();", tab_link)
+            with metrics.span("tab_wait", course=url, hole=hole_number_text):
+                current_hole_data_container_element = waiter.pane_visible(
+                    (By.ID, target_div_id)
                 )
+            hole_soup = BeautifulSoup(
+                current_hole_data_container_element.get_attribute("outerHTML"),
+                "html.parser",
+            )
 
-                tee_yardage_for_hole = hole_data["Yardages"].get(tee_name, "N/A")
-                par_for_hole = hole_data["Par"]
-
-                tee_row_data[f"Par_{hole_num_str}"] = par_for_hole
-                tee_row_data[f"Hole_{hole_num_str}"] = tee_yardage_for_hole
-                tee_row_data[f"Hdcp_{hole_num_str}"] = "N/A"
-
-                try:
-                    par_val = int(par_for_hole) if par_for_hole != "N/A" else 0
-                    ydg_val = (
-                        int(tee_yardage_for_hole)
-                        if tee_yardage_for_hole != "N/A"
-                        else 0
-                    )
+            hole_par, hole_yardages = parse_hole_pane(hole_soup)
+            hole_records.append(
+                make_hole_record(course_name, hole_number_text, hole_par, hole_yardages)
+            )
 
-                    if 1 <= hole_num_int <= 9:
-                        total_out_par += par_val
-                        total_out_ydg += ydg_val
-                    elif 10 <= hole_num_int <= 18:
-                        total_in_par += par_val
-                        total_in_ydg += ydg_val
-                except ValueError:
-                    pass
-
-            tee_row_data["Tot_Out_Par"] = str(total_out_par)
-            tee_row_data["Tot_Out_Ydg"] = str(total_out_ydg)
-            tee_row_data["Tot_In_Par"] = str(total_in_par)
-            tee_row_data["Tot_In_Ydg"] = str(total_in_ydg)
-            tee_row_data["Length_Total"] = str(total_out_ydg + total_in_ydg)
-
-            final_data_for_df.append(tee_row_data)
-
-        output_columns = [
-            "cCourseNumber",
-            "CourseTeeNumber",
-            "CourseName",
-            "StreetAddress",
-            "City",
-            "StateorRegion",
-            "Zip",
-            "County",
-            "Country",
-            "PhoneNumber",
-            "FaxNumber",
-            "URL",
-            "YearBuiltFounded",
-            "Architect",
-            "StatusPublicPrivateResort",
-            "GuestPolicy",
-            "TotalHoles",
-            "TeeNumber",
-            "TeeName",
-            "Par_Overall",
-            "Holes_Total",
-            "Rating",
-            "Slope",
-        ]
-        for i in range(1, 19):
-            output_columns.extend([f"Par_{i}", f"Hole_{i}", f"Hdcp_{i}"])
-        output_columns.extend(
-            ["Tot_Out_Par", "Tot_Out_Ydg", "Tot_In_Par", "Tot_In_Ydg", "Length_Total"]
+        except Exception as e:
+            logger.exception(
+                "Error processing %s tab (current URL: %s): %s",
+                hole_number_text,
+                driver.current_url,
+                e,
+            )
+            continue
+
+    return course_name, hole_records
+
+
+# --- Tee Row Structuring ---
+def build_tee_rows_batch(courses, tees=None):
+    """Build wide tee rows for many courses at once.
+
+    courses is a list of (course_name, url, hole_records). Each becomes a
+    course_model.Course (hole values parsed once into int16 arrays) and the
+    DataFrame columns are built from those arrays; see course_model.py. A
+    missing yardage counts as 0 in the front/back nine totals.
+
+    Unless tees is given, each course gets the tees named in its own yardage
+    strings, numbered in the order they first appear.
+    """
+    # course_model imports this module for OUTPUT_COLUMNS.
+    from course_model import Course, tee_rows_frame
+
+    courses = list(courses)
+    if not courses:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    with get_metrics().span("build_rows", courses=len(courses)):
+        return tee_rows_frame(
+            [
+                Course.from_hole_records(course_name, url, hole_records, tees)
+                for course_name, url, hole_records in courses
+            ]
         )
 
-        df = pd.DataFrame(final_data_for_df, columns=output_columns)
-        df = df.fillna("N/A")
 
-        print("\n--- Inserting data into PostgreSQL ---")
-        if not insert_golf_data(db_conn, df):
-            print("Failed to insert data into database.")
+def build_tee_rows(course_name, url, hole_records):
+    """Turn one course's per-hole scrape records into one wide row per tee."""
+    return build_tee_rows_batch([(course_name, url, hole_records)])
+
+
+def main(argv=None):
+    """Scrape the South Course, load it into PostgreSQL and export it."""
+    # exporters imports this module, so it is only pulled in when main() runs.
+    from exporters import export_tee_rows
+
+    arg_parser = argparse.ArgumentParser(description=f"Scrape {URL}")
+    arg_parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Replay the page from the response cache without any network access",
+    )
+    arg_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Parse and load the page even if it is unchanged since the last ingest",
+    )
+    add_instrumentation_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+    with instrumented_run(args.log_level, profile=args.profile):
+        logger.info("Starting scraper for: %s", URL)
+        driver = None
+        db_conn = None
+        all_golf_data = []
 
-        output_dir = "data"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        try:
+            db_conn = connect_db()
+            if not db_conn:
+                logger.error("Database connection failed. Exiting.")
+                return
+
+            if not create_golf_data_table(db_conn):
+                logger.error("Failed to create/check database table. Exiting.")
+                return
+
+            course_name = "N/A"
+            missing_pane_ids = None  # None means scrape every tab in the browser
+            fingerprints = FingerprintStore()
+            fingerprint = None
+            parser = get_parser(URL)
+            if parser and (SCRAPE_MODE == "static" or args.offline):
+                logger.info("Fetching %s without a browser...", URL)
+                html = fetch_page_html(URL, offline=args.offline)
+                if html:
+                    stored = None if args.force else fingerprints.get(URL)
+                    with get_metrics().span("parse", course=URL):
+                        fingerprint, parsed = parser.parse_if_changed(html, stored)
+                    if parsed is None:
+                        logger.info(
+                            "Hole panes unchanged since the last ingest; skipped 1 "
+                            "course. Run with --force to parse and load it anyway."
+                        )
+                        return
+                    course_name, all_golf_data, missing_tabs = parsed
+                    if all_golf_data or missing_tabs:
+                        missing_pane_ids = {pane_id for _, pane_id in missing_tabs}
+
+            if args.offline and (missing_pane_ids is None or missing_pane_ids):
+                logger.warning(
+                    "Offline mode: not starting Chrome for holes missing from the cache."
+                )
+            elif missing_pane_ids is None or missing_pane_ids:
+                if missing_pane_ids:
+                    logger.info(
+                        "Falling back to Selenium for %d missing hole pane(s).",
+                        len(missing_pane_ids),
+                    )
+                else:
+                    logger.info("Scraping all hole tabs with Selenium.")
+                driver = get_chrome_driver()
+                if not driver:
+                    return
 
-        output_filename = os.path.join(output_dir, "lake_jovita_south_course_data.csv")
-        df.to_csv(output_filename, index=False, encoding="utf-8")
-        print(f"\nData successfully structured and saved to CSV: {output_filename}")
+                browser_course_name, browser_hole_records = scrape_course_selenium(
+                    driver, URL, only_pane_ids=missing_pane_ids
+                )
+                if course_name == "N/A":
+                    course_name = browser_course_name
+                all_golf_data.extend(browser_hole_records)
+                logger.info("Browser wait stats: %s", get_wait_recorder().stats())
+
+            if not all_golf_data:
+                logger.error("No hole data was scraped. Exiting.")
+                return
+
+            df = build_tee_rows(course_name, URL, all_golf_data)
+
+            if not load_golf_data(db_conn, df):
+                logger.error("Failed to insert data into database.")
+            elif fingerprint:
+                fingerprints.record(URL, fingerprint)
+                fingerprints.save()
+
+            output_filename = os.path.join("data", "lake_jovita_south_course_data.csv")
+            export_tee_rows(df, output_filename)
+
+            # try:
+            #     os.system(f'open "{output_filename}"')
+            #     print(f"Could not automatically open CSV: {open_err}")
+            # except Exception as open_err:
+            #     print(f"Could not automatically open CSV: {open_err}")
+
+        except Exception as main_e:
+            logger.exception(
+                "An unexpected error occurred during the main scraping process: %s",
+                main_e,
+            )
 
-        # try:
-        #     os.system(f'open "{output_filename}"')
-        #     print(f"Could not automatically open CSV: {open_err}")
-        # except Exception as open_err:
-        #     print(f"Could not automatically open CSV: {open_err}")
+        finally:
+            if driver:
+                driver.quit()
+                logger.info("WebDriver closed.")
+            if db_conn:
+                db_conn.close()
+                logger.info("Database connection closed.")
 
-    except Exception as main_e:
-        print(
-            f"\nAn unexpected error occurred during the main scraping process: {main_e}"
-        )
-        traceback.print_exc()
 
-    finally:
-        if driver:
-            driver.quit()
-            print("\nWebDriver closed.")
-        if db_conn:
-            db_conn.close()
-            print("Database connection closed.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Normalized courses / tees / holes schema and migration from the wide table.
+
+Usage:
+    python normalized_schema.py
+
+Running this once, in a single transaction:
+1. renames the wide golf_data_entries table to golf_data_entries_legacy, first
+   adding the content_hash column if the table predates it,
+2. creates courses, tees and holes with foreign keys and indexes,
+3. copies the newest row of every (URL, TeeName) pair into them with set-based
+   INSERT ... SELECT statements, and
+4. replaces golf_data_entries with a view of the same shape whose INSTEAD OF
+   INSERT trigger writes into the normalized tables, so insert_golf_data and the
+   CSV export keep working unchanged.
+
+The trigger upserts each course (by URL), tee (by course and tee name) and hole,
+so LOAD_MODE=upsert is handled by it rather than by ON CONFLICT on the view.
+"""
+
+import logging
+
+from psycopg2 import Error as Psycopg2Error
+
+from instrumentation import configure_logging
+from lake_jovita_south_scraper import (
+    OUTPUT_COLUMNS,
+    connect_db,
+    golf_data_entries_is_view,
+)
+
+logger = logging.getLogger(__name__)
+
+LEGACY_TABLE = "golf_data_entries_legacy"
+
+# (normalized column, wide golf_data_entries column)
+COURSE_COLUMNS = [
+    ("ccoursenumber", "cCourseNumber"),
+    ("course_name", "CourseName"),
+    ("street_address", "StreetAddress"),
+    ("city", "City"),
+    ("state_or_region", "StateorRegion"),
+    ("zip", "Zip"),
+    ("county", "County"),
+    ("country", "Country"),
+    ("phone_number", "PhoneNumber"),
+    ("fax_number", "FaxNumber"),
+    ("year_built_founded", "YearBuiltFounded"),
+    ("architect", "Architect"),
+    ("status_public_private_resort", "StatusPublicPrivateResort"),
+    ("guest_policy", "GuestPolicy"),
+    ("total_holes", "TotalHoles"),
+]
+TEE_COLUMNS = [
+    ("course_tee_number", "CourseTeeNumber"),
+    ("tee_number", "TeeNumber"),
+    ("par_overall", "Par_Overall"),
+    ("holes_total", "Holes_Total"),
+    ("rating", "Rating"),
+    ("slope", "Slope"),
+    ("tot_out_par", "Tot_Out_Par"),
+    ("tot_out_ydg", "Tot_Out_Ydg"),
+    ("tot_in_par", "Tot_In_Par"),
+    ("tot_in_ydg", "Tot_In_Ydg"),
+    ("length_total", "Length_Total"),
+    ("content_hash", "content_hash"),
+]
+HOLE_NUMBERS = range(1, 19)
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS courses (
+    course_id SERIAL PRIMARY KEY,
+    url TEXT UNIQUE,
+    ccoursenumber TEXT,
+    course_name TEXT,
+    street_address TEXT,
+    city TEXT,
+    state_or_region TEXT,
+    zip TEXT,
+    county TEXT,
+    country TEXT,
+    phone_number TEXT,
+    fax_number TEXT,
+    year_built_founded TEXT,
+    architect TEXT,
+    status_public_private_resort TEXT,
+    guest_policy TEXT,
+    total_holes INTEGER
+);
+CREATE INDEX IF NOT EXISTS courses_state_idx ON courses (state_or_region);
+CREATE INDEX IF NOT EXISTS courses_city_idx ON courses (city);
+CREATE INDEX IF NOT EXISTS courses_name_idx ON courses (course_name);
+-- query_api.py /courses pages, sorted by name then url.
+CREATE INDEX IF NOT EXISTS courses_name_url_idx
+    ON courses ((coalesce(course_name, '')), url);
+
+CREATE TABLE IF NOT EXISTS tees (
+    tee_id SERIAL PRIMARY KEY,
+    course_id INTEGER NOT NULL REFERENCES courses (course_id) ON DELETE CASCADE,
+    tee_name TEXT NOT NULL,
+    scrape_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    course_tee_number TEXT,
+    tee_number INTEGER,
+    par_overall INTEGER,
+    holes_total INTEGER,
+    rating NUMERIC(4,1),
+    slope INTEGER,
+    tot_out_par INTEGER,
+    tot_out_ydg INTEGER,
+    tot_in_par INTEGER,
+    tot_in_ydg INTEGER,
+    length_total INTEGER,
+    content_hash TEXT,
+    UNIQUE (course_id, tee_name)
+);
+
+CREATE TABLE IF NOT EXISTS holes (
+    tee_id INTEGER NOT NULL REFERENCES tees (tee_id) ON DELETE CASCADE,
+    hole_number SMALLINT NOT NULL,
+    par SMALLINT,
+    yardage INTEGER,
+    handicap TEXT,
+    PRIMARY KEY (tee_id, hole_number)
+);
+CREATE INDEX IF NOT EXISTS holes_par_yardage_idx ON holes (par, yardage);
+"""
+
+
+def _hole_values(prefix):
+    """VALUES rows that unpivot Par_N/Hole_N/Hdcp_N into one row per hole."""
+    return ",\n".join(
+        f"({i}, {prefix}Par_{i}, {prefix}Hole_{i}, {prefix}Hdcp_{i})"
+        for i in HOLE_NUMBERS
+    )
+
+
+def _migration_sql():
+    course_cols = ", ".join(col for col, _ in COURSE_COLUMNS)
+    course_src = ", ".join(f"latest.{wide}" for _, wide in COURSE_COLUMNS)
+    tee_cols = ", ".join(col for col, _ in TEE_COLUMNS)
+    tee_src = ", ".join(f"latest.{wide}" for _, wide in TEE_COLUMNS)
+    latest = f"""
+        latest AS (
+            SELECT DISTINCT ON (URL, TeeName) *
+            FROM {LEGACY_TABLE}
+            WHERE URL IS NOT NULL AND TeeName IS NOT NULL
+            ORDER BY URL, TeeName, id DESC
+        )"""
+    return [
+        f"""
+        WITH {latest}
+        INSERT INTO courses (url, {course_cols})
+        SELECT DISTINCT ON (latest.URL) latest.URL, {course_src}
+        FROM latest
+        ORDER BY latest.URL, latest.id DESC
+        ON CONFLICT (url) DO NOTHING
+        """,
+        f"""
+        WITH {latest}
+        INSERT INTO tees (course_id, tee_name, scrape_date, {tee_cols})
+        SELECT courses.course_id, latest.TeeName, latest.scrape_date, {tee_src}
+        FROM latest
+        JOIN courses ON courses.url = latest.URL
+        ON CONFLICT (course_id, tee_name) DO NOTHING
+        """,
+        f"""
+        WITH {latest}
+        INSERT INTO holes (tee_id, hole_number, par, yardage, handicap)
+        SELECT tees.tee_id, h.hole_number, h.par, h.yardage, h.handicap
+        FROM latest
+        JOIN courses ON courses.url = latest.URL
+        JOIN tees
+            ON tees.course_id = courses.course_id AND tees.tee_name = latest.TeeName
+        CROSS JOIN LATERAL (VALUES {_hole_values("latest.")})
+            AS h (hole_number, par, yardage, handicap)
+        ON CONFLICT (tee_id, hole_number) DO NOTHING
+        """,
+    ]
+
+
+def _view_sql():
+    sources = {wide: f"courses.{col}" for col, wide in COURSE_COLUMNS}
+    sources.update({wide: f"tees.{col}" for col, wide in TEE_COLUMNS})
+    sources["URL"] = "courses.url"
+    sources["TeeName"] = "tees.tee_name"
+    for i in HOLE_NUMBERS:
+        for wide in (f"Par_{i}", f"Hole_{i}", f"Hdcp_{i}"):
+            sources[wide] = f"h.{wide}"
+
+    select_cols = ["tees.tee_id AS id", "tees.scrape_date"] + [
+        f"{sources[wide]} AS {wide}" for wide in OUTPUT_COLUMNS + ["content_hash"]
+    ]
+    hole_cols = [
+        f"max(par) FILTER (WHERE hole_number = {i})::INTEGER AS Par_{i}, "
+        f"max(yardage) FILTER (WHERE hole_number = {i}) AS Hole_{i}, "
+        f"max(handicap) FILTER (WHERE hole_number = {i}) AS Hdcp_{i}"
+        for i in HOLE_NUMBERS
+    ]
+    return f"""
+        CREATE OR REPLACE VIEW golf_data_entries AS
+        SELECT {", ".join(select_cols)}
+        FROM tees
+        JOIN courses ON courses.course_id = tees.course_id
+        LEFT JOIN LATERAL (
+            SELECT {", ".join(hole_cols)}
+            FROM holes
+            WHERE holes.tee_id = tees.tee_id
+        ) h ON true
+        """
+
+
+def _trigger_sql():
+    course_cols = ", ".join(col for col, _ in COURSE_COLUMNS)
+    course_vals = ", ".join(f"NEW.{wide}" for _, wide in COURSE_COLUMNS)
+    course_updates = ", ".join(f"{col} = EXCLUDED.{col}" for col, _ in COURSE_COLUMNS)
+    tee_cols = ", ".join(col for col, _ in TEE_COLUMNS)
+    tee_vals = ", ".join(f"NEW.{wide}" for _, wide in TEE_COLUMNS)
+    tee_updates = ", ".join(f"{col} = EXCLUDED.{col}" for col, _ in TEE_COLUMNS)
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION golf_data_entries_insert() RETURNS trigger AS $$
+        DECLARE
+            v_course_id INTEGER;
+            v_tee_id INTEGER;
+        BEGIN
+            INSERT INTO courses (url, {course_cols})
+            VALUES (NEW.URL, {course_vals})
+            ON CONFLICT (url) DO UPDATE SET {course_updates}
+            RETURNING course_id INTO v_course_id;
+
+            -- Rows loaded with a content hash are only rewritten when it changed.
+            INSERT INTO tees (course_id, tee_name, {tee_cols})
+            VALUES (v_course_id, NEW.TeeName, {tee_vals})
+            ON CONFLICT (course_id, tee_name) DO UPDATE
+            SET {tee_updates}, scrape_date = CURRENT_TIMESTAMP
+            WHERE EXCLUDED.content_hash IS NULL
+               OR tees.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            RETURNING tee_id INTO v_tee_id;
+
+            IF v_tee_id IS NULL THEN
+                RETURN NEW;
+            END IF;
+
+            INSERT INTO holes (tee_id, hole_number, par, yardage, handicap)
+            SELECT v_tee_id, h.hole_number, h.par, h.yardage, h.handicap
+            FROM (VALUES {_hole_values("NEW.")})
+                AS h (hole_number, par, yardage, handicap)
+            ON CONFLICT (tee_id, hole_number) DO UPDATE
+            SET par = EXCLUDED.par,
+                yardage = EXCLUDED.yardage,
+                handicap = EXCLUDED.handicap;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS golf_data_entries_insert ON golf_data_entries",
+        """
+        CREATE TRIGGER golf_data_entries_insert
+        INSTEAD OF INSERT ON golf_data_entries
+        FOR EACH ROW EXECUTE FUNCTION golf_data_entries_insert()
+        """,
+    ]
+
+
+def migrate_to_normalized(conn):
+    """Move golf_data_entries into courses/tees/holes behind a compatibility view."""
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        if golf_data_entries_is_view(conn):
+            logger.info(
+                "golf_data_entries is already the normalized compatibility view."
+            )
+            return True
+
+        # Tables created before content hashes existed lack the column the
+        # migration copies into tees.
+        cursor.execute(
+            "ALTER TABLE golf_data_entries ADD COLUMN IF NOT EXISTS content_hash TEXT"
+        )
+        cursor.execute(f"ALTER TABLE golf_data_entries RENAME TO {LEGACY_TABLE}")
+        cursor.execute(SCHEMA_SQL)
+        for table, statement in zip(("courses", "tees", "holes"), _migration_sql()):
+            cursor.execute(statement)
+            logger.info("Migrated %d rows into '%s'.", cursor.rowcount, table)
+        cursor.execute(_view_sql())
+        for statement in _trigger_sql():
+            cursor.execute(statement)
+        conn.commit()
+        logger.info(
+            "golf_data_entries is now a view over courses/tees/holes; "
+            "the original table was kept as '%s'.",
+            LEGACY_TABLE,
+        )
+        return True
+    except Psycopg2Error as e:
+        logger.exception("Error migrating to normalized schema: %s", e)
+        conn.rollback()
+        return False
+    finally:
+        if cursor:
+            cursor.close()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    db_conn = connect_db()
+    if not db_conn:
+        logger.error("Database connection failed. Exiting.")
+        exit()
+    try:
+        if not migrate_to_normalized(db_conn):
+            logger.error("Migration failed; no changes were made.")
+    finally:
+        db_conn.close()
+        logger.info("Database connection closed.")
@@ -0,0 +1,333 @@
+"""Per-site course page parsers and the registry that picks one for a URL.
+
+Parsers are pure functions over a page's HTML: they never fetch, open a browser
+or touch the database. This module only imports BeautifulSoup (and lxml when it
+is installed), so parse workers (threads or processes) start without loading
+Selenium, psycopg2 or webdriver_manager. parse_pages() is the entry point for a
+ProcessPoolExecutor: it parses a chunk of pages per task.
+
+Adding a site:
+
+    @register_parser
+    class ExampleParser(CourseParser):
+        name = "example"
+        domains = ("example-golf.com",)
+
+        def parse(self, html):
+            ...
+            return course_name, hole_records, missing_tabs
+"""
+
+import hashlib
+import logging
+import re
+import time
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:  # Falls back to BeautifulSoup's html.parser
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+# "Gold: 420 | Blue: 401 | White: 377" -- two or more "<tee>: <yards>" pairs.
+# Requiring a "|" keeps single "Label: number" lines (handicaps, par) out. Tee
+# names may hold anything but ":" and "|" ("Black/Gold", "Combo-White"), a unit
+# may follow the number ("420 yds") and the list may end with a "|".
+TEE_YARDAGE_PATTERN = re.compile(r"^[^:|]+:\s*\d+[^:|]*(\|[^:|]+:\s*\d+[^:|]*)+\|?\s*$")
+
+PARSERS = {}  # parser name (manifest "profile") -> parser instance
+DOMAIN_PARSERS = {}  # host, without "www." -> parser name
+
+
+class CourseParser:
+    """Interface for a site's parser.
+
+    parse(html) returns (course_name, hole records, missing tabs): hole records
+    are make_hole_record() dicts, and missing tabs are (hole label, pane id)
+    pairs the page links to but does not contain, for a browser to fill in.
+    """
+
+    name = None
+    domains = ()
+
+    def parse(self, html):
+        raise NotImplementedError
+
+    def fingerprint(self, html):
+        """Hash of the markup parse() depends on; the whole page by default."""
+        return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+    def parse_if_changed(self, html, stored_fingerprint=None):
+        """(fingerprint, parse(html), or None if the fingerprint is unchanged).
+
+        Parsers that can hash and parse from one document tree override this so
+        a changed page is only parsed once.
+        """
+        fingerprint = self.fingerprint(html)
+        if fingerprint == stored_fingerprint:
+            return fingerprint, None
+        return fingerprint, self.parse(html)
+
+
+def register_parser(parser_cls):
+    parser = parser_cls()
+    PARSERS[parser.name] = parser
+    for domain in parser.domains:
+        DOMAIN_PARSERS[domain] = parser.name
+    return parser_cls
+
+
+def get_parser(url=None, profile=None):
+    """Look a parser up by profile name, or else by the URL's domain."""
+    if profile:
+        return PARSERS.get(profile)
+    host = urlparse(url or "").netloc.lower()
+    if host.startswith("www."):
+        host = host[len("www.") :]
+    name = DOMAIN_PARSERS.get(host)
+    return PARSERS.get(name) if name else None
+
+
+# --- Shared hole helpers ---
+def make_hole_record(course_name, hole_number_text, hole_par, hole_yardages):
+    return {
+        "Course Name": course_name,
+        "Hole Number": hole_number_text.replace("Hole ", ""),
+        "Par per Hole": hole_par,
+        "Raw Tee Yardages": hole_yardages,
+        "Hole Handicap": "N/A",
+    }
+
+
+# --- Lake Jovita (Avada/Fusion theme tabs) ---
+def _has_class(name):
+    """XPath predicate equivalent to the CSS class selector .name."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def extract_course_name(soup):
+    course_name_element = soup.select_one("div.fusion-text.fusion-text-1 p")
+    if not course_name_element:
+        logger.warning("Could not extract Course Name: Element not found.")
+        return "N/A"
+    course_name = course_name_element.get_text().strip().replace(".", "").title()
+    logger.debug("Extracted Course Name: %s", course_name)
+    return course_name
+
+
+def find_hole_tabs(soup):
+    """Return (hole label, target pane id) for every "Hole" tab link in the page."""
+    hole_tabs = []
+    for tab_link in soup.select("div.nav > ul.nav-tabs li > a.tab-link"):
+        hole_num_h4 = tab_link.find("h4")
+        if not hole_num_h4 or "Hole" not in hole_num_h4.get_text():
+            continue
+        target_div_id = (tab_link.get("href") or "").split("#")[-1]
+        hole_tabs.append((hole_num_h4.get_text(strip=True), target_div_id))
+    return hole_tabs
+
+
+def hole_par_from_text(par_yardage_text):
+    """ "Par 4 – 401 Yards" -> "4"."""
+    return par_yardage_text.split("–")[0].strip().replace("Par ", "")
+
+
+def parse_hole_pane(hole_soup):
+    hole_par = "N/A"
+    hole_yardages = "N/A"
+
+    par_yardage_h3 = hole_soup.find(
+        "h3", class_="fusion-responsive-typography-calculated"
+    )
+    if not par_yardage_h3:
+        # The "calculated" class is added by the theme's JavaScript, so raw markup
+        # fetched without a browser only has the plain h3.
+        par_yardage_h3 = hole_soup.find(
+            "h3", string=lambda text: text and "Par" in text
+        )
+    if par_yardage_h3:
+        par_yardage_text = par_yardage_h3.get_text(strip=True)
+        if "Par" in par_yardage_text:
+            hole_par = hole_par_from_text(par_yardage_text)
+            logger.debug("  Par: %s", hole_par)
+
+    yardage_p_tag = hole_soup.find(
+        "p",
+        string=lambda text: text and TEE_YARDAGE_PATTERN.match(text),
+    )
+    if yardage_p_tag:
+        hole_yardages = yardage_p_tag.get_text(strip=True)
+        logger.debug("  Yardages: %s", hole_yardages)
+    else:
+        logger.debug(
+            "  Yardage p tag not found. Inspect HTML for yardages within hole content."
+        )
+
+    return hole_par, hole_yardages
+
+
+@register_parser
+class LakeJovitaParser(CourseParser):
+    name = "lake_jovita"
+    domains = ("lakejovita.com",)
+
+    def parse(self, html):
+        """Parse the course name and all hole panes from a single page document."""
+        if lxml is not None:
+            return self._parse_lxml(lxml.html.fromstring(html))
+        return self._parse_soup(html)
+
+    def parse_if_changed(self, html, stored_fingerprint=None):
+        if lxml is None:
+            return super().parse_if_changed(html, stored_fingerprint)
+        doc = lxml.html.fromstring(html)
+        fingerprint = self._fingerprint_lxml(doc, html)
+        if fingerprint == stored_fingerprint:
+            return fingerprint, None
+        return fingerprint, self._parse_lxml(doc)
+
+    def _parse_lxml(self, doc):
+        course_name = "N/A"
+        course_name_elements = doc.xpath(
+            f"//div[{_has_class('fusion-text')} and {_has_class('fusion-text-1')}]//p"
+        )
+        if course_name_elements:
+            course_name = (
+                course_name_elements[0].text_content().strip().replace(".", "").title()
+            )
+            logger.debug("Extracted Course Name: %s", course_name)
+        else:
+            logger.warning("Could not extract Course Name: Element not found.")
+
+        hole_tabs = []
+        for tab_link in doc.xpath(
+            f"//div[{_has_class('nav')}]/ul[{_has_class('nav-tabs')}]"
+            f"//li/a[{_has_class('tab-link')}]"
+        ):
+            hole_num_h4 = tab_link.find(".//h4")
+            if hole_num_h4 is None or "Hole" not in hole_num_h4.text_content():
+                continue
+            target_div_id = (tab_link.get("href") or "").split("#")[-1]
+            hole_tabs.append((hole_num_h4.text_content().strip(), target_div_id))
+        logger.debug(
+            "Found %d potential hole tab links in static HTML.", len(hole_tabs)
+        )
+
+        panes = {element.get("id"): element for element in doc.xpath("//*[@id]")}
+        hole_records = []
+        missing_tabs = []
+        for hole_number_text, target_div_id in hole_tabs:
+            hole_pane = panes.get(target_div_id) if target_div_id else None
+            if hole_pane is None:
+                logger.debug("  Pane for %s not in static HTML.", hole_number_text)
+                missing_tabs.append((hole_number_text, target_div_id))
+                continue
+            logger.debug("Processing %s...", hole_number_text)
+
+            hole_par = "N/A"
+            par_yardage_h3 = hole_pane.xpath(
+                f".//h3[{_has_class('fusion-responsive-typography-calculated')}]"
+            ) or [
+                h3
+                for h3 in hole_pane.iter("h3")
+                if len(h3) == 0 and h3.text and "Par" in h3.text
+            ]
+            if par_yardage_h3:
+                par_yardage_text = par_yardage_h3[0].text_content().strip()
+                if "Par" in par_yardage_text:
+                    hole_par = hole_par_from_text(par_yardage_text)
+                    logger.debug("  Par: %s", hole_par)
+
+            hole_yardages = "N/A"
+            for p_tag in hole_pane.iter("p"):
+                if (
+                    len(p_tag) == 0
+                    and p_tag.text
+                    and TEE_YARDAGE_PATTERN.match(p_tag.text)
+                ):
+                    hole_yardages = p_tag.text.strip()
+                    logger.debug("  Yardages: %s", hole_yardages)
+                    break
+            else:
+                logger.debug(
+                    "  Yardage p tag not found. Inspect HTML for yardages within hole content."
+                )
+
+            hole_records.append(
+                make_hole_record(course_name, hole_number_text, hole_par, hole_yardages)
+            )
+        return course_name, hole_records, missing_tabs
+
+    def _parse_soup(self, html):
+        soup = BeautifulSoup(html, "html.parser")
+        course_name = extract_course_name(soup)
+        hole_tabs = find_hole_tabs(soup)
+        logger.debug(
+            "Found %d potential hole tab links in static HTML.", len(hole_tabs)
+        )
+
+        hole_records = []
+        missing_tabs = []
+        for hole_number_text, target_div_id in hole_tabs:
+            hole_pane = soup.find(id=target_div_id) if target_div_id else None
+            if hole_pane is None:
+                logger.debug("  Pane for %s not in static HTML.", hole_number_text)
+                missing_tabs.append((hole_number_text, target_div_id))
+                continue
+            logger.debug("Processing %s...", hole_number_text)
+            hole_par, hole_yardages = parse_hole_pane(hole_pane)
+            hole_records.append(
+                make_hole_record(course_name, hole_number_text, hole_par, hole_yardages)
+            )
+        return course_name, hole_records, missing_tabs
+
+    def fingerprint(self, html):
+        """Hash of the course name block and hole tabs, the only markup we parse.
+
+        Theme nonces, scripts and the rest of the page change between fetches
+        without affecting the scraped data, so they are left out. Pages without
+        those blocks are hashed whole. With lxml the blocks are serialized from
+        the same tree parse_if_changed() parses, so the hash costs no second
+        parse; the values differ from the html.parser ones, so pages hashed
+        without lxml are parsed again once.
+        """
+        if lxml is not None:
+            return self._fingerprint_lxml(lxml.html.fromstring(html), html)
+        strainer = SoupStrainer("div", class_=["fusion-text-1", "fusion-tabs"])
+        section = str(BeautifulSoup(html, "html.parser", parse_only=strainer)) or html
+        return hashlib.sha256(section.encode("utf-8")).hexdigest()
+
+    def _fingerprint_lxml(self, doc, html):
+        block = f"({_has_class('fusion-text-1')} or {_has_class('fusion-tabs')})"
+        sections = doc.xpath(f"//div[{block}][not(ancestor::div[{block}])]")
+        section = "".join(
+            lxml.html.tostring(element, encoding="unicode", with_tail=False)
+            for element in sections
+        )
+        return hashlib.sha256((section or html).encode("utf-8")).hexdigest()
+
+
+# --- Process pool entry point ---
+def parse_pages(batch):
+    """Parse a chunk of pages in a worker process.
+
+    batch is a list of (profile, url, html, stored fingerprint or None). Returns
+    (url, fingerprint, parsed, seconds) per page, where parsed is None when the
+    page's fingerprint matches the stored one, and an exception message string if
+    the parser raised. seconds is the time spent on the page in the worker, for
+    the parent process to record as its "parse" stage.
+    """
+    results = []
+    for profile, url, html, stored_fingerprint in batch:
+        parser = get_parser(url, profile)
+        start = time.perf_counter()
+        try:
+            fingerprint, parsed = parser.parse_if_changed(html, stored_fingerprint)
+        except Exception as e:
+            fingerprint, parsed = None, f"{type(e).__name__}: {e}"
+        results.append((url, fingerprint, parsed, time.perf_counter() - start))
+    return results
@@ -0,0 +1,73 @@
+"""Streaming building blocks for the multi-course pipeline.
+
+Each stage is a generator that pulls from the previous one, and no stage keeps
+more than a fixed number of tasks in flight. When a downstream stage (parsing,
+the database, the file export) falls behind, upstream stages stop pulling work,
+so memory depends on the chunk and queue sizes rather than on crawl size.
+"""
+
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import islice
+
+
+def process_context():
+    """multiprocessing context for worker pools started from a threaded process.
+
+    Forking copies whatever locks the fetch, flush and pool threads hold at that
+    moment, so workers come from a forkserver (spawn where there is none).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def chunked(items, size):
+    """Yield lists of up to size items from any iterable."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bounded_map(executor, fn, items, max_pending):
+    """Like executor.map, but lazy: at most max_pending calls are in flight.
+
+    items is consumed only as results are taken, and results are yielded in
+    completion order, not input order.
+    """
+    submitter = BoundedSubmitter(executor, max_pending)
+    for item in items:
+        for future in submitter.submit(fn, item):
+            yield future.result()
+    for future in submitter.drain():
+        yield future.result()
+
+
+class BoundedSubmitter:
+    """Submits tasks to an executor, blocking while max_pending are unfinished.
+
+    submit() and drain() return the futures that finished, for the caller to
+    handle; useful when tasks are produced from inside another stage's loop.
+    """
+
+    def __init__(self, executor, max_pending):
+        self.executor = executor
+        self.max_pending = max(1, max_pending)
+        self._pending = set()
+
+    def submit(self, fn, *args):
+        done = []
+        while len(self._pending) >= self.max_pending:
+            finished, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            done.extend(finished)
+        self._pending.add(self.executor.submit(fn, *args))
+        return done
+
+    def drain(self):
+        while self._pending:
+            finished, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            yield from finished
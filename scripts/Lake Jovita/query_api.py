@@ -0,0 +1,579 @@
+"""Read-only HTTP API over golf_data_entries (a plain ASGI app, no framework).
+
+Usage:
+    uvicorn query_api:app --port 8000          # or: python query_api.py
+
+Endpoints (all GET, JSON):
+    /courses?name=lake&state=FL&limit=50&after=...   course lookup
+    /courses/card?url=https://...                    every tee of one course
+    /holes?par=3&min_yards=150&max_yards=200&state=FL&limit=50&after=...
+    /health                                          pool and cache stats
+
+List endpoints use keyset pagination: each page returns "next", an opaque
+cursor holding the last row's sort key, to pass back as after=. Every query
+reads only the newest row of each (URL, TeeName), since LOAD_MODE=append keeps
+one per run. Once normalized_schema.py has run, the courses, tees and holes
+tables are queried directly and each page is an index range scan starting at
+the cursor. On the wide table, /holes starts its scan of
+golf_data_entries_latest_idx at the cursor but /courses still ranks every
+course per page, as the name sort cannot come from an index there.
+
+Queries run on an AsyncConnectionPool: a bounded set of DB-API connections
+used from worker threads, so the event loop never blocks on the database. The
+same SQL runs on PostgreSQL and on a SQLite file with a golf_data_entries table,
+which is what the load test uses as a stand-in.
+
+Course cards are kept in a TTL/LRU cache. At most every API_VERSION_CHECK
+seconds the API asks which courses got rows with a newer scrape_date and drops
+their cards, so a new ingest is visible without waiting for the TTL.
+
+Settings (environment):
+    API_DATABASE         "postgres" (DB_* settings, default) or sqlite:///path.db
+    API_POOL_SIZE        connections in the pool (default 8)
+    API_CACHE_SIZE       course cards kept (default 1024)
+    API_CACHE_TTL        seconds a card is served from the cache (default 300)
+    API_VERSION_CHECK    seconds between checks for newly ingested rows (default 5)
+    API_MAX_LIMIT        largest page size accepted (default 500)
+"""
+
+import asyncio
+import base64
+import datetime
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from settings import get_settings
+
+settings = get_settings()  # Loads .env
+
+logger = logging.getLogger(__name__)
+
+API_DATABASE = settings.api_database
+API_POOL_SIZE = settings.api_pool_size
+API_CACHE_SIZE = settings.api_cache_size
+API_CACHE_TTL = settings.api_cache_ttl
+API_VERSION_CHECK = settings.api_version_check
+API_MAX_LIMIT = settings.api_max_limit
+HOLE_NUMBERS = range(1, 19)
+
+# Rows written in a transaction that began before the last version check carry
+# an older scrape_date, so each check looks back this far as well.
+VERSION_CHECK_OVERLAP = datetime.timedelta(minutes=5)
+
+
+class AsyncConnectionPool:
+    """Up to size DB-API connections, handed out to queries run in threads."""
+
+    def __init__(self, connect, size, dialect):
+        self._connect = connect
+        self.size = size
+        self.dialect = dialect  # "postgres" or "sqlite"
+        self.placeholder = "?" if dialect == "sqlite" else "%s"
+        self._slots = None  # asyncio.Semaphore(size): connections in use
+        self._idle = []
+        self._created = 0
+        self._waits = 0
+
+    async def _acquire(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        if self._slots.locked():
+            self._waits += 1
+        await self._slots.acquire()
+        if self._idle:
+            return self._idle.pop()
+        try:
+            conn = await asyncio.to_thread(self._connect)
+        except Exception:
+            self._slots.release()
+            raise
+        self._created += 1
+        return conn
+
+    async def fetch(self, sql, params=()):
+        """Run a query; returns a list of dicts keyed by the selected column names."""
+        sql = sql.replace("?", self.placeholder)
+        conn = await self._acquire()
+        try:
+            rows = await asyncio.to_thread(self._run, conn, sql, params)
+        except Exception:
+            # A connection that failed a query is dropped. Releasing its slot
+            # lets a waiting query open a fresh one.
+            self._created -= 1
+            try:
+                await asyncio.to_thread(conn.close)
+            finally:
+                self._slots.release()
+            raise
+        self._idle.append(conn)
+        self._slots.release()
+        return rows
+
+    @staticmethod
+    def _run(conn, sql, params):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "open": self._created,
+            "idle": len(self._idle),
+            "waits": self._waits,
+        }
+
+    async def close(self):
+        while self._idle:
+            await asyncio.to_thread(self._idle.pop().close)
+        self._created = 0
+
+
+class CourseCardCache:
+    """LRU cache of course cards that also expires entries after ttl seconds."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # url -> (stored at, card)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(url, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, url, card):
+        with self._lock:
+            self._entries[url] = (time.monotonic(), card)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, urls):
+        with self._lock:
+            for url in urls:
+                if self._entries.pop(url, None) is not None:
+                    self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+# --- Queries (portable between PostgreSQL and SQLite) ---
+# In LOAD_MODE=append golf_data_entries keeps a row per tee per run, so reads
+# take the newest row of every (URL, TeeName). The window is partitioned and
+# ordered like golf_data_entries_latest_idx. {where} filters whole partitions.
+LATEST_TEES_SQL = """
+SELECT * FROM (
+    SELECT g.*, row_number() OVER (
+        PARTITION BY URL, TeeName ORDER BY scrape_date DESC, id DESC
+    ) AS newness
+    FROM golf_data_entries g
+    WHERE URL IS NOT NULL {where}
+) ranked
+WHERE newness = 1
+"""
+
+# Each course's name, city and state come from its newest row.
+COURSE_SQL = """
+SELECT course_name, url, city, state
+FROM (
+    SELECT URL AS url, coalesce(CourseName, '') AS course_name,
+        City AS city, StateorRegion AS state,
+        row_number() OVER (
+            PARTITION BY URL ORDER BY scrape_date DESC, id DESC
+        ) AS newness
+    FROM golf_data_entries
+    WHERE URL IS NOT NULL
+) courses
+WHERE newness = 1 {where}
+{keyset}
+ORDER BY course_name, url
+LIMIT ?
+"""
+# Served by courses_name_url_idx once normalized_schema.py has run.
+NORMALIZED_COURSE_SQL = """
+SELECT course_name, url, city, state
+FROM (
+    SELECT url, coalesce(course_name, '') AS course_name,
+        city, state_or_region AS state
+    FROM courses
+    WHERE url IS NOT NULL
+) courses
+WHERE 1 = 1 {where}
+{keyset}
+ORDER BY course_name, url
+LIMIT ?
+"""
+
+CARD_COLUMNS = (
+    ["TeeName", "TeeNumber", "Par_Overall", "Rating", "Slope"]
+    + [f"{kind}_{i}" for i in HOLE_NUMBERS for kind in ("Par", "Hole", "Hdcp")]
+    + ["Tot_Out_Par", "Tot_Out_Ydg", "Tot_In_Par", "Tot_In_Ydg", "Length_Total"]
+)
+CARD_SELECT = f"""
+SELECT CourseName AS course_name, scrape_date,
+    {", ".join(f"{col} AS {col.lower()}" for col in CARD_COLUMNS)}
+"""
+CARD_SQL = f"""{CARD_SELECT}
+FROM ({LATEST_TEES_SQL.format(where="AND URL = ?")}) latest
+ORDER BY TeeNumber, TeeName
+"""
+# The normalized golf_data_entries view already has one row per tee.
+NORMALIZED_CARD_SQL = f"""{CARD_SELECT}
+FROM golf_data_entries
+WHERE URL = ?
+ORDER BY TeeNumber, TeeName
+"""
+
+HOLES_SQL = """
+SELECT url, course_name, state, tee_name, hole, par, yardage
+FROM (
+    {holes}
+) holes
+WHERE 1 = 1 {where}
+{keyset}
+ORDER BY url, tee_name, hole
+LIMIT ?
+"""
+# One row per hole of every newest tee row: each tee joined with holes 1-18.
+# {where} takes the keyset's (URL, TeeName) lower bound, so a deep page starts
+# its index scan at the cursor instead of ranking the whole table.
+HOLE_NUMBERS_SQL = " UNION ALL ".join(f"SELECT {i} AS hole" for i in HOLE_NUMBERS)
+WIDE_HOLES = f"""
+    SELECT URL AS url, CourseName AS course_name, StateorRegion AS state,
+        TeeName AS tee_name, h.hole,
+        CASE h.hole {" ".join(f"WHEN {i} THEN Par_{i}" for i in HOLE_NUMBERS)}
+        END AS par,
+        CASE h.hole {" ".join(f"WHEN {i} THEN Hole_{i}" for i in HOLE_NUMBERS)}
+        END AS yardage
+    FROM ({LATEST_TEES_SQL.format(where="AND TeeName IS NOT NULL {where}")}) latest
+    CROSS JOIN ({HOLE_NUMBERS_SQL}) h
+"""
+# Ordered by the unique courses (url), tees (course_id, tee_name) and holes
+# (tee_id, hole_number) indexes.
+NORMALIZED_HOLES = """
+    SELECT courses.url, courses.course_name, courses.state_or_region AS state,
+        tees.tee_name, holes.hole_number AS hole, holes.par, holes.yardage
+    FROM holes
+    JOIN tees ON tees.tee_id = holes.tee_id
+    JOIN courses ON courses.course_id = tees.course_id
+"""
+
+CHANGED_SQL = """
+SELECT URL AS url, max(scrape_date) AS scrape_date
+FROM golf_data_entries
+WHERE scrape_date > ?
+GROUP BY URL
+"""
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode()
+
+
+def decode_cursor(token, size):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()).decode("utf-8"))
+    except ValueError:
+        raise BadRequest("Invalid 'after' cursor.")
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequest("Invalid 'after' cursor.")
+    return values
+
+
+def int_param(query, name, default=None):
+    value = query.get(name, default)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"'{name}' must be an integer.")
+
+
+def page_limit(query):
+    limit = int_param(query, "limit", 50)
+    if not 1 <= limit <= API_MAX_LIMIT:
+        raise BadRequest(f"'limit' must be between 1 and {API_MAX_LIMIT}.")
+    return limit
+
+
+def to_json(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)  # Decimal ratings
+
+
+class CourseAPI:
+    def __init__(self, pool, cache, version_check=API_VERSION_CHECK):
+        self.pool = pool
+        self.cache = cache
+        self.version_check = version_check
+        self._last_check = None  # monotonic time of the last version check
+        self._seen_until = None  # newest scrape_date seen by a version check
+        self._check_lock = None
+        self._normalized = None
+
+    async def normalized(self):
+        """True once normalized_schema.py has replaced the wide table."""
+        if self._normalized is None:
+            if self.pool.dialect != "postgres":
+                self._normalized = False
+            else:
+                rows = await self.pool.fetch(
+                    "SELECT count(*) AS views FROM pg_views "
+                    "WHERE viewname = 'golf_data_entries'"
+                )
+                self._normalized = rows[0]["views"] > 0
+        return self._normalized
+
+    async def courses(self, query):
+        limit = page_limit(query)
+        where, params = [], []
+        if query.get("name"):
+            where.append("AND lower(course_name) LIKE ?")
+            params.append(f"%{query['name'].lower()}%")
+        if query.get("state"):
+            where.append("AND state = ?")
+            params.append(query["state"])
+        keyset = ""
+        if query.get("after"):
+            name, url = decode_cursor(query["after"], 2)
+            keyset = "AND course_name >= ? AND (course_name, url) > (?, ?)"
+            params += [name, name, url]
+        sql = NORMALIZED_COURSE_SQL if await self.normalized() else COURSE_SQL
+        rows = await self.pool.fetch(
+            sql.format(where=" ".join(where), keyset=keyset), params + [limit]
+        )
+        return self._page(rows, limit, ("course_name", "url"))
+
+    async def card(self, query):
+        url = query.get("url")
+        if not url:
+            raise BadRequest("'url' is required.")
+        await self._invalidate_changed()
+        card = self.cache.get(url)
+        if card is None:
+            sql = NORMALIZED_CARD_SQL if await self.normalized() else CARD_SQL
+            tees = await self.pool.fetch(sql, [url])
+            if not tees:
+                return None
+            card = {
+                "url": url,
+                "course_name": tees[0].pop("course_name"),
+                "tees": [
+                    {key: value for key, value in tee.items() if key != "course_name"}
+                    for tee in tees
+                ],
+            }
+            self.cache.put(url, card)
+        return card
+
+    async def holes(self, query):
+        limit = page_limit(query)
+        where, params = [], []
+        for name, clause in (
+            ("par", "AND par = ?"),
+            ("min_yards", "AND yardage >= ?"),
+            ("max_yards", "AND yardage <= ?"),
+        ):
+            value = int_param(query, name)
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if query.get("state"):
+            where.append("AND state = ?")
+            params.append(query["state"])
+        keyset, tee_bound, bound_params = "", "", []
+        if query.get("after"):
+            url, tee_name, hole = decode_cursor(query["after"], 3)
+            # The redundant url bound lets the url index start at the cursor.
+            keyset = "AND url >= ? AND (url, tee_name, hole) > (?, ?, ?)"
+            params += [url, url, tee_name, hole]
+            tee_bound = "AND (URL, TeeName) >= (?, ?)"
+            bound_params = [url, tee_name]
+        if await self.normalized():
+            holes, bound_params = NORMALIZED_HOLES, []
+        else:
+            holes = WIDE_HOLES.format(where=tee_bound)
+        rows = await self.pool.fetch(
+            HOLES_SQL.format(holes=holes, where=" ".join(where), keyset=keyset),
+            bound_params + params + [limit],
+        )
+        return self._page(rows, limit, ("url", "tee_name", "hole"))
+
+    def _page(self, rows, limit, key):
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = encode_cursor([rows[-1][k] for k in key])
+        return {"items": rows, "next": next_cursor}
+
+    async def _invalidate_changed(self):
+        """Drop cached cards of courses that got new rows since the last check."""
+        if self._check_lock is None:
+            self._check_lock = asyncio.Lock()
+        now = time.monotonic()
+        if self._last_check is not None and now - self._last_check < self.version_check:
+            return
+        async with self._check_lock:
+            if (
+                self._last_check is not None
+                and time.monotonic() - self._last_check < self.version_check
+            ):
+                return
+            self._last_check = time.monotonic()
+            if self._seen_until is None:
+                rows = await self.pool.fetch(
+                    "SELECT max(scrape_date) AS scrape_date FROM golf_data_entries"
+                )
+                self._seen_until = rows[0]["scrape_date"] if rows else None
+                return
+            since = self._seen_until
+            if isinstance(since, datetime.datetime):
+                since = since - VERSION_CHECK_OVERLAP
+            changed = await self.pool.fetch(CHANGED_SQL, [since])
+            self.cache.invalidate(row["url"] for row in changed)
+            newest = [row["scrape_date"] for row in changed]
+            if newest:
+                self._seen_until = max([self._seen_until] + newest)
+
+    def stats(self):
+        return {"pool": self.pool.stats(), "cache": self.cache.stats()}
+
+
+# --- ASGI plumbing ---
+def connect_from_settings(database=API_DATABASE, pool_size=API_POOL_SIZE):
+    if database.startswith("sqlite:///"):
+        path = database[len("sqlite:///") :]
+
+        def connect():
+            # Each connection is used by one worker thread at a time.
+            return sqlite3.connect(path, check_same_thread=False)
+
+        return AsyncConnectionPool(connect, pool_size, "sqlite")
+
+    import psycopg2
+
+    def connect():
+        conn = psycopg2.connect(
+            host=settings.db_host,
+            database=settings.db_name,
+            user=settings.db_user,
+            password=settings.db_password,
+        )
+        conn.set_session(readonly=True, autocommit=True)
+        return conn
+
+    return AsyncConnectionPool(connect, pool_size, "postgres")
+
+
+async def send_json(send, status, body):
+    payload = json.dumps(body, default=to_json).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": payload})
+
+
+def create_app(database=API_DATABASE, pool_size=API_POOL_SIZE):
+    api = None
+
+    async def app(scope, receive, send):
+        nonlocal api
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    api = CourseAPI(
+                        connect_from_settings(database, pool_size),
+                        CourseCardCache(API_CACHE_SIZE, API_CACHE_TTL),
+                    )
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await api.pool.close()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        if api is None:  # Servers that skip the lifespan protocol
+            api = CourseAPI(
+                connect_from_settings(database, pool_size),
+                CourseCardCache(API_CACHE_SIZE, API_CACHE_TTL),
+            )
+        if scope["method"] != "GET":
+            await send_json(send, 405, {"error": "Only GET is supported."})
+            return
+
+        query = {
+            key: values[-1]
+            for key, values in parse_qs(scope["query_string"].decode()).items()
+        }
+        routes = {
+            "/courses": api.courses,
+            "/courses/card": api.card,
+            "/holes": api.holes,
+        }
+        try:
+            if scope["path"] == "/health":
+                await send_json(send, 200, api.stats())
+            elif scope["path"] in routes:
+                body = await routes[scope["path"]](query)
+                if body is None:
+                    await send_json(send, 404, {"error": "Course not found."})
+                else:
+                    await send_json(send, 200, body)
+            else:
+                await send_json(send, 404, {"error": "Not found."})
+        except BadRequest as e:
+            await send_json(send, 400, {"error": str(e)})
+        except Exception as e:
+            logger.exception("Error serving %s: %s", scope["path"], e)
+            await send_json(send, 500, {"error": "Internal server error."})
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="127.0.0.1", port=settings.api_port)
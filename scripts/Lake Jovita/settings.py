@@ -0,0 +1,141 @@
+"""Configuration read once from the environment and the project's .env file.
+
+    from settings import get_settings
+
+    settings = get_settings()
+    if settings.load_mode == "upsert":
+        ...
+
+The first get_settings() call loads .env (variables already set in the
+environment win) and snapshots the values below, converted to their types;
+later calls return the same object. Every module reads its configuration from
+here, and classes with sizing settings (ConnectionPool, DriverPool, CrawlState,
+ResponseCache, ...) call get_settings() when constructed, so .env applies to
+them too. An argument passed to a constructor still overrides its setting.
+
+Only the standard library is imported here, and python-dotenv only when a .env
+file exists, so reading settings costs nothing noticeable at startup.
+"""
+
+import os
+import threading
+
+
+def find_dotenv():
+    """The nearest .env in this directory or one of its parents, or None."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+class Settings:
+    def __init__(self, environ=None):
+        env = os.environ if environ is None else environ
+
+        # PostgreSQL
+        self.db_host = env.get("DB_HOST")
+        self.db_name = env.get("DB_NAME")
+        self.db_user = env.get("DB_USER")
+        self.db_password = env.get("DB_PASSWORD")
+
+        # Scraping and loading
+        self.scrape_mode = env.get("SCRAPE_MODE", "static")
+        self.load_mode = env.get("LOAD_MODE", "append")
+        self.validation = env.get("VALIDATION", "on")
+        self.http_cache = env.get("HTTP_CACHE", "on")
+        self.http_cache_dir = env.get(
+            "HTTP_CACHE_DIR", os.path.join("data", "http_cache")
+        )
+        self.http_cache_ttl = float(env.get("HTTP_CACHE_TTL", "86400"))
+        self.http_cache_max_mb = float(env.get("HTTP_CACHE_MAX_MB", "500"))
+        self.fingerprint_store = env.get(
+            "FINGERPRINT_STORE", os.path.join("data", "page_fingerprints.json")
+        )
+        self.run_env = env.get("RUN_ENV", "local")
+        self.chromedriver_path = env.get("CHROMEDRIVER_PATH")
+
+        # Crawl state (crawl_state.py)
+        self.crawl_state = env.get(
+            "CRAWL_STATE", os.path.join("data", "crawl_state.sqlite3")
+        )
+        self.crawl_max_attempts = int(env.get("CRAWL_MAX_ATTEMPTS", "5"))
+        self.crawl_retry_base = float(env.get("CRAWL_RETRY_BASE", "30"))
+        self.crawl_retry_max = float(env.get("CRAWL_RETRY_MAX", "3600"))
+
+        # Connection pool and write-behind buffer (db_pool.py)
+        self.db_pool_min = int(env.get("DB_POOL_MIN", "1"))
+        self.db_pool_max = int(env.get("DB_POOL_MAX", "4"))
+        self.db_pool_acquire_timeout = float(env.get("DB_POOL_ACQUIRE_TIMEOUT", "30"))
+        self.db_flush_rows = int(env.get("DB_FLUSH_ROWS", "5000"))
+        self.db_flush_seconds = float(env.get("DB_FLUSH_SECONDS", "5"))
+        # Unset leaves the write-behind bound at 4 x its flush size.
+        max_rows = env.get("DB_BUFFER_MAX_ROWS")
+        self.db_buffer_max_rows = int(max_rows) if max_rows else None
+
+        # Browser pool (driver_pool.py)
+        self.driver_pool_size = int(env.get("DRIVER_POOL_SIZE", "2"))
+        self.driver_pool_acquire_timeout = float(
+            env.get("DRIVER_POOL_ACQUIRE_TIMEOUT", "60")
+        )
+        self.driver_max_pages = int(env.get("DRIVER_MAX_PAGES", "50"))
+        self.driver_max_memory_mb = float(env.get("DRIVER_MAX_MEMORY_MB", "1024"))
+
+        # File exports
+        self.export_formats = env.get("EXPORT_FORMATS", "csv,parquet")
+        self.parquet_dir = env.get(
+            "PARQUET_DIR", os.path.join("data", "golf_data_parquet")
+        )
+
+        # Logging and metrics
+        self.log_level = env.get("LOG_LEVEL", "INFO")
+        self.metrics_jsonl = env.get(
+            "METRICS_JSONL", os.path.join("data", "metrics.jsonl")
+        )
+        self.metrics_prom = env.get(
+            "METRICS_PROM", os.path.join("data", "metrics.prom")
+        )
+        self.metrics_port = env.get("METRICS_PORT")
+
+        # Summary tables (analytics.py); 0 workers means one per CPU
+        self.analytics_workers = int(env.get("ANALYTICS_WORKERS", "0"))
+        self.analytics_chunk_rows = int(env.get("ANALYTICS_CHUNK_ROWS", "20000"))
+
+        # Read API (query_api.py)
+        self.api_database = env.get("API_DATABASE", "postgres")
+        self.api_port = int(env.get("API_PORT", "8000"))
+        self.api_pool_size = int(env.get("API_POOL_SIZE", "8"))
+        self.api_cache_size = int(env.get("API_CACHE_SIZE", "1024"))
+        self.api_cache_ttl = float(env.get("API_CACHE_TTL", "300"))
+        self.api_version_check = float(env.get("API_VERSION_CHECK", "5"))
+        self.api_max_limit = int(env.get("API_MAX_LIMIT", "500"))
+
+    def as_dict(self):
+        """Every setting, with the database password masked."""
+        values = dict(vars(self))
+        if values["db_password"]:
+            values["db_password"] = "***"
+        return values
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings():
+    """The process-wide Settings, loading .env on first use."""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            dotenv_path = find_dotenv()
+            if dotenv_path:
+                from dotenv import load_dotenv
+
+                load_dotenv(dotenv_path)
+            _settings = Settings()
+        return _settings
@@ -0,0 +1,153 @@
+"""Batch-wide integrity checks on tee rows before they are loaded.
+
+validate_tee_rows() splits a tee-row DataFrame into rows that pass and rows
+that fail, with the reasons for each failure:
+
+    "<column> is not a whole number"   a value an INTEGER column would drop
+    "missing holes"       a hole 1-18 without a par or a positive yardage
+    "par out of range"    a hole par outside PAR_RANGE
+    "totals mismatch"     Tot_Out_*/Tot_In_* differ from the sum of their holes,
+                          or front + back differs from Length_Total/Par_Overall
+    "rating out of range", "slope out of range"  outside RATING_RANGE/SLOPE_RANGE
+                          (a missing Rating or Slope is allowed)
+    "yardage order"       a course whose Length_Total increases from one tee to
+                          the next in TEE_ORDER; every tee of the course fails
+
+Each check is one vectorized pass over the columns (NumPy arrays of the 18 par
+and yardage columns, a groupby for the tee order); Python only runs per row to
+join the reasons of the rows that fail. Columns that already have an integer
+dtype (tee rows built by course_model) skip the whole-number check.
+
+load_golf_data() runs the checks unless VALIDATION=off and writes failing rows
+to the golf_data_quarantine table (every column as text, so the values are kept
+as scraped) in the same transaction that loads the rest.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from course_model import DEFAULT_TEES, HOLES
+from instrumentation import get_metrics
+from lake_jovita_south_scraper import INT_COLUMNS, _whole_numbers
+
+logger = logging.getLogger(__name__)
+
+PAR_RANGE = (3, 6)
+RATING_RANGE = (55.0, 85.0)
+SLOPE_RANGE = (55, 155)  # the USGA Slope Rating scale
+TEE_ORDER = DEFAULT_TEES  # longest to shortest: Gold, Blue, White, Red
+
+PAR_COLUMNS = [f"Par_{i}" for i in range(1, HOLES + 1)]
+YARDAGE_COLUMNS = [f"Hole_{i}" for i in range(1, HOLES + 1)]
+
+
+def _floats(values):
+    return values.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _integer_columns(df):
+    """({column: float array, NaN where missing}, {reason: mask}) of INT_COLUMNS.
+
+    The masks mark values that were given but are not whole numbers, which
+    prepare_golf_data_frame() would turn into nulls.
+    """
+    values, unparsed = {}, {}
+    for col in INT_COLUMNS:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series.dtype):
+            values[col] = _floats(series)
+            continue
+        values[col] = _floats(_whole_numbers(series))
+        given = series.notna().to_numpy() & ~series.isin(["N/A", ""]).to_numpy()
+        bad = given & np.isnan(values[col])
+        if bad.any():
+            unparsed[f"{col} is not a whole number"] = bad
+    return values, unparsed
+
+
+def _outside(values, bounds):
+    """True where a value is present and outside the inclusive bounds."""
+    low, high = bounds
+    with np.errstate(invalid="ignore"):
+        return ~np.isnan(values) & ((values < low) | (values > high))
+
+
+def _yardage_order(df, length):
+    """Rows of courses whose tee lengths increase along TEE_ORDER."""
+    rank = df["TeeName"].map({name: i for i, name in enumerate(TEE_ORDER)})
+    ranked = pd.DataFrame(
+        {"URL": df["URL"].to_numpy(), "rank": rank.to_numpy(), "length": length}
+    ).dropna()
+    ranked = ranked.sort_values(["URL", "rank"], kind="stable")
+    longer = (ranked["length"] > ranked.groupby("URL")["length"].shift()).groupby(
+        ranked["URL"]
+    )
+    bad_courses = longer.any()
+    return df["URL"].isin(bad_courses.index[bad_courses]).to_numpy()
+
+
+def tee_row_failures(df):
+    """{reason: boolean array over the rows of df} for every check a row can fail."""
+    values, failures = _integer_columns(df)
+    par = np.column_stack([values[col] for col in PAR_COLUMNS])
+    yardage = np.column_stack([values[col] for col in YARDAGE_COLUMNS])
+
+    with np.errstate(invalid="ignore"):
+        failures["missing holes"] = (
+            np.isnan(par) | np.isnan(yardage) | ~(yardage > 0)
+        ).any(axis=1)
+    failures["par out of range"] = _outside(par, PAR_RANGE).any(axis=1)
+
+    out_par, in_par = values["Tot_Out_Par"], values["Tot_In_Par"]
+    out_ydg, in_ydg = values["Tot_Out_Ydg"], values["Tot_In_Ydg"]
+    par_overall = values["Par_Overall"]
+    nines = slice(0, 9), slice(9, HOLES)
+    failures["totals mismatch"] = (
+        (np.nansum(par[:, nines[0]], axis=1) != out_par)
+        | (np.nansum(par[:, nines[1]], axis=1) != in_par)
+        | (np.nansum(yardage[:, nines[0]], axis=1) != out_ydg)
+        | (np.nansum(yardage[:, nines[1]], axis=1) != in_ydg)
+        | (out_ydg + in_ydg != values["Length_Total"])
+        | (~np.isnan(par_overall) & (out_par + in_par != par_overall))
+    )
+
+    rating = _floats(pd.to_numeric(df["Rating"], errors="coerce").astype("Float64"))
+    failures["rating out of range"] = _outside(rating, RATING_RANGE)
+    failures["slope out of range"] = _outside(values["Slope"], SLOPE_RANGE)
+    failures["yardage order"] = _yardage_order(df, values["Length_Total"])
+    return failures
+
+
+def validate_tee_rows(df):
+    """(passing rows, failing rows with a "reasons" column) of a tee-row frame."""
+    with get_metrics().span("validate", rows=len(df)) as span:
+        failures = tee_row_failures(df)
+        reasons = list(failures)
+        failed = np.column_stack([failures[reason] for reason in reasons])
+        bad = failed.any(axis=1)
+        quarantined = df[bad].copy()
+        quarantined.insert(
+            0,
+            "reasons",
+            [
+                "; ".join(reason for reason, hit in zip(reasons, row) if hit)
+                for row in failed[bad]
+            ],
+        )
+        span.fields["quarantined"] = int(bad.sum())
+
+    if len(quarantined):
+        counts = {
+            reason: int(failures[reason].sum())
+            for reason in reasons
+            if failures[reason].any()
+        }
+        logger.warning(
+            "Quarantined %d of %d tee rows: %s",
+            len(quarantined),
+            len(df),
+            ", ".join(f"{reason} ({count})" for reason, count in counts.items()),
+        )
+    return df[~bad], quarantined
@@ -0,0 +1,210 @@
+"""Event-driven page-readiness waits with per-site budgets and recorded latency.
+
+Instead of fixed sleeps, the browser path waits for the condition it actually
+needs (document ready, tab links present, a hole pane visible) and polls at a
+short interval, so a page that is ready immediately costs almost nothing. Each
+wait's real duration is recorded per site and kind, which is what the budgets
+below should be tuned from:
+
+    logger.info("%s", get_wait_recorder().stats())
+
+poll_until() and WaitRecorder.timed() have no Selenium dependency, so a static
+fetch path can time its own waits into the same recorder.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from parsers import get_parser
+
+logger = logging.getLogger(__name__)
+
+
+class WaitBudget:
+    """Timeouts (seconds) for one site's waits; poll is the check interval."""
+
+    def __init__(self, page_load=15.0, content=5.0, pane=5.0, settle=0.3, poll=0.05):
+        self.page_load = page_load  # document.readyState == "complete"
+        self.content = content  # the elements a parser needs are present
+        self.pane = pane  # a clicked tab's pane is visible
+        self.settle = settle  # DOM unchanged for this long counts as stable
+        self.poll = poll
+
+
+DEFAULT_BUDGET = WaitBudget()
+SITE_BUDGETS = {  # parser name (manifest "profile") -> WaitBudget
+    # Tabs and panes are in the served markup; the theme only restyles them.
+    "lake_jovita": WaitBudget(page_load=10.0, content=3.0, pane=2.0),
+}
+
+
+def budget_for(url=None, profile=None):
+    parser = get_parser(url, profile)
+    return SITE_BUDGETS.get(parser.name if parser else None, DEFAULT_BUDGET)
+
+
+class WaitRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = {}  # (site, kind) -> [(seconds, timed_out)]
+
+    def record(self, site, kind, seconds, timed_out=False):
+        with self._lock:
+            self._waits.setdefault((site, kind), []).append((seconds, timed_out))
+
+    @contextmanager
+    def timed(self, site, kind, timeouts=(TimeoutError,)):
+        """Record how long the body took; an exception in timeouts counts as timed out.
+
+        PageWaiter adds Selenium's TimeoutException, so Selenium is only imported
+        once a browser is in use.
+        """
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            yield
+        except timeouts:
+            timed_out = True
+            raise
+        finally:
+            self.record(site, kind, time.perf_counter() - start, timed_out)
+
+    def stats(self):
+        """{"site/kind": count, avg/p50/p95/max seconds and timeouts}."""
+        with self._lock:
+            waits = {key: list(values) for key, values in self._waits.items()}
+        stats = {}
+        for (site, kind), values in sorted(waits.items()):
+            seconds = sorted(s for s, _ in values)
+            stats[f"{site}/{kind}"] = {
+                "count": len(seconds),
+                "avg_s": sum(seconds) / len(seconds),
+                "p50_s": seconds[len(seconds) // 2],
+                "p95_s": seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))],
+                "max_s": seconds[-1],
+                "timeouts": sum(timed_out for _, timed_out in values),
+            }
+        return stats
+
+
+_wait_recorder = WaitRecorder()
+
+
+def get_wait_recorder():
+    """The process-wide recorder shared by every scrape thread."""
+    return _wait_recorder
+
+
+def poll_until(predicate, timeout, interval=0.05):
+    """Call predicate every interval seconds until it returns a truthy value.
+
+    Returns that value, or raises TimeoutError once timeout seconds have passed.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        result = predicate()
+        if result:
+            return result
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Condition not met within {timeout}s.")
+        time.sleep(interval)
+
+
+def _dom_size(driver):
+    return driver.execute_script(
+        "return [document.getElementsByTagName('*').length,"
+        " document.body ? document.body.innerHTML.length : 0];"
+    )
+
+
+def wait_for_dom_stable(driver, budget, timeout):
+    """Wait until the DOM has not changed size for budget.settle seconds."""
+    last = {"size": None, "since": time.monotonic()}
+
+    def settled():
+        size = _dom_size(driver)
+        now = time.monotonic()
+        if size != last["size"]:
+            last["size"], last["since"] = size, now
+            return False
+        return now - last["since"] >= budget.settle
+
+    return poll_until(settled, timeout, budget.poll)
+
+
+class PageWaiter:
+    """The waits for one page load in a browser, timed into the recorder."""
+
+    def __init__(self, driver, url, profile=None, recorder=None):
+        self.driver = driver
+        self.url = url
+        parser = get_parser(url, profile)
+        self.site = parser.name if parser else "default"
+        self.budget = budget_for(url, profile)
+        self.recorder = recorder or get_wait_recorder()
+
+    def _timed(self, kind):
+        from selenium.common.exceptions import TimeoutException
+
+        return self.recorder.timed(self.site, kind, (TimeoutException, TimeoutError))
+
+    def _until(self, condition, timeout):
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        return WebDriverWait(
+            self.driver, timeout, poll_frequency=self.budget.poll
+        ).until(condition)
+
+    def page_ready(self, content_locator=None):
+        """Wait for the document to load and, if given, for content_locator.
+
+        When the content never appears, fall back to waiting for the DOM to stop
+        changing so whatever did render can still be read. Returns True if the
+        content (or a settled DOM) was seen within budget.
+        """
+        from selenium.common.exceptions import TimeoutException
+
+        try:
+            with self._timed("page_load"):
+                self._until(
+                    lambda d: d.execute_script("return document.readyState")
+                    == "complete",
+                    self.budget.page_load,
+                )
+        except TimeoutException:
+            logger.warning(
+                "Page %s not ready after %ss; continuing.",
+                self.url,
+                self.budget.page_load,
+            )
+
+        if content_locator is None:
+            return True
+        from selenium.webdriver.support import expected_conditions as EC
+
+        try:
+            with self._timed("content"):
+                self._until(
+                    EC.presence_of_element_located(content_locator),
+                    self.budget.content,
+                )
+            return True
+        except TimeoutException:
+            pass
+        try:
+            with self._timed("dom_stable"):
+                wait_for_dom_stable(self.driver, self.budget, self.budget.content)
+            return True
+        except TimeoutError:
+            return False
+
+    def pane_visible(self, locator):
+        """Wait for a tab pane to become visible and return the element."""
+        from selenium.webdriver.support import expected_conditions as EC
+
+        with self._timed("pane"):
+            return self._until(
+                EC.visibility_of_element_located(locator), self.budget.pane
+            )